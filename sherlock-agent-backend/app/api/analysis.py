@@ -5,12 +5,16 @@ import json, uuid
 from subprocess import Popen, PIPE
 from datetime import datetime
 
+from app.services.case_manager import case_manager
+from app.services.storage.catalog import case_catalog
+from app.services.parser.parsed_writer import parsed_exists
+
 analysis_bp = Blueprint("analysis_bp", __name__)
 CASES_ROOT = Path("data/cases")
 
 def _case_parsed_path(case_id):
-    p = CASES_ROOT / case_id / "parsed.json"
-    return p if p.exists() else None
+    p = CASES_ROOT / case_id
+    return p if parsed_exists(p) else None
 
 def _write_model_results(case_id, model_name, results):
     out_dir = CASES_ROOT / case_id / "models"
@@ -36,7 +40,7 @@ def run_model(case_id):
     data = request.get_json(silent=True) or {}
     model = (data.get("model") or "text_threat").strip()
 
-    parsed = json.loads(parsed_p.read_text(encoding="utf-8"))
+    parsed = case_manager.get_parsed(parsed_p)
     results = []
 
     if model == "text_threat":
@@ -64,6 +68,7 @@ def run_model(case_id):
         return jsonify({"error": f"unknown model '{model}'"}), 400
 
     out_path = _write_model_results(case_id, model, results)
+    case_catalog.record_model_run(case_id, model, len(results))
     return jsonify({"ok": True, "model": model, "results_path": str(out_path), "count": len(results)})
 
 @analysis_bp.route("/cases/<case_id>/models/<model_name>/results", methods=["GET"])
@@ -1,115 +1,68 @@
 # app/api/artifacts.py
 from flask import Blueprint, jsonify, request
 from pathlib import Path
-import json
+from functools import partial
+
+from app.services.case_manager import case_manager
+from app.utils.cursor import page_args, page_body
+from app.utils.ndjson import ndjson_response, wants_ndjson
 
 artifacts_bp = Blueprint("artifacts_bp", __name__)
 CASES_ROOT = Path("data/cases")
 
 def _case_parsed(case_id):
-    p = CASES_ROOT / case_id / "parsed.json"
-    if not p.exists():
-        return None, f"case {case_id} not found"
+    # case.db when the case has one, parsed.json otherwise
     try:
-        return json.loads(p.read_text(encoding="utf-8")), None
+        return case_manager.open_case(CASES_ROOT / case_id), None
+    except FileNotFoundError:
+        return None, f"case {case_id} not found"
     except Exception as e:
         return None, f"failed to load parsed.json: {e}"
 
-@artifacts_bp.route("/cases/<case_id>/contacts", methods=["GET"])
-def contacts(case_id):
-    parsed, err = _case_parsed(case_id)
-    if parsed is None:
-        return jsonify({"error": err}), 404
-    q = request.args.get("q", "").strip().lower()
-    items = parsed.get("contacts", [])
-    if q:
-        items = [c for c in items if q in json.dumps(c).lower()]
-    return jsonify({"items": items, "total": len(items)})
-
-@artifacts_bp.route("/cases/<case_id>/messages", methods=["GET"])
-def messages(case_id):
-    parsed, err = _case_parsed(case_id)
-    if parsed is None:
-        return jsonify({"error": err}), 404
-
-    # flatten threads into messages
-    messages = []
-    for t in parsed.get("chat_threads", []):
-        for m in t.get("messages", []):
-            msg = dict(m)
-            msg["_thread_id"] = t.get("id")
-            messages.append(msg)
-
-    # filters
-    thread_id = request.args.get("thread_id")
-    q = request.args.get("q", "").strip().lower()
-    if thread_id:
-        messages = [m for m in messages if m.get("_thread_id") == thread_id]
-    if q:
-        messages = [m for m in messages if q in (m.get("body") or "").lower() or q in (m.get("subject") or "").lower()]
-
-    # paging
+def _paging(default_limit):
+    """page_args() of the request, or an error response for a bad cursor."""
     try:
-        limit = int(request.args.get("limit", 100))
-        offset = int(request.args.get("offset", 0))
-    except Exception:
-        limit, offset = 100, 0
-
-    total = len(messages)
-    return jsonify({"items": messages[offset: offset + limit], "total": total})
+        return page_args(request.args, default_limit), None
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
 
 @artifacts_bp.route("/cases/<case_id>/media", methods=["GET"])
 def media(case_id):
-    parsed, err = _case_parsed(case_id)
-    if parsed is None:
+    paging, bad = _paging(None)
+    if bad:
+        return bad
+    case, err = _case_parsed(case_id)
+    if case is None:
         return jsonify({"error": err}), 404
-    files = parsed.get("files", [])
     # optional filter by mimetype or filename q
     q = request.args.get("q", "").strip().lower()
-    if q:
-        files = [f for f in files if q in (f.get("mimetype") or "").lower() or q in (f.get("local_path") or "").lower() or q in (f.get("mobile_path") or "").lower()]
-    return jsonify({"items": files, "total": len(files)})
+    if wants_ndjson(request):
+        return ndjson_response(case, partial(case.files, q=q, count=False), paging)
+    with case:
+        page = case.files(q=q, limit=paging["limit"], offset=paging["offset"], after=paging["after"],
+                          count=paging["total"] is None)
+    return jsonify(page_body(page, paging))
 
 @artifacts_bp.route("/cases/<case_id>/search", methods=["GET"])
 def search(case_id):
     """
-    Lightweight cross-type search: searches contacts + messages + filenames.
+    Cross-type search over contacts, messages and files, answered from the
+    case's text index (ranked: whole-word matches, then substring matches).
+    Cases without one are scanned: contacts, then messages, then files.
     Params:
       q (required)
-      limit, offset optional
+      limit, offset or cursor optional
     """
-    parsed, err = _case_parsed(case_id)
-    if parsed is None:
-        return jsonify({"error": err}), 404
-
     q = request.args.get("q", "").strip().lower()
     if not q:
         return jsonify({"error": "missing query parameter 'q'"}), 400
+    paging, bad = _paging(100)
+    if bad:
+        return bad
+    case, err = _case_parsed(case_id)
+    if case is None:
+        return jsonify({"error": err}), 404
 
-    hits = []
-    # contacts
-    for c in parsed.get("contacts", []):
-        if q in json.dumps(c).lower():
-            hits.append({"type": "contact", "obj": c})
-
-    # messages
-    for t in parsed.get("chat_threads", []):
-        for m in t.get("messages", []):
-            text = ((m.get("subject") or "") + " " + (m.get("body") or "")).lower()
-            if q in text:
-                item = dict(m); item["_thread_id"] = t.get("id")
-                hits.append({"type": "message", "obj": item})
-
-    # files
-    for f in parsed.get("files", []):
-        if q in json.dumps(f).lower():
-            hits.append({"type": "file", "obj": f})
-
-    try:
-        limit = int(request.args.get("limit", 100))
-        offset = int(request.args.get("offset", 0))
-    except Exception:
-        limit, offset = 100, 0
-
-    total = len(hits)
-    return jsonify({"hits": hits[offset:offset+limit], "total": total})
+    with case:
+        page = case.search(q, limit=paging["limit"], offset=paging["offset"])
+    return jsonify(page_body(page, paging, key="hits", by="offset"))
@@ -1,7 +1,16 @@
 from flask import Blueprint, jsonify, send_file, abort, request
 from pathlib import Path
+from functools import partial
 import json
 
+from app.services.parser.ufdr_archive import ensure_local_file
+from app.services.case_manager import case_manager
+from app.services.parser.parsed_writer import ENCODINGS, PARSED_FILE, encoded_path
+from app.services.storage.catalog import SORTS as CATALOG_SORTS, case_catalog, ms_to_iso
+from app.utils.cursor import page_args, page_body
+from app.utils.ndjson import ndjson_response, wants_ndjson
+from app.utils.timeutil import BUCKETS, parse_time_param
+
 cases_bp = Blueprint("cases_bp", __name__)
 
 CASES_ROOT = Path("data/cases")
@@ -10,48 +19,85 @@ def _case_dir(case_id: str) -> Path:
     return CASES_ROOT / case_id
 
 def _load_parsed(case_id: str):
-    p = _case_dir(case_id) / "parsed.json"
-    if not p.exists():
+    try:
+        return case_manager.get_parsed(_case_dir(case_id)), None
+    except FileNotFoundError:
         return None, f"parsed.json not found for case {case_id}"
+    except Exception as e:
+        return None, f"failed to load parsed.json: {e}"
+
+def _open_case(case_id: str):
+    """Queryable case: case.db, or parsed.json for older cases."""
     try:
-        with open(p, "r", encoding="utf-8") as f:
-            return json.load(f), None
+        return case_manager.open_case(_case_dir(case_id)), None
+    except FileNotFoundError:
+        return None, f"parsed.json not found for case {case_id}"
     except Exception as e:
         return None, f"failed to load parsed.json: {e}"
 
 @cases_bp.route("/cases", methods=["GET"])
 def list_cases():
-    """List case directories (brief summary)."""
-    out = []
-    if not CASES_ROOT.exists():
-        return jsonify(out)
-    for d in sorted(CASES_ROOT.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True):
-        if not d.is_dir():
-            continue
-        case_id = d.name
-        summary_path = d / "summary.json"
-        if summary_path.exists():
-            try:
-                with open(summary_path, "r", encoding="utf-8") as f:
-                    s = json.load(f)
-            except Exception:
-                s = {}
-        else:
-            s = {}
-        out.append({
-            "case_id": case_id,
-            "summary": s
-        })
-    return jsonify(out)
+    """
+    Cases from the case catalog, newest activity first.
+    Query: sort (updated_at | created_at | case_id | total_messages | ...),
+    order (asc | desc), status, owner, from / to (on updated_at), and
+    limit / cursor for pages ({"items", "total", "next"}); without them the
+    full list is returned. refresh=1 re-imports the case directories first.
+    """
+    try:
+        paging = page_args(request.args, None, compound=True)
+        window = (parse_time_param(request.args.get("from")), parse_time_param(request.args.get("to")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    sort = request.args.get("sort", "updated_at")
+    if sort not in CATALOG_SORTS:
+        return jsonify({"error": f"sort must be one of {sorted(CATALOG_SORTS)}"}), 400
+    order = request.args.get("order", "desc").lower()
+    if order not in ("asc", "desc"):
+        return jsonify({"error": "order must be asc or desc"}), 400
+    if request.args.get("refresh") in ("1", "true"):
+        case_catalog.rebuild()
+
+    page = case_catalog.list(limit=paging["limit"], offset=paging["offset"], after=paging["after"],
+                             sort=sort, descending=order == "desc",
+                             status=request.args.get("status") or None, owner=request.args.get("owner") or None,
+                             since=ms_to_iso(window[0]) if window[0] is not None else None,
+                             until=ms_to_iso(window[1]) if window[1] is not None else None,
+                             count=paging["total"] is None)
+    if paging["limit"] is None:
+        return jsonify(page.items)
+    return jsonify(page_body(page, paging))
 
 
 @cases_bp.route("/cases/<case_id>/parsed", methods=["GET"])
 def get_parsed(case_id):
-    """Return full parsed.json"""
-    parsed, err = _load_parsed(case_id)
-    if parsed is None:
-        return jsonify({"error": err}), 404
-    return jsonify(parsed)
+    """
+    Return full parsed.json: the file as written at parse time, or its
+    gzip / zstd copy when Accept-Encoding allows, with ETag / Last-Modified
+    (304) and Range support. ndjson-layout cases are assembled and jsonified.
+    """
+    path = _case_dir(case_id) / PARSED_FILE
+    if not path.is_file():
+        parsed, err = _load_parsed(case_id)
+        if parsed is None:
+            return jsonify({"error": err}), 404
+        return jsonify(parsed)
+
+    encoding = None
+    variants = [enc for enc in ENCODINGS if encoded_path(path.parent, enc).is_file()]
+    if variants:
+        encoding = request.accept_encodings.best_match(variants)
+    if encoding:
+        path = encoded_path(path.parent, encoding)
+    # send_file resolves relative paths against the app package, not the cwd;
+    # the download stays parsed.json whichever copy is sent
+    resp = send_file(path.resolve(), mimetype="application/json", download_name=PARSED_FILE,
+                     conditional=True, etag=True)
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    if variants:
+        resp.vary.add("Accept-Encoding")
+    return resp
 
 
 @cases_bp.route("/cases/<case_id>/summary", methods=["GET"])
@@ -80,77 +126,130 @@ def get_summary(case_id):
     return jsonify(summary)
 
 
+def _paging(default_limit):
+    """page_args() of the request, or an error response for a bad cursor."""
+    try:
+        return page_args(request.args, default_limit), None
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+
+
+def _time_window():
+    """`from` / `to` query args as epoch ms, or an error response."""
+    try:
+        return (parse_time_param(request.args.get("from")), parse_time_param(request.args.get("to"))), None
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+
+
 @cases_bp.route("/cases/<case_id>/contacts", methods=["GET"])
 def get_contacts(case_id):
-    parsed, err = _load_parsed(case_id)
-    if parsed is None:
+    """Contacts; all of them unless `limit` (or a `cursor`) is given. NDJSON on request."""
+    paging, bad = _paging(None)
+    if bad:
+        return bad
+    case, err = _open_case(case_id)
+    if case is None:
         return jsonify({"error": err}), 404
 
-    # optional search / pagination
+    # optional search
     q = request.args.get("q", "").lower().strip()
-    items = parsed.get("contacts", [])
-    if q:
-        items = [c for c in items if q in json.dumps(c).lower()]
-    return jsonify({"items": items, "total": len(items)})
+    if wants_ndjson(request):
+        return ndjson_response(case, partial(case.contacts, q=q, count=False), paging)
+    with case:
+        page = case.contacts(q=q, limit=paging["limit"], offset=paging["offset"], after=paging["after"],
+                             count=paging["total"] is None)
+    return jsonify(page_body(page, paging))
 
 
 @cases_bp.route("/cases/<case_id>/messages", methods=["GET"])
 def get_messages(case_id):
-    parsed, err = _load_parsed(case_id)
-    if parsed is None:
+    # paging: limit + offset, or the `next` cursor of the previous page;
+    # NDJSON (?format=ndjson) streams every message unless `limit` is given
+    ndjson = wants_ndjson(request)
+    paging, bad = _paging(None if ndjson else 100)
+    if bad:
+        return bad
+    case, err = _open_case(case_id)
+    if case is None:
         return jsonify({"error": err}), 404
 
-    # flatten threads -> messages list
-    messages = []
-    for thread in parsed.get("chat_threads", []):
-        for m in thread.get("messages", []):
-            msg = dict(m)  # copy
-            msg["_thread_id"] = thread.get("id")
-            messages.append(msg)
-
-    # optional filters: thread_id, q, paging
+    # optional filters: thread_id, q
     thread_id = request.args.get("thread_id")
     q = request.args.get("q", "").lower().strip()
-    if thread_id:
-        messages = [m for m in messages if m.get("_thread_id") == thread_id]
-    if q:
-        messages = [m for m in messages if q in (m.get("body") or "").lower() or q in (m.get("subject") or "").lower()]
 
-    # paging
-    try:
-        limit = int(request.args.get("limit", 100))
-        offset = int(request.args.get("offset", 0))
-    except Exception:
-        limit = 100
-        offset = 0
-
-    total = len(messages)
-    paged = messages[offset: offset + limit]
-    return jsonify({"items": paged, "total": total})
+    if ndjson:
+        return ndjson_response(case, partial(case.messages, thread_id=thread_id, q=q, count=False), paging)
+    with case:
+        page = case.messages(thread_id=thread_id, q=q, limit=paging["limit"], offset=paging["offset"],
+                             after=paging["after"], count=paging["total"] is None)
+    return jsonify(page_body(page, paging))
 
 
 @cases_bp.route("/cases/<case_id>/timeline", methods=["GET"])
 def get_timeline(case_id):
-    parsed, err = _load_parsed(case_id)
-    if parsed is None:
+    """
+    Timeline events in time order.
+    Params: from / to (epoch s or ms, or ISO 8601; `to` exclusive) restrict to
+    timed events in that window; limit, offset or cursor. With
+    ?format=ndjson every event (up to `limit`) is streamed, one per line.
+    """
+    ndjson = wants_ndjson(request)
+    paging, bad = _paging(None if ndjson else 200)
+    if bad:
+        return bad
+    window, bad = _time_window()
+    if bad:
+        return bad
+    case, err = _open_case(case_id)
+    if case is None:
         return jsonify({"error": err}), 404
 
-    events = parsed.get("events", [])
-    # allow time window / limit
-    try:
-        limit = int(request.args.get("limit", 200))
-    except Exception:
-        limit = 200
-    return jsonify({"items": events[:limit], "total": len(events)})
+    if ndjson:
+        return ndjson_response(case, partial(case.timeline, count=False, from_ms=window[0], to_ms=window[1]),
+                               paging)
+    with case:
+        page = case.timeline(limit=paging["limit"], offset=paging["offset"], after=paging["after"],
+                             count=paging["total"] is None, from_ms=window[0], to_ms=window[1])
+    return jsonify(page_body(page, paging))
+
+
+@cases_bp.route("/cases/<case_id>/timeline/histogram", methods=["GET"])
+def get_timeline_histogram(case_id):
+    """
+    Event counts per time bucket and event type.
+    Params: bucket = hour | day (default day), optional from / to as for /timeline.
+    Returns {"bucket", "bucket_ms", "buckets": [{"start", "total", "counts": {type: n}}], "untimed"}.
+    """
+    bucket = request.args.get("bucket", "day")
+    if bucket not in BUCKETS:
+        return jsonify({"error": f"bucket must be one of {', '.join(BUCKETS)}"}), 400
+    window, bad = _time_window()
+    if bad:
+        return bad
+    case, err = _open_case(case_id)
+    if case is None:
+        return jsonify({"error": err}), 404
+
+    with case:
+        return jsonify(case.histogram(bucket, from_ms=window[0], to_ms=window[1]))
 
 
 @cases_bp.route("/cases/<case_id>/files", methods=["GET"])
 def list_files(case_id):
-    parsed, err = _load_parsed(case_id)
-    if parsed is None:
+    """Files; all of them unless `limit` (or a `cursor`) is given. NDJSON on request."""
+    paging, bad = _paging(None)
+    if bad:
+        return bad
+    case, err = _open_case(case_id)
+    if case is None:
         return jsonify({"error": err}), 404
-    files = parsed.get("files", [])
-    return jsonify({"items": files, "total": len(files)})
+    if wants_ndjson(request):
+        return ndjson_response(case, partial(case.files, count=False), paging)
+    with case:
+        page = case.files(limit=paging["limit"], offset=paging["offset"], after=paging["after"],
+                          count=paging["total"] is None)
+    return jsonify(page_body(page, paging))
 
 
 @cases_bp.route("/cases/<case_id>/files/<file_id>", methods=["GET"])
@@ -159,23 +258,22 @@ def get_file(case_id, file_id):
     Try to resolve and stream a file. The parsed.json file entries should
     include local_path or mobile_path (absolute or relative). We try both.
     """
-    parsed, err = _load_parsed(case_id)
-    if parsed is None:
+    case, err = _open_case(case_id)
+    if case is None:
         return jsonify({"error": err}), 404
 
-    files = parsed.get("files", [])
+    with case:
+        f = case.file(file_id)
     target = None
-    for f in files:
-        if f.get("id") == file_id:
-            # check saved local_path first, then mobile_path
-            lp = f.get("local_path") or f.get("mobile_path")
-            if lp:
-                p = Path(lp)
-                if not p.is_absolute():
-                    p = _case_dir(case_id) / lp
-                if p.exists():
-                    target = p
-                    break
+    if f is not None:
+        # check saved local_path first, then mobile_path
+        lp = f.get("local_path") or f.get("mobile_path")
+        if lp:
+            p = Path(lp)
+            if not p.is_absolute():
+                p = _case_dir(case_id) / lp
+            # UFDR-backed cases extract tagged files on first access
+            target = ensure_local_file(_case_dir(case_id), p)
     if not target:
         return jsonify({"error": f"file {file_id} not found"}), 404
 
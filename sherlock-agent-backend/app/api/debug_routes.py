@@ -1,5 +1,8 @@
 # app/api/debug_routes.py
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, Response, jsonify, current_app
+
+from app.services.case_manager import case_manager
+from app.utils.metrics import metrics
 
 debug_bp = Blueprint("debug_bp", __name__)
 
@@ -9,3 +12,16 @@ def list_routes():
     for rule in current_app.url_map.iter_rules():
         routes.append({"rule": str(rule), "endpoint": rule.endpoint, "methods": sorted(list(rule.methods))})
     return jsonify(sorted(routes, key=lambda r: r["rule"]))
+
+@debug_bp.route("/_cache", methods=["GET"])
+def cache_stats():
+    """Hit / miss / eviction counters of the shared case cache."""
+    return jsonify(case_manager.stats())
+
+@debug_bp.route("/_metrics", methods=["GET"])
+def prometheus_metrics():
+    """Request latency, parse stage timings and case cache counters, Prometheus text format."""
+    cache = case_manager.stats()
+    extra = {f"sherlock_case_cache_{k}": {"help": f"Case cache {k.replace('_', ' ')}.", "value": v}
+             for k, v in cache.items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+    return Response(metrics.render(extra), mimetype="text/plain; version=0.0.4")
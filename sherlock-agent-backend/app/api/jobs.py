@@ -0,0 +1,33 @@
+# app/api/jobs.py
+from flask import Blueprint, jsonify
+
+from app.services.job_queue import job_queue
+
+jobs_bp = Blueprint("jobs_bp", __name__)
+
+@jobs_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """Status, progress counters and (when done) summary of a parse job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"job {job_id} not found"}), 404
+    return jsonify(job)
+
+@jobs_bp.route("/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    """Cancel a queued or running job; the returned status turns to cancelled once the worker stops."""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({"error": f"job {job_id} not found"}), 404
+    return jsonify(job)
+
+@jobs_bp.route("/jobs/<job_id>/resume", methods=["POST"])
+def resume_job(job_id):
+    """Re-queue a failed, cancelled or lost job; it continues from the case's checkpoint when one is left."""
+    try:
+        job = job_queue.resume(job_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    if job is None:
+        return jsonify({"error": f"job {job_id} not found"}), 404
+    return jsonify(job), 202
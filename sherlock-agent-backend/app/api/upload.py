@@ -1,13 +1,46 @@
 from flask import Blueprint, request, jsonify
 from pathlib import Path
+import os
 import uuid
 import shutil
 
 from app.utils.validators import validate_upload, is_allowed_file
+from app import config
 from app.services.parser.case_parser import parse_uploaded_file
+from app.services.parser.json_stream import JSONStreamError
+from app.services.job_queue import job_queue
+from app.services.upload_store import UploadError, upload_store
 
 upload_bp = Blueprint("upload_bp", __name__)
 
+CASES_ROOT = Path("data/cases")
+
+def _new_case_id():
+    return f"case_{uuid.uuid4().hex[:8]}"
+
+def _start_parse(path: Path, case_id: str, owner, extra=None):
+    """Queue (or, with JOB_WORKERS=0, run) the parse of an upload already inside its case dir."""
+    body = {"case_id": case_id, "ok": True}
+    body.update(extra or {})
+    if config.JOB_WORKERS > 0:
+        # parse in the background; poll /api/jobs/<job_id>
+        job = job_queue.submit(path, case_id, owner=owner)
+        body.update(job_id=job["job_id"], status=job["status"])
+        return jsonify(body), 202
+
+    try:
+        parsed_summary = parse_uploaded_file(str(path), case_id, owner=owner)
+    except JSONStreamError as e:
+        # validate_upload only checks the shape; syntax errors surface in the parse
+        return jsonify({"error": f"Invalid JSON: {e}", "case_id": case_id}), 400
+
+    body["summary"] = {
+        "total_contacts": parsed_summary.get("total_contacts", 0),
+        "total_messages": parsed_summary.get("total_messages", 0),
+        "total_files": parsed_summary.get("total_files", 0),
+    }
+    return jsonify(body), 200
+
 @upload_bp.route("/upload", methods=["POST"])
 def upload_file():
     if "file" not in request.files:
@@ -36,17 +69,81 @@ def upload_file():
         return jsonify({"error": err}), 400
 
     # --- PARSE FILE ---
-    case_id = f"case_{uuid.uuid4().hex[:8]}"
-    parsed = parse_uploaded_file(str(saved_path), case_id)
+    # move (not copy) the upload into its case dir
+    case_id = _new_case_id()
+    case_dir = CASES_ROOT / case_id
+    case_dir.mkdir(parents=True, exist_ok=True)
+    case_path = case_dir / saved_path.name
+    try:
+        os.replace(saved_path, case_path)
+    except OSError:
+        shutil.move(str(saved_path), str(case_path))  # data/uploads on another filesystem
+    owner = (request.form.get("owner") or "").strip() or None
+    return _start_parse(case_path, case_id, owner)
 
-    summary = {
-        "total_contacts": len(parsed.get("contacts", [])),
-        "total_messages": sum(len(t.get("messages", [])) for t in parsed.get("chat_threads", [])),
-        "total_files": len(parsed.get("files", [])),
-    }
 
-    return jsonify({
-        "case_id": case_id,
-        "ok": True,
-        "summary": summary
-    }), 200
+# --- chunked, resumable uploads (see services/upload_store.py) ---
+def _upload_error(e: UploadError):
+    body = {"error": str(e)}
+    if e.offset is not None:
+        body["offset"] = e.offset
+    return jsonify(body), e.status
+
+@upload_bp.route("/uploads", methods=["POST"])
+def create_upload():
+    """Body JSON: {"filename", "size", "sha256" (optional, checked on complete), "owner" (optional)}."""
+    data = request.get_json(silent=True) or {}
+    filename = data.get("filename") or ""
+    if not is_allowed_file(filename):
+        return jsonify({"error": "invalid file type"}), 400
+    try:
+        size = int(data.get("size"))
+        state = upload_store.create(filename, size, sha256=data.get("sha256"),
+                                    owner=(data.get("owner") or "").strip() or None)
+    except (TypeError, ValueError):
+        return jsonify({"error": "size must be an integer"}), 400
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify(state), 201
+
+@upload_bp.route("/uploads/<upload_id>", methods=["GET"])
+def get_upload(upload_id):
+    """State of an upload; `offset` is where the next chunk starts."""
+    try:
+        return jsonify(upload_store.status(upload_id))
+    except UploadError as e:
+        return _upload_error(e)
+
+@upload_bp.route("/uploads/<upload_id>", methods=["PATCH", "PUT"])
+def append_upload(upload_id):
+    """
+    Raw request body = the next chunk. Its position goes in the Upload-Offset
+    header (or ?offset=) and must equal the current offset; on 409 the
+    response carries the offset to resume from.
+    """
+    raw = request.headers.get("Upload-Offset", request.args.get("offset"))
+    try:
+        offset = int(raw)
+    except (TypeError, ValueError):
+        return jsonify({"error": "missing or invalid Upload-Offset"}), 400
+    try:
+        state = upload_store.append(upload_id, offset, request.stream, request.content_length)
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify(state)
+
+@upload_bp.route("/uploads/<upload_id>/complete", methods=["POST"])
+def complete_upload(upload_id):
+    """Validate, move into a new case dir and start the parse, as POST /upload does."""
+    try:
+        state = upload_store.status(upload_id)
+        if state["status"] == "uploading" and state["offset"] == state["size"]:
+            ok, err = validate_upload(upload_store.data_path(upload_id), name=state["filename"])
+            if not ok:
+                return jsonify({"error": err}), 400
+        case_id = _new_case_id()
+        state = upload_store.complete(upload_id, CASES_ROOT / case_id)
+    except UploadError as e:
+        return _upload_error(e)
+    return _start_parse(Path(state["path"]), case_id, state.get("owner"),
+                        extra={"upload_id": upload_id, "sha256": state["sha256"]})
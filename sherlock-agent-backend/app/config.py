@@ -0,0 +1,73 @@
+# app/config.py
+"""
+Runtime knobs, read from the environment (a .env file is honoured when
+python-dotenv is installed). See .env.example for the full list.
+"""
+import os
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except Exception:
+    pass
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# --- parsing ---
+# number of worker processes used to parse decodedData / taggedFiles chunks.
+# 1 keeps the single-process iterparse path.
+PARSE_WORKERS = _int_env("PARSE_WORKERS", 1)
+# target size (bytes) of one chunk handed to a parse worker
+PARSE_CHUNK_BYTES = _int_env("PARSE_CHUNK_BYTES", 16 * 1024 * 1024)
+# entries per identifier normalization / validation cache (account_tools)
+IDENTIFIER_CACHE_SIZE = _int_env("IDENTIFIER_CACHE_SIZE", 65536)
+
+# --- output ---
+# parsed output layout: pretty (indented parsed.json), compact, or ndjson
+# (parsed/<collection>.ndjson)
+PARSED_FORMAT = os.getenv("PARSED_FORMAT", "pretty").strip().lower()
+# precompressed copies of parsed.json served by /cases/<id>/parsed: any of
+# gzip, zstd (needs the optional zstandard package), comma-separated; empty = none
+PARSED_ENCODINGS = [e.strip().lower() for e in os.getenv("PARSED_ENCODINGS", "gzip").split(",") if e.strip()]
+# timeline events held in memory before a sorted run is spilled to disk
+EVENT_SORT_RUN_SIZE = _int_env("EVENT_SORT_RUN_SIZE", 100000)
+
+# --- parse jobs ---
+# worker processes running uploaded parses in the background; 0 = parse inside the upload request
+JOB_WORKERS = _int_env("JOB_WORKERS", 2)
+# uploads of at least JOB_LARGE_BYTES count as large; at most JOB_MAX_LARGE of them parse at once
+JOB_LARGE_BYTES = _int_env("JOB_LARGE_BYTES", 1024 * 1024 * 1024)
+JOB_MAX_LARGE = _int_env("JOB_MAX_LARGE", 1)
+# a job whose worker process dies (killed, OOM) is re-queued this many times, resuming from its checkpoint
+JOB_RETRIES = _int_env("JOB_RETRIES", 1)
+
+# --- checkpoints ---
+# seconds between parse checkpoints (data/cases/<id>/checkpoint.pkl); 0 = off
+CHECKPOINT_INTERVAL_S = _int_env("CHECKPOINT_INTERVAL_S", 300)
+# additionally checkpoint every N top-level elements; 0 = off
+CHECKPOINT_EVERY_UNITS = _int_env("CHECKPOINT_EVERY_UNITS", 0)
+
+# --- case store ---
+# write data/cases/<id>/case.db (indexed SQLite) at parse time; 0 = parsed.json only
+CASE_STORE = _int_env("CASE_STORE", 1)
+# build the FTS5 text index (token + trigram) in case.db for /search and ?q= filters
+SEARCH_INDEX = _int_env("SEARCH_INDEX", 1)
+# keep message bodies in an mmap-read blob file next to case.db instead of in SQLite
+MESSAGE_BODY_BLOB = _int_env("MESSAGE_BODY_BLOB", 1)
+# budget (estimated bytes of decoded cases) of the shared case cache (case_manager)
+CASE_CACHE_MAX_BYTES = _int_env("CASE_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+
+# --- mongo ---
+# ingest parsed cases into MongoDB at parse time; empty = off,
+# "memory://" = in-process stand-in (development / benchmarks)
+MONGO_URI = os.getenv("MONGO_URI", "").strip()
+MONGO_DB = os.getenv("MONGO_DB", "sherlock")
+# documents per insert_many and batches allowed in flight at once
+MONGO_BATCH_SIZE = _int_env("MONGO_BATCH_SIZE", 1000)
+MONGO_MAX_IN_FLIGHT = _int_env("MONGO_MAX_IN_FLIGHT", 4)
@@ -6,16 +6,20 @@ from app.api.cases import cases_bp
 from app.api.artifacts import artifacts_bp
 from app.api.analysis import analysis_bp
 from app.api.debug_routes import debug_bp
+from app.api.jobs import jobs_bp
+from app.utils import metrics
 
 
 def create_app():
     app = Flask(__name__)
     CORS(app)
+    metrics.init_app(app)
     app.register_blueprint(upload_bp, url_prefix="/api")
     app.register_blueprint(cases_bp, url_prefix="/api")
     app.register_blueprint(artifacts_bp, url_prefix="/api")
     app.register_blueprint(analysis_bp, url_prefix="/api")
     app.register_blueprint(debug_bp, url_prefix="/api")
+    app.register_blueprint(jobs_bp, url_prefix="/api")
 
     return app
 
@@ -0,0 +1,173 @@
+# app/services/case_manager.py
+"""
+Process-wide cache of decoded cases, shared by all blueprints.
+- bounded by the total estimated size of the cached cases (not their count),
+  least recently used first out
+- an entry is reloaded when parsed.json (or parsed/header.json) changes
+  mtime or size, e.g. after a re-parse
+- concurrent requests for the same cold case wait for one load instead of
+  decoding the file once each
+- hit / miss / load / eviction counters for the debug route
+
+Cached dicts are shared between requests: treat them as read-only.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app import config
+from app.services.parser.parsed_writer import PARSED_FILE, NDJSON_DIR, HEADER_FILE, load_parsed
+from app.services.storage.case_store import open_case as _open_case
+
+logger = logging.getLogger("case_manager")
+
+# decoded size / file size: about 2.5 for indented parsed.json, 4 for compact
+DECODED_SIZE_FACTOR = 3
+
+
+def _source_stat(case_dir: Path) -> Tuple[Path, Tuple[int, int]]:
+    """The file that identifies the current parse and its (mtime_ns, size)."""
+    for p in (case_dir / PARSED_FILE, case_dir / NDJSON_DIR / HEADER_FILE):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        size = st.st_size
+        if p.name == HEADER_FILE:
+            size = sum(f.stat().st_size for f in p.parent.iterdir() if f.is_file())
+        return p, (st.st_mtime_ns, size)
+    raise FileNotFoundError(f"{PARSED_FILE} not found in {case_dir}")
+
+
+class _Entry:
+    __slots__ = ("value", "stamp", "nbytes")
+
+    def __init__(self, value, stamp, nbytes):
+        self.value = value
+        self.stamp = stamp
+        self.nbytes = nbytes
+
+
+class _Loading:
+    """One in-flight load; followers wait on `done`."""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class CaseManager:
+    def __init__(self, max_bytes: int, size_factor: int = DECODED_SIZE_FACTOR):
+        self.max_bytes = max_bytes
+        self.size_factor = size_factor
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._loading: Dict[str, _Loading] = {}
+        self._bytes = 0
+        self.metrics = {"hits": 0, "misses": 0, "coalesced": 0, "loads": 0, "load_errors": 0,
+                        "load_seconds": 0.0, "evictions": 0, "invalidations": 0, "uncacheable": 0}
+
+    # --- public API ---
+    def get_parsed(self, case_dir: Path) -> Dict[str, Any]:
+        """Decoded parsed.json of a case. Raises FileNotFoundError if there is none."""
+        case_dir = Path(case_dir)
+        key = str(case_dir.resolve())
+        _, stamp = _source_stat(case_dir)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.stamp == stamp:
+                    self._entries.move_to_end(key)
+                    self.metrics["hits"] += 1
+                    return entry.value
+                # parsed output changed on disk
+                self._drop(key)
+                self.metrics["invalidations"] += 1
+            loading = self._loading.get(key)
+            leader = loading is None
+            if leader:
+                loading = _Loading()
+                self._loading[key] = loading
+                self.metrics["misses"] += 1
+            else:
+                self.metrics["coalesced"] += 1
+        if not leader:
+            loading.done.wait()
+            if loading.error is not None:
+                raise loading.error
+            return loading.value
+        try:
+            t0 = time.perf_counter()
+            value = load_parsed(case_dir)
+            elapsed = time.perf_counter() - t0
+            # the file may have been replaced while it was read: stamp before loading wins
+            nbytes = stamp[1] * self.size_factor
+            with self._lock:
+                self.metrics["loads"] += 1
+                self.metrics["load_seconds"] += elapsed
+                self._store(key, _Entry(value, stamp, nbytes))
+            loading.value = value
+            return value
+        except BaseException as e:
+            with self._lock:
+                self.metrics["load_errors"] += 1
+            loading.error = e
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            loading.done.set()
+
+    def open_case(self, case_dir: Path):
+        """Queryable case (case_store.open_case) whose parsed.json fallback is cached."""
+        return _open_case(case_dir, load=self.get_parsed)
+
+    def invalidate(self, case_dir: Path):
+        key = str(Path(case_dir).resolve())
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+                self.metrics["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.metrics)
+            out["load_seconds"] = round(out["load_seconds"], 3)
+            out.update({"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                        "in_flight": len(self._loading)})
+        lookups = out["hits"] + out["misses"] + out["coalesced"]
+        out["hit_ratio"] = round(out["hits"] / lookups, 4) if lookups else None
+        return out
+
+    # --- internals (call with the lock held) ---
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
+
+    def _store(self, key: str, entry: _Entry):
+        if key in self._entries:
+            self._drop(key)
+        if entry.nbytes > self.max_bytes:
+            # larger than the whole budget: serve it, don't keep it
+            self.metrics["uncacheable"] += 1
+            return
+        self._entries[key] = entry
+        self._bytes += entry.nbytes
+        while self._bytes > self.max_bytes:
+            old_key, _ = next(iter(self._entries.items()))
+            self._drop(old_key)
+            self.metrics["evictions"] += 1
+            logger.debug("evicted %s", old_key)
+
+
+case_manager = CaseManager(max_bytes=config.CASE_CACHE_MAX_BYTES)
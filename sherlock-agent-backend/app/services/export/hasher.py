@@ -0,0 +1,49 @@
+# app/services/export/hasher.py
+"""
+Digests of evidence files.
+
+- file_digest(path): one streaming pass over a file
+- RollingDigest: digest of a file that grows in chunks (resumable uploads),
+  fed with each chunk as it is written, so the digest is ready when the last
+  byte lands. hashlib state cannot be saved, so a RollingDigest that lost
+  track of the file (server restart, another process took a chunk) is
+  rebuilt from the bytes already on disk with RollingDigest.of_file().
+"""
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_ALGORITHM = "sha256"
+_READ_BYTES = 1024 * 1024
+
+
+class RollingDigest:
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM):
+        self.algorithm = algorithm
+        self._hash = hashlib.new(algorithm)
+        # bytes digested so far
+        self.offset = 0
+
+    def update(self, data: bytes):
+        self._hash.update(data)
+        self.offset += len(data)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    @classmethod
+    def of_file(cls, path: Path, algorithm: str = DEFAULT_ALGORITHM, limit: Optional[int] = None) -> "RollingDigest":
+        """Digest of the first `limit` bytes of `path` (all of it by default)."""
+        digest = cls(algorithm)
+        with open(path, "rb") as f:
+            while limit is None or digest.offset < limit:
+                want = _READ_BYTES if limit is None else min(_READ_BYTES, limit - digest.offset)
+                block = f.read(want)
+                if not block:
+                    break
+                digest.update(block)
+        return digest
+
+
+def file_digest(path: Path, algorithm: str = DEFAULT_ALGORITHM) -> str:
+    return RollingDigest.of_file(path, algorithm).hexdigest()
@@ -0,0 +1,286 @@
+# app/services/job_queue.py
+"""
+Background parse jobs.
+
+/upload enqueues a job and returns at once. A dispatcher thread starts
+queued jobs, oldest first, each in its own worker process (spawned, so
+the parse owns the whole interpreter and its memory goes back to the OS
+when it ends). Two limits apply:
+- config.JOB_WORKERS      : parses running at once
+- config.JOB_MAX_LARGE    : of those, uploads of config.JOB_LARGE_BYTES or
+                            more; smaller jobs may pass a large one that is
+                            waiting for a slot
+
+State lives in data/jobs/<job_id>/ so any server process can answer
+/jobs/<id>:
+- job.json      : status (queued / running / done / failed / cancelled),
+                  case_id, file, times, error, summary; written by the queue
+- progress.json : ParseStats.progress() (stage, bytes read, models per type
+                  ...), written by the worker about once a second
+- result.json   : the worker's outcome, folded into job.json by the queue
+- cancel        : marker; a queued job is dropped, a running parse is
+                  interrupted (its writers abort, earlier outputs stay)
+
+Parses checkpoint (config.CHECKPOINT_*), and a job picks its checkpoint
+up again instead of starting over:
+- a worker that dies without a result (killed, OOM) is re-queued with
+  resume=True, up to config.JOB_RETRIES times
+- POST /jobs/<id>/resume re-queues a failed, cancelled or lost job (one
+  whose server process is gone) the same way
+The checkpoint stays with the case until a parse of it completes (or a
+fresh upload of the case starts over), so a job that failed, was
+cancelled or ran out of retries resumes where its last checkpoint left
+off. JSON uploads are not checkpointed and always start over.
+"""
+import os
+import json
+import uuid
+import logging
+import _thread
+import threading
+import multiprocessing
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app import config
+from app.services.storage.catalog import case_catalog, now_iso
+from app.utils.metrics import metrics
+
+logger = logging.getLogger("job_queue")
+
+JOBS_ROOT = Path("data") / "jobs"
+JOB_FILE = "job.json"
+PROGRESS_FILE = "progress.json"
+RESULT_FILE = "result.json"
+CANCEL_FILE = "cancel"
+
+PROGRESS_INTERVAL_S = 1.0
+POLL_S = 0.5
+ACTIVE = ("queued", "running")
+RESUMABLE = ("failed", "cancelled", "lost")
+
+
+def _write_json(path: Path, obj: Dict[str, Any]):
+    tmp = path.with_name(path.name + ".part")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# --- worker process ---
+def _run_job(job_dir: str, file_path: str, case_id: str, owner: Optional[str], resume: bool = False):
+    """Entry point of a worker process: parse, reporting progress and watching for the cancel marker."""
+    from app.services.parser.case_parser import parse_uploaded_file
+
+    job_dir = Path(job_dir)
+    live: Dict[str, Any] = {}
+    finished = threading.Event()
+
+    def report():
+        while not finished.wait(PROGRESS_INTERVAL_S):
+            stats = live.get("stats")
+            if stats is not None:
+                _write_json(job_dir / PROGRESS_FILE, stats.progress())
+            if (job_dir / CANCEL_FILE).exists():
+                _thread.interrupt_main()  # KeyboardInterrupt in the parse
+                return
+
+    reporter = threading.Thread(target=report, name="job-progress", daemon=True)
+    reporter.start()
+    try:
+        summary = parse_uploaded_file(file_path, case_id, owner=owner, resume=resume,
+                                      on_stats=lambda stats: live.__setitem__("stats", stats))
+        result = {"status": "done", "summary": summary}
+    except KeyboardInterrupt:
+        result = {"status": "cancelled"}
+    except Exception as e:
+        logger.exception("job %s failed", job_dir.name)
+        result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+    finally:
+        finished.set()
+        reporter.join()
+    if live.get("stats") is not None:
+        _write_json(job_dir / PROGRESS_FILE, live["stats"].progress())
+    _write_json(job_dir / RESULT_FILE, result)
+
+
+# --- queue ---
+class JobQueue:
+    def __init__(self, root: Path = JOBS_ROOT, workers: int = 2, max_large: int = 1,
+                 large_bytes: int = 1024 ** 3):
+        self.root = Path(root)
+        self.workers = max(1, workers)
+        self.max_large = max(1, max_large)
+        self.large_bytes = large_bytes
+        self._queued: deque = deque()
+        self._running: Dict[str, Any] = {}    # job_id -> (process, job)
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._mp = multiprocessing.get_context("spawn")
+
+    def _dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def _save(self, job: Dict[str, Any]):
+        job["updated_at"] = now_iso()
+        _write_json(self._dir(job["job_id"]) / JOB_FILE, job)
+
+    # --- API ---
+    def submit(self, file_path: Path, case_id: str, owner: Optional[str] = None) -> Dict[str, Any]:
+        file_path = Path(file_path)
+        job_id = f"job_{uuid.uuid4().hex[:12]}"
+        self._dir(job_id).mkdir(parents=True, exist_ok=True)
+        job = {"job_id": job_id, "case_id": case_id, "status": "queued", "file": str(file_path),
+               "bytes": file_path.stat().st_size, "owner": owner, "created_at": now_iso(),
+               "started_at": None, "finished_at": None, "error": None, "summary": None,
+               "server_pid": os.getpid(), "resume": False, "attempts": 0}
+        self._save(job)
+        self._enqueue(job)
+        logger.info("job %s queued: case %s, %s (%d bytes)", job_id, case_id, file_path.name, job["bytes"])
+        return job
+
+    def resume(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Re-queue a failed / cancelled / lost job, continuing from the case's
+        checkpoint when there is one. Raises ValueError for other states.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job["status"] not in RESUMABLE:
+            raise ValueError(f"job {job_id} is {job['status']}; only {', '.join(RESUMABLE)} jobs can resume")
+        d = self._dir(job_id)
+        for name in (CANCEL_FILE, RESULT_FILE):
+            (d / name).unlink(missing_ok=True)
+        job.pop("progress", None)
+        # a lost job is adopted by this server
+        job.update(status="queued", resume=True, attempts=0, server_pid=os.getpid(), finished_at=None, error=None)
+        self._save(job)
+        self._enqueue(job)
+        logger.info("job %s re-queued to resume case %s", job_id, job["case_id"])
+        return self.get(job_id)
+
+    def _enqueue(self, job: Dict[str, Any]):
+        try:
+            case_catalog.begin_case(job["case_id"], owner=job.get("owner"), source=Path(job["file"]).name,
+                                    status="queued")
+        except Exception:
+            logger.exception("case catalog update failed for %s", job["case_id"])
+        with self._cond:
+            self._queued.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="job-dispatch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """job.json plus the latest progress.json, from disk (works for jobs of other server processes)."""
+        job = _read_json(self._dir(job_id) / JOB_FILE)
+        if job is None:
+            return None
+        job["progress"] = _read_json(self._dir(job_id) / PROGRESS_FILE)
+        if job["status"] in ACTIVE and not _pid_alive(job.get("server_pid")):
+            job["status"] = "lost"   # the server process that owned the job is gone
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        d = self._dir(job_id)
+        job = _read_json(d / JOB_FILE)
+        if job is None:
+            return None
+        if job["status"] in ACTIVE:
+            (d / CANCEL_FILE).touch()
+            with self._cond:
+                self._cond.notify()
+        return self.get(job_id)
+
+    # --- dispatcher ---
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._reap()
+                self._drop_cancelled()
+                self._start_ready()
+                self._cond.wait(POLL_S)
+
+    def _reap(self):
+        for job_id, (proc, job) in list(self._running.items()):
+            if proc.is_alive():
+                continue
+            proc.join()
+            del self._running[job_id]
+            result = _read_json(self._dir(job_id) / RESULT_FILE)
+            if result is None:
+                # the worker died mid-parse: continue from its last checkpoint
+                error = f"worker exited with code {proc.exitcode}"
+                if job.get("attempts", 1) <= config.JOB_RETRIES and not (self._dir(job_id) / CANCEL_FILE).exists():
+                    logger.warning("job %s: %s; resuming from its checkpoint", job_id, error)
+                    job.update(status="queued", resume=True, error=error)
+                    self._save(job)
+                    self._queued.appendleft(job)
+                    continue
+                result = {"status": "failed", "error": error}
+            job.update(status=result["status"], error=result.get("error"), summary=result.get("summary"),
+                       finished_at=now_iso())
+            self._save(job)
+            if job["status"] != "done":
+                self._catalog_status(job)
+            # the worker's own metrics die with it
+            metrics.record_parse(job["status"], (job.get("summary") or {}).get("parse_stats"))
+            logger.info("job %s %s", job_id, job["status"])
+
+    def _drop_cancelled(self):
+        for job in [j for j in self._queued if (self._dir(j["job_id"]) / CANCEL_FILE).exists()]:
+            self._queued.remove(job)
+            job.update(status="cancelled", finished_at=now_iso())
+            self._save(job)
+            self._catalog_status(job)
+
+    def _start_ready(self):
+        large = sum(1 for _, job in self._running.values() if job["bytes"] >= self.large_bytes)
+        for job in list(self._queued):
+            if len(self._running) >= self.workers:
+                return
+            is_large = job["bytes"] >= self.large_bytes
+            if is_large and large >= self.max_large:
+                continue
+            self._queued.remove(job)
+            proc = self._mp.Process(target=_run_job, name=f"parse-{job['job_id']}",
+                                    args=(str(self._dir(job["job_id"])), job["file"], job["case_id"], job["owner"],
+                                          bool(job.get("resume"))))
+            proc.start()
+            self._running[job["job_id"]] = (proc, job)
+            large += is_large
+            job.update(status="running", started_at=now_iso(), worker_pid=proc.pid,
+                       attempts=job.get("attempts", 0) + 1)
+            self._save(job)
+
+    @staticmethod
+    def _catalog_status(job: Dict[str, Any]):
+        try:
+            case_catalog.set_status(job["case_id"], job["status"], error=job.get("error"))
+        except Exception:
+            logger.exception("case catalog update failed for %s", job["case_id"])
+
+
+job_queue = JobQueue(workers=config.JOB_WORKERS, max_large=config.JOB_MAX_LARGE,
+                     large_bytes=config.JOB_LARGE_BYTES)
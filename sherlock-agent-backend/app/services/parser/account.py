@@ -1,9 +1,16 @@
 # app/services/parser/account.py
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import Optional
 from . import account_tools
 
-@dataclass(eq=True, frozen=True)
+
+def _intern(value):
+    # share one copy of repeated identifiers across the (many) Account objects
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(eq=True, frozen=True, slots=True)
 class Account:
     """
     Account object similar to the Java port.
@@ -44,10 +51,14 @@ class Account:
 
     type: str
     identifier: Optional[str]
+    # computed once in __post_init__; not part of equality / hashing
+    _base_identifier: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        # dataclass frozen True prevents attribute mutation; nothing else needed
-        pass
+        # frozen dataclass: bypass __setattr__ for interning and the derived value
+        object.__setattr__(self, "type", _intern(self.type))
+        object.__setattr__(self, "identifier", _intern(self.identifier))
+        object.__setattr__(self, "_base_identifier", _intern(self._compute_base_identifier()))
 
     # ---- helper constructors ----
     @staticmethod
@@ -90,6 +101,9 @@ class Account:
         return True
 
     def base_identifier(self) -> Optional[str]:
+        return self._base_identifier
+
+    def _compute_base_identifier(self) -> Optional[str]:
         if self.type in {Account.Type.PHONE, Account.Type.SMS, Account.Type.IMESSAGE, Account.Type.WHATSAPP}:
             # prefer phone when possible
             if account_tools.is_valid_phone_number(self.identifier):
@@ -1,19 +1,48 @@
 # account_manager.py
+import heapq
 from typing import List, Dict
 from .contact import Contact
 from .account import Account
 
 
+def _append_unique(bucket: List[Contact], contact: Contact):
+    # contacts compare by value, the indexes track identity
+    for c in bucket:
+        if c is contact:
+            return
+    bucket.append(contact)
+
+
+def _remove_identity(index: Dict, key, contact: Contact):
+    bucket = index.get(key)
+    if not bucket:
+        return
+    for k, c in enumerate(bucket):
+        if c is contact:
+            del bucket[k]
+            break
+    if not bucket:
+        del index[key]
+
+
 class AccountManager:
+    """
+    Owns the contacts of a case plus two lookup indexes
+    (account -> contacts, base identifier -> contacts). The indexes are kept
+    up to date on add / merge / remove, so lookups stay O(1) while handlers
+    interleave inserts and queries. Contacts must not gain accounts behind
+    the manager's back once added (use add_account_to_contact).
+    """
+
     def __init__(self):
         self.contacts: List[Contact] = []
-        self._account_contact_map = None
-        self._base_identifier_contact_map = None
+        self._account_contact_map: Dict[Account, List[Contact]] = {}
+        self._base_identifier_contact_map: Dict[str, List[Contact]] = {}
         self.chat_threads = []  # placeholder list for ChatThread objects
 
     def add_contact(self, contact: Contact):
         self.contacts.append(contact)
-        self._invalidate_maps()
+        self._index_contact(contact)
         return contact
 
     def add_contact_from_name_accounts(self, name: str, accounts):
@@ -23,50 +52,132 @@ class AccountManager:
             c.add_account(a)
         return self.add_contact(c)
 
-    def _invalidate_maps(self):
-        self._account_contact_map = None
-        self._base_identifier_contact_map = None
-
-    def _build_maps(self):
-        if self._account_contact_map is None:
-            m = {}
-            for contact in self.contacts:
-                for acct in contact.accounts:
-                    m.setdefault(acct, []).append(contact)
-            self._account_contact_map = m
-        if self._base_identifier_contact_map is None:
-            m2 = {}
-            for contact in self.contacts:
-                for bi in contact.base_identifiers:
-                    m2.setdefault(bi, []).append(contact)
-            self._base_identifier_contact_map = m2
+    def add_account_to_contact(self, contact: Contact, account: Account):
+        contact.add_account(account)
+        bi = account.base_identifier()
+        self._index_contact(contact, [account], [bi] if bi else [])
+
+    def remove_contact(self, contact: Contact):
+        for k, c in enumerate(self.contacts):
+            if c is contact:
+                del self.contacts[k]
+                break
+        self._unindex_contact(contact)
+
+    def _index_contact(self, contact: Contact, accounts=None, base_identifiers=None):
+        # optional accounts / base_identifiers restrict the update to new keys
+        for acct in contact.accounts if accounts is None else accounts:
+            _append_unique(self._account_contact_map.setdefault(acct, []), contact)
+        for bi in contact.base_identifiers if base_identifiers is None else base_identifiers:
+            _append_unique(self._base_identifier_contact_map.setdefault(bi, []), contact)
+
+    def _unindex_contact(self, contact: Contact):
+        for acct in contact.accounts:
+            _remove_identity(self._account_contact_map, acct, contact)
+        for bi in contact.base_identifiers:
+            _remove_identity(self._base_identifier_contact_map, bi, contact)
+
+    def rebuild_indexes(self):
+        """Recompute both indexes from self.contacts (after bulk edits of the list)."""
+        self._account_contact_map = {}
+        self._base_identifier_contact_map = {}
+        for contact in self.contacts:
+            self._index_contact(contact)
 
     def get_contacts_for_account(self, account: Account):
-        self._build_maps()
         return self._account_contact_map.get(account, [])
 
     def get_contacts_for_base_identifier(self, base_identifier: str):
-        self._build_maps()
         return self._base_identifier_contact_map.get(base_identifier, [])
 
     def merge_candidates(self):
-        finished = False
-        while not finished:
-            finished = True
-            i = 0
-            while i < len(self.contacts):
-                j = i + 1
-                while j < len(self.contacts):
-                    c1 = self.contacts[i]
-                    c2 = self.contacts[j]
-                    if c1.can_be_merged(c2):
-                        c1.merge(c2)
-                        self.contacts.pop(j)
-                        finished = False
-                    else:
-                        j += 1
-                i += 1
-        self._invalidate_maps()
+        """
+        Merge contacts that share a base identifier and pass Contact.can_be_merged.
+        Candidates are blocked through an inverted index base_identifier -> contacts
+        and merged with union-find, so only contacts sharing an identifier are ever
+        compared. Pairs are visited in the order of the former pairwise loop (earlier
+        contact absorbs later ones, ascending), which keeps the result identical:
+        the first pass looks at every sharing pair, later passes only at pairs
+        touching a contact that absorbed another one since the previous pass.
+        """
+        contacts = self.contacts
+        n = len(contacts)
+        parent = list(range(n))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        index: Dict[str, List[int]] = {}
+        for i, c in enumerate(contacts):
+            for bi in c.base_identifiers:
+                index.setdefault(bi, []).append(i)
+
+        def roots_for(bi):
+            roots = {find(j) for j in index.get(bi, ())}
+            # compact the posting list as contacts collapse into roots
+            index[bi] = list(roots)
+            return roots
+
+        def neighbours(i):
+            out = set()
+            for bi in contacts[i].base_identifiers:
+                out |= roots_for(bi)
+            out.discard(i)
+            return out
+
+        changed_prev = None  # None: first pass, every sharing pair is examined
+        while True:
+            if changed_prev is None:
+                order = range(n)
+            else:
+                focus = set()
+                for c in changed_prev:
+                    if find(c) == c:
+                        focus.add(c)
+                        focus |= neighbours(c)
+                order = sorted(focus)
+            hot = set(changed_prev or ())
+            changed = set()
+            for i in order:
+                if find(i) != i:
+                    continue
+                heap = [j for j in neighbours(i) if j > i]
+                heapq.heapify(heap)
+                seen = set(heap)
+                while heap:
+                    j = heapq.heappop(heap)
+                    if find(j) != j:
+                        continue
+                    if changed_prev is not None and i not in hot and j not in hot:
+                        # neither side changed since this pair was last examined
+                        continue
+                    if not contacts[i].can_be_merged(contacts[j]):
+                        continue
+                    before = set(contacts[i].base_identifiers)
+                    self._unindex_contact(contacts[j])
+                    contacts[i].merge(contacts[j])
+                    # everything i gained came from j
+                    self._index_contact(contacts[i], contacts[j].accounts, contacts[j].base_identifiers)
+                    parent[j] = i
+                    changed.add(i)
+                    hot.add(i)
+                    # identifiers gained from j bring new candidates; the ones
+                    # after j are still reached in this scan, the rest next pass
+                    for bi in contacts[i].base_identifiers:
+                        if bi in before:
+                            continue
+                        for r in roots_for(bi):
+                            if r > j and r not in seen:
+                                seen.add(r)
+                                heapq.heappush(heap, r)
+            if not changed:
+                break
+            changed_prev = changed
+
+        self.contacts = [c for i, c in enumerate(contacts) if find(i) == i]
 
     def add_chat_thread(self, thread):
         # determine direction similarly to Java: uses device owner info
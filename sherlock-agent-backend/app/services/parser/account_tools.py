@@ -1,7 +1,11 @@
 # account_tools.py
 import re
 from email.utils import parseaddr
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from app import config
+
 try:
     # google libphonenumber is recommended, but optional for demo
     import phonenumbers
@@ -18,7 +22,7 @@ except Exception:
 _tokens_to_ignore = {"ing", "dr", "dipl", "fh", "techn"}
 
 
-def is_valid_phone_number(value: str, default_region: str = "AT") -> bool:
+def _is_valid_phone_number(value: str, default_region: str = "AT") -> bool:
     if not value:
         return False
     if phonenumbers:
@@ -32,7 +36,7 @@ def is_valid_phone_number(value: str, default_region: str = "AT") -> bool:
     return 6 <= len(digits) <= 15
 
 
-def normalize_phone_number(value: str, default_region: str = "AT") -> str:
+def _normalize_phone_number(value: str, default_region: str = "AT") -> str:
     if not value:
         return value
     if phonenumbers:
@@ -47,7 +51,7 @@ def normalize_phone_number(value: str, default_region: str = "AT") -> str:
     return "+" + digits if not value.startswith("+") else value
 
 
-def is_valid_email_address(value: str) -> bool:
+def _is_valid_email_address(value: str) -> bool:
     if not value:
         return False
     if _email_validator:
@@ -66,14 +70,14 @@ def normalize_email_address(value: str) -> str:
     return value.strip().lower()
 
 
-def normalize_whatsapp_id(value: str) -> str:
+def _normalize_whatsapp_id(value: str) -> str:
     if not value:
         return value
     cleaned = re.sub(r"[^0-9@\.+A-Za-z]", "", value).lower()
     return cleaned
 
 
-def normalize_account_identifier(identifier: str) -> str:
+def _normalize_account_identifier(identifier: str) -> str:
     if not identifier:
         return None
     if is_valid_phone_number(identifier):
@@ -83,9 +87,9 @@ def normalize_account_identifier(identifier: str) -> str:
     return None
 
 
-def get_name_tokens(name: str) -> List[str]:
+def _name_tokens(name: str) -> Tuple[str, ...]:
     if not name:
-        return []
+        return ()
     # split on space/slash and normalize common umlauts
     s = name.lower()
     s = s.replace("ö", "oe").replace("ä", "ae").replace("ü", "ue").replace("ß", "sz")
@@ -95,12 +99,16 @@ def get_name_tokens(name: str) -> List[str]:
         t2 = re.sub(r"[^\w]", "", t)
         if t2 and t2 not in _tokens_to_ignore:
             cleaned.append(t2)
-    return cleaned
+    return tuple(cleaned)
+
+
+def get_name_tokens(name: str) -> List[str]:
+    return list(_cached["name_tokens"](name))
 
 
 def name_share_score(name1: str, name2: str) -> float:
-    t1 = get_name_tokens(name1)
-    t2 = get_name_tokens(name2)
+    t1 = _cached["name_tokens"](name1)
+    t2 = _cached["name_tokens"](name2)
     if not t1 or not t2:
         return 0.0
     len1 = sum(len(x) for x in t1)
@@ -109,3 +117,58 @@ def name_share_score(name1: str, name2: str) -> float:
     if (len1 + len2) == 2 * shared:
         return 1.0
     return max(shared / max(1, len1), shared / max(1, len2))
+
+
+# --- memoized front-ends -------------------------------------------------
+# Chat-heavy extractions validate / normalize the same few thousand
+# identifiers millions of times; each uncached call may be a full
+# phonenumbers.parse. The caches are bounded LRUs, resizable at runtime.
+_UNCACHED = {
+    "is_valid_phone_number": _is_valid_phone_number,
+    "normalize_phone_number": _normalize_phone_number,
+    "is_valid_email_address": _is_valid_email_address,
+    "normalize_whatsapp_id": _normalize_whatsapp_id,
+    "normalize_account_identifier": _normalize_account_identifier,
+    "name_tokens": _name_tokens,
+}
+_cached = {}
+
+
+def configure_identifier_cache(maxsize: int = None):
+    """(Re)create the identifier caches with `maxsize` entries each (drops cached values)."""
+    if maxsize is None:
+        maxsize = config.IDENTIFIER_CACHE_SIZE
+    for name, fn in _UNCACHED.items():
+        _cached[name] = lru_cache(maxsize=maxsize)(fn)
+
+
+def identifier_cache_stats() -> Dict[str, Dict[str, int]]:
+    out = {}
+    for name, fn in _cached.items():
+        info = fn.cache_info()
+        out[name] = {"hits": info.hits, "misses": info.misses,
+                     "size": info.currsize, "maxsize": info.maxsize}
+    return out
+
+
+def is_valid_phone_number(value: str, default_region: str = "AT") -> bool:
+    return _cached["is_valid_phone_number"](value, default_region)
+
+
+def normalize_phone_number(value: str, default_region: str = "AT") -> str:
+    return _cached["normalize_phone_number"](value, default_region)
+
+
+def is_valid_email_address(value: str) -> bool:
+    return _cached["is_valid_email_address"](value)
+
+
+def normalize_whatsapp_id(value: str) -> str:
+    return _cached["normalize_whatsapp_id"](value)
+
+
+def normalize_account_identifier(identifier: str) -> str:
+    return _cached["normalize_account_identifier"](identifier)
+
+
+configure_identifier_cache()
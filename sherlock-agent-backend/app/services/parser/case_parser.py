@@ -3,107 +3,161 @@
 Case parser: supports both demo JSON files and real UFDR archives / XML.
 - For UFDR (.zip/.ufdr/.xml) it calls parse_ufdr_archive(...) which streams
   the XML and calls the handlers to populate the UFEDFileContext (ctx).
-- For JSON it converts to toy models and reuses the same handlers.
-Finally it serializes handler outputs to data/cases/<case_id>/parsed.json.
+- For JSON it streams the records as toy models into the same handlers.
+Finally it streams handler outputs to data/cases/<case_id>/parsed.json
+(see parsed_writer) and returns the case summary.
 """
 import json
 import shutil
+import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, List
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional
 
+from app import config
 # handler & context imports (these must exist in app/services/parser/)
 from app.services.parser.ufed_context import UFEDFileContext
 from app.services.parser.contact_handler import ContactHandler
 from app.services.parser.chat_handler import ChatHandler
 from app.services.parser.file_handler import FileHandler
 from app.services.parser.ufed_sax_parser import parse_ufdr_archive
+from app.services.parser.json_stream import iter_members, open_json
+from app.services.parser.parse_stats import ParseStats
+from app.services.parser.parsed_writer import ExternalSorter, event_sort_key, open_sink
+from app.services.parser.checkpoint import Checkpointer
+from app.services.storage.case_store import CaseStoreWriter, remove_store
+from app.services.storage.mongo_store import MongoIngestor, open_database
+from app.services.storage.catalog import case_catalog
+from app.utils.metrics import metrics
+
+log = logging.getLogger("case_parser")
 
 
 def _now_iso() -> str:
     return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
 
-def _convert_demo_json_to_models(raw: dict) -> List[dict]:
-    """Convert demo JSON (contacts/messages/media) into a list of model dicts."""
-    models: List[dict] = []
-
-    # Contacts
-    for c in raw.get("contacts", []):
-        m = {
-            "id": c.get("id"),
-            "type": "Contact",
-            "fields": {
-                "Name": c.get("name"),
-                "Source": raw.get("meta", {}).get("source"),
-                "Entries": [
-                    {
-                        "type": "PhoneNumber",
-                        "fields": {"Value": c.get("number"), "Category": "Phone", "Domain": None},
-                        "attributes": {}
-                    }
-                ]
-            },
-            "attributes": {}
-        }
-        models.append(m)
-
-    # Messages -> chat threads grouped by sender|recipient
-    threads: Dict[str, dict] = {}
-    for msg in raw.get("messages", []):
-        sender = msg.get("sender")
-        recip = msg.get("recipient")
-        if sender is None and recip is None:
-            continue
-        chat_key = f"{sender}|{recip}"
-        if chat_key not in threads:
-            threads[chat_key] = {
-                "id": chat_key,
-                "type": "Chat",
-                "fields": {"Source": raw.get("meta", {}).get("source", "demo"),
-                           "Participants": [], "Messages": []},
-                "attributes": {}
-            }
-            threads[chat_key]["fields"]["Participants"].append(
-                {"id": sender, "fields": {"Identifier": sender, "Name": None, "IsPhoneOwner": "false"}}
-            )
-            threads[chat_key]["fields"]["Participants"].append(
-                {"id": recip, "fields": {"Identifier": recip, "Name": None, "IsPhoneOwner": "false"}}
-            )
-
-        msg_model = {
-            "id": msg.get("id"),
-            "type": "Message",
-            "fields": {
-                "From": [{"id": msg.get("sender"), "fields": {"Identifier": msg.get("sender")}}],
-                "Subject": None,
-                "Body": msg.get("text"),
-                "TimeStamp": msg.get("timestamp"),
-                "Attachments": []
-            },
-            "attributes": {}
-        }
-        threads[chat_key]["fields"]["Messages"].append(msg_model)
-
-    for t in threads.values():
-        models.append(t)
-
-    # Media -> models
-    for md in raw.get("media", []):
-        mm = {
-            "id": md.get("id"),
-            "type": "Media",
-            "fields": {
-                "Filename": md.get("filename") or md.get("id"),
-                "path": md.get("path"),
-                "mimetype": md.get("mimetype"),
-                "TimeStamp": md.get("timestamp")
-            },
-            "attributes": {}
-        }
-        models.append(mm)
-
-    return models
+# demo JSON members read record by record; anything else ("meta") is read whole
+_DEMO_STREAMED = ("contacts", "messages", "media")
+
+
+def _demo_contact_model(c: dict, source: Optional[str]) -> dict:
+    return {
+        "id": c.get("id"),
+        "type": "Contact",
+        "fields": {
+            "Name": c.get("name"),
+            "Source": source,
+            "Entries": [
+                {
+                    "type": "PhoneNumber",
+                    "fields": {"Value": c.get("number"), "Category": "Phone", "Domain": None},
+                    "attributes": {}
+                }
+            ]
+        },
+        "attributes": {}
+    }
+
+
+def _demo_message_model(msg: dict) -> dict:
+    return {
+        "id": msg.get("id"),
+        "type": "Message",
+        "fields": {
+            "From": [{"id": msg.get("sender"), "fields": {"Identifier": msg.get("sender")}}],
+            "Subject": None,
+            "Body": msg.get("text"),
+            "TimeStamp": msg.get("timestamp"),
+            "Attachments": []
+        },
+        "attributes": {}
+    }
+
+
+def _demo_media_model(md: dict) -> dict:
+    return {
+        "id": md.get("id"),
+        "type": "Media",
+        "fields": {
+            "Filename": md.get("filename") or md.get("id"),
+            "path": md.get("path"),
+            "mimetype": md.get("mimetype"),
+            "TimeStamp": md.get("timestamp")
+        },
+        "attributes": {}
+    }
+
+
+def _demo_meta(path: Path) -> dict:
+    """
+    "meta" of a demo JSON export wherever it is in the object: found at once
+    when it comes first (as exported), else after a pass over the records.
+    """
+    with open_json(path) as f:
+        for member in iter_members(f, _DEMO_STREAMED):
+            if len(member) == 2 and member[0] == "meta":
+                return member[1] if isinstance(member[1], dict) else {}
+    return {}
+
+
+def _ingest_demo_json(path: Path, contact_handler: ContactHandler, chat_handler: ChatHandler,
+                      file_handler: FileHandler, stats: ParseStats) -> dict:
+    """
+    Stream demo JSON (meta/contacts/messages/media) into the handlers in one
+    pass, each record as it is decoded; returns "meta". Messages are grouped
+    into chat threads by sender|recipient, a thread being registered at its
+    first message. "meta" is read up front (_demo_meta), so every record
+    gets its source whatever the key order.
+    """
+    meta = _demo_meta(path)
+    threads: Dict[str, Any] = {}
+    # "json_decode" is the time spent between records, handler.<class> the time in each handler
+    timer_names = {h: "handler." + type(h).__name__ for h in (contact_handler, chat_handler, file_handler)}
+    with open_json(path) as f:
+        mark = perf_counter()
+        for n, member in enumerate(iter_members(f, _DEMO_STREAMED)):
+            now = perf_counter()
+            stats.add_time("json_decode", now - mark)
+            handler = None
+            if len(member) == 2:
+                continue
+            key, _, rec = member
+            if not isinstance(rec, dict):
+                continue
+            if key == "contacts":
+                handler = contact_handler
+                contact_handler.new_model(_demo_contact_model(rec, meta.get("source")))
+                stats.count_model("Contact")
+                stats.tick()
+            elif key == "messages":
+                sender, recip = rec.get("sender"), rec.get("recipient")
+                if sender is None and recip is None:
+                    continue
+                handler = chat_handler
+                chat_key = f"{sender}|{recip}"
+                chat = threads.get(chat_key)
+                if chat is None:
+                    participants = [{"id": p, "fields": {"Identifier": p, "Name": None, "IsPhoneOwner": "false"}}
+                                    for p in (sender, recip)]
+                    chat = threads[chat_key] = chat_handler.open_thread(
+                        chat_key, meta.get("source", "demo"), participants)
+                    stats.count_model("Chat")
+                    stats.tick()
+                chat_handler.add_message(chat, _demo_message_model(rec))
+            elif key == "media":
+                handler = file_handler
+                file_handler.new_model(_demo_media_model(rec))
+                stats.count_model("Media")
+                stats.tick()
+            if n % 4096 == 0:
+                stats.bytes_read = f.buffer.tell()
+            mark = perf_counter()
+            if handler is not None:
+                stats.add_time(timer_names[handler], mark - now)
+        stats.bytes_read = stats.bytes_total
+    return meta
 
 
 def _acct_to_primitive(a: Any) -> Any:
@@ -121,191 +175,335 @@ def _acct_to_primitive(a: Any) -> Any:
     }
 
 
-def _finalize_output(ctx: UFEDFileContext, raw_meta: dict, case_id: str, case_dir: Path) -> dict:
+def _contact_to_primitive(c: Any) -> dict:
+    names = list(c.names) if hasattr(c, "names") else []
+    base_identifiers = list(c.base_identifiers) if hasattr(c, "base_identifiers") else []
+    device_owner = bool(c.device_owner) if hasattr(c, "device_owner") else False
+    accounts_list = getattr(c, "accounts", [])
+    accounts = [_acct_to_primitive(a) for a in accounts_list]
+    return {
+        "names": names,
+        "base_identifiers": base_identifiers,
+        "device_owner": device_owner,
+        "accounts": accounts
+    }
+
+
+def _message_to_primitive(m: Any) -> dict:
+    if isinstance(m, dict):
+        from_account = m.get("from")
+        message_id = m.get("id")
+        subject = m.get("subject")
+        body = m.get("body")
+        timestamp = m.get("timestamp")
+        attachments = m.get("attachments", [])
+    else:
+        from_account = getattr(m, "from", None)
+        message_id = getattr(m, "id", None)
+        subject = getattr(m, "subject", None)
+        body = getattr(m, "body", None)
+        timestamp = getattr(m, "timestamp", None)
+        attachments = getattr(m, "attachments", [])
+    return {
+        "id": message_id,
+        "from": _acct_to_primitive(from_account),
+        "subject": subject,
+        "body": body,
+        "timestamp": timestamp,
+        "attachments": list(attachments) if attachments else []
+    }
+
+
+def _file_to_primitive(f: Any) -> dict:
+    local_path = getattr(f, "local_path", None)
+    mobile_path = getattr(f, "mobile_path", None)
+    return {
+        "id": getattr(f, "id", None),
+        "local_path": str(local_path) if local_path else None,
+        "mobile_path": str(mobile_path) if mobile_path else None,
+        "mimetype": getattr(f, "mimetype", None),
+        "size": getattr(f, "size", None)
+    }
+
+
+def _mongo_ingestor(case_id: str) -> Optional[MongoIngestor]:
+    """Ingestor replacing the case's documents in MongoDB, None unless config.MONGO_URI is set."""
+    if not config.MONGO_URI:
+        return None
+    db = open_database(config.MONGO_URI, config.MONGO_DB)
+    return MongoIngestor(db, case_id, batch_size=config.MONGO_BATCH_SIZE,
+                         max_in_flight=config.MONGO_MAX_IN_FLIGHT).begin()
+
+
+def _finalize_output(ctx: UFEDFileContext, raw_meta: dict, case_id: str, case_dir: Path,
+                     stats: Optional[ParseStats] = None, fmt: Optional[str] = None) -> dict:
     """
-    Convert ctx (account_manager, files) into serializable dict, write parsed.json and summary.json.
+    Stream ctx (account_manager, files) to parsed.json and write summary.json.
+    Contacts, threads, messages and files are converted one at a time while
+    the sink writes them; timeline events go through an external merge sort.
+    The same rows are loaded into the case store (case.db) on the way,
+    unless config.CASE_STORE is off, and into MongoDB when config.MONGO_URI
+    is set.
+    `fmt` is pretty / compact / ndjson (defaults to config.PARSED_FORMAT).
+    Returns the summary dict.
     """
-    # contacts_out
-    contacts_out = []
+    if stats is not None:
+        stats.set_stage("write")
     account_manager = ctx.account_manager
-    for c in getattr(account_manager, "contacts", []):
-        names = list(c.names) if hasattr(c, "names") else []
-        base_identifiers = list(c.base_identifiers) if hasattr(c, "base_identifiers") else []
-        device_owner = bool(c.device_owner) if hasattr(c, "device_owner") else False
-        accounts_list = getattr(c, "accounts", [])
-        accounts = [_acct_to_primitive(a) for a in accounts_list]
-        contacts_out.append({
-            "names": names,
-            "base_identifiers": base_identifiers,
-            "device_owner": device_owner,
-            "accounts": accounts
-        })
-
-    # chat_threads
-    chat_threads = []
-    for t in getattr(account_manager, "chat_threads", []):
-        if isinstance(t, dict):
-            participants = t.get("participants", [])
-            messages = t.get("messages", [])
-            thread_id = t.get("id")
-        else:
-            participants = getattr(t, "participants", [])
-            messages = getattr(t, "messages", [])
-            thread_id = getattr(t, "id", None)
-
-        participants_primitive = [_acct_to_primitive(p) for p in participants]
-
-        messages_primitive = []
+    counts = {"contacts": 0, "threads": 0, "messages": 0, "files": 0}
+    # timeline events (messages + media), collected while the collections stream
+    events = ExternalSorter(key=event_sort_key, run_size=config.EVENT_SORT_RUN_SIZE, tmp_dir=case_dir)
+    store = None
+    if config.CASE_STORE:
+        store = CaseStoreWriter(case_dir, text_index=bool(config.SEARCH_INDEX),
+                                body_blob=bool(config.MESSAGE_BODY_BLOB))
+    mongo = _mongo_ingestor(case_id)
+    # row sinks fed while the collections stream
+    writers = [w for w in (store, mongo) if w is not None]
+
+    def contacts_out():
+        for c in getattr(account_manager, "contacts", []):
+            counts["contacts"] += 1
+            contact = _contact_to_primitive(c)
+            for w in writers:
+                w.add_contact(contact)
+            yield contact
+
+    def messages_out(thread_row, thread_id, messages):
         for m in messages:
-            if isinstance(m, dict):
-                from_account = m.get("from")
-                message_id = m.get("id")
-                subject = m.get("subject")
-                body = m.get("body")
-                timestamp = m.get("timestamp")
-                attachments = m.get("attachments", [])
-            else:
-                from_account = getattr(m, "from", None)
-                message_id = getattr(m, "id", None)
-                subject = getattr(m, "subject", None)
-                body = getattr(m, "body", None)
-                timestamp = getattr(m, "timestamp", None)
-                attachments = getattr(m, "attachments", [])
-            messages_primitive.append({
-                "id": message_id,
-                "from": _acct_to_primitive(from_account),
-                "subject": subject,
-                "body": body,
-                "timestamp": timestamp,
-                "attachments": list(attachments) if attachments else []
+            counts["messages"] += 1
+            msg = _message_to_primitive(m)
+            for w in writers:
+                w.add_message(thread_row, thread_id, msg)
+            events.add({
+                "id": msg.get("id"),
+                "type": "message",
+                "timestamp": msg.get("timestamp"),
+                "brief": (msg.get("body") or "")[:160],
+                "ref": {"type": "message", "id": msg.get("id")}
             })
+            yield msg
+
+    def chat_threads_out():
+        for t in getattr(account_manager, "chat_threads", []):
+            if isinstance(t, dict):
+                participants = t.get("participants", [])
+                messages = t.get("messages", [])
+                thread_id = t.get("id")
+            else:
+                participants = getattr(t, "participants", [])
+                messages = getattr(t, "messages", [])
+                thread_id = getattr(t, "id", None)
+            counts["threads"] += 1
+            participants = [_acct_to_primitive(p) for p in participants]
+            thread_rows = [w.add_thread(thread_id, participants) for w in writers]
+            thread_row = thread_rows[0] if thread_rows else None
+            yield {
+                "id": thread_id,
+                "participants": participants,
+                "messages": messages_out(thread_row, thread_id, messages)
+            }
 
-        chat_threads.append({
-            "id": thread_id,
-            "participants": participants_primitive,
-            "messages": messages_primitive
-        })
-
-    # files_out: convert TaggedFile-like objects
-    files_out = []
-    for f in getattr(ctx, "files", []):
-        fid = getattr(f, "id", None)
-        local_path = getattr(f, "local_path", None)
-        mobile_path = getattr(f, "mobile_path", None)
-        mimetype = getattr(f, "mimetype", None)
-        size = getattr(f, "size", None)
-        files_out.append({
-            "id": fid,
-            "local_path": str(local_path) if local_path else None,
-            "mobile_path": str(mobile_path) if mobile_path else None,
-            "mimetype": mimetype,
-            "size": size
-        })
-
-    # build timeline events (messages + media)
-    events: List[dict] = []
-    for t in chat_threads:
-        for m in t.get("messages", []):
-            events.append({
-                "id": m.get("id"),
-                "type": "message",
-                "timestamp": m.get("timestamp"),
-                "brief": (m.get("body") or "")[:160],
-                "ref": {"type": "message", "id": m.get("id")}
+    def files_out():
+        for f in getattr(ctx, "files", []):
+            counts["files"] += 1
+            fo = _file_to_primitive(f)
+            for w in writers:
+                w.add_file(fo)
+            events.add({
+                "id": fo.get("id"),
+                "type": "media",
+                "timestamp": None,
+                "brief": fo.get("local_path") or fo.get("mobile_path") or fo.get("id"),
+                "ref": {"type": "media", "id": fo.get("id")}
             })
-    for f in files_out:
-        events.append({
-            "id": f.get("id"),
-            "type": "media",
-            "timestamp": None,
-            "brief": f.get("local_path") or f.get("mobile_path") or f.get("id"),
-            "ref": {"type": "media", "id": f.get("id")}
-        })
+            yield fo
 
-    try:
-        events_sorted = sorted(events, key=lambda e: (e.get("timestamp") or ""))
-    except Exception:
-        events_sorted = events
+    def events_out():
+        # runs only after chat_threads / files were written
+        for e in events:
+            for w in writers:
+                w.add_event(e)
+            yield e
 
     normalized = {
         "case_id": case_id,
         "meta": raw_meta or {},
-        "contacts": contacts_out,
-        "chat_threads": chat_threads,
-        "files": files_out,
-        "events": events_sorted,
+        "contacts": contacts_out(),
+        "chat_threads": chat_threads_out(),
+        "files": files_out(),
+        "events": events_out(),
         "parse_warnings": []
     }
 
-    # write parsed.json
-    parsed_path = case_dir / "parsed.json"
-    with open(parsed_path, "w", encoding="utf-8") as f:
-        json.dump(normalized, f, ensure_ascii=False, indent=2)
+    # write parsed.json (or its ndjson layout)
+    try:
+        # write.sink: converting + writing the collections (store rows and the
+        # event sort ride along); write.commit: indexes / final flush of the stores
+        t0 = perf_counter()
+        with events:
+            open_sink(case_dir, fmt or config.PARSED_FORMAT, config.PARSED_ENCODINGS).write(normalized)
+        t1 = perf_counter()
+        if store is None:
+            # don't leave a store from an earlier parse behind
+            remove_store(case_dir)
+        for w in writers:
+            w.commit({"case_id": case_id, "meta": raw_meta or {}})
+        if stats is not None:
+            stats.add_time("write.sink", t1 - t0)
+            stats.add_time("write.commit", perf_counter() - t1)
+    except BaseException:
+        for w in writers:
+            w.abort()
+        raise
 
     # write summary.json
     summary = {
         "case_id": case_id,
-        "total_contacts": len(contacts_out),
-        "total_threads": len(chat_threads),
-        "total_files": len(files_out),
+        "total_contacts": counts["contacts"],
+        "total_threads": counts["threads"],
+        "total_messages": counts["messages"],
+        "total_files": counts["files"],
+        "total_events": events.count,
         "parsed_at": _now_iso()
     }
+    if stats is not None:
+        stats.set_stage("done")
+        summary["parse_stats"] = stats.to_dict()
     summary_path = case_dir / "summary.json"
     with open(summary_path, "w", encoding="utf-8") as f:
         json.dump(summary, f, ensure_ascii=False, indent=2)
 
-    return normalized
+    return summary
+
+
+def _checkpoint_source(source: Path, parallel: bool) -> dict:
+    """What a checkpoint must have been written for to be resumable."""
+    key = {
+        "name": source.name,
+        "size": source.stat().st_size if source.is_file() else None,
+        "mode": "parallel" if parallel else "sequential",
+    }
+    if parallel:
+        # chunk indexes are only meaningful with the same chunking
+        key["chunk_bytes"] = config.PARSE_CHUNK_BYTES
+    return key
+
 
+def _catalog(method: str, case_id: str, *args, **kwargs):
+    """Catalog update that never fails the parse (rebuild() can repair the catalog)."""
+    try:
+        getattr(case_catalog, method)(case_id, *args, **kwargs)
+    except Exception:
+        log.exception("case catalog %s failed for %s", method, case_id)
 
-def parse_uploaded_file(file_path: str, case_id: str) -> dict:
+
+def parse_uploaded_file(file_path: str, case_id: str, workers: Optional[int] = None,
+                        resume: bool = False, checkpointer: Optional[Checkpointer] = None,
+                        owner: Optional[str] = None,
+                        on_stats: Optional[Callable[[ParseStats], None]] = None) -> dict:
     """
     Main entry:
     - If file is UFDR archive (.zip/.ufdr) or XML folder -> parse with SAX parser.
-    - Else assume demo JSON: load and convert to models then run handlers.
+      `workers` > 1 parses the report with that many processes
+      (defaults to config.PARSE_WORKERS).
+      The parse is checkpointed to data/cases/<case_id>/checkpoint.pkl
+      (config.CHECKPOINT_*, or a custom `checkpointer`); `resume=True`
+      continues from a matching checkpoint instead of starting over.
+      The checkpoint is removed when the parse completes; a parse that
+      fails keeps it for a later resume, one without `resume` drops it.
+    - Else assume demo JSON: stream its records into the handlers. JSON
+      parses are not checkpointed; `resume=True` parses them from the start.
+    The case catalog tracks the case as parsing -> parsed (or failed), with
+    `owner` and the upload's file name.
+    `on_stats` is handed the live ParseStats (again if a resume replaces it),
+    e.g. for a job to poll progress from another thread.
+    Returns the summary dict also written to summary.json.
     """
     file_path = Path(file_path)
     if not file_path.exists():
         raise FileNotFoundError(f"upload not found: {file_path}")
 
+    _catalog("begin_case", case_id, owner=owner, source=file_path.name)
+    try:
+        summary = _parse_case(file_path, case_id, workers, resume, checkpointer, on_stats or (lambda s: None))
+    except BaseException as e:
+        _catalog("set_status", case_id, "failed", error=f"{type(e).__name__}: {e}")
+        metrics.record_parse("cancelled" if isinstance(e, KeyboardInterrupt) else "failed")
+        raise
+    _catalog("record_summary", case_id, summary)
+    metrics.record_parse("done", summary.get("parse_stats"))
+    return summary
+
+
+def _parse_case(file_path: Path, case_id: str, workers: Optional[int], resume: bool,
+                checkpointer: Optional[Checkpointer], on_stats: Callable[[ParseStats], None]) -> dict:
+    stats = ParseStats()
+    on_stats(stats)
+
     # prepare case directory & copy original
     case_dir = Path("data") / "cases" / case_id
     case_dir.mkdir(parents=True, exist_ok=True)
+    case_copy = case_dir / file_path.name
+    stats.set_stage("copy")
     try:
-        shutil.copy(str(file_path), str(case_dir / file_path.name))
+        # uploads are moved into the case dir already; a resumed parse keeps
+        # the copy made by the interrupted run
+        if file_path.resolve() == case_copy.resolve():
+            pass
+        elif not (resume and case_copy.is_file() and case_copy.stat().st_size == file_path.stat().st_size):
+            shutil.copy(str(file_path), str(case_copy))
     except Exception:
-        pass
+        case_copy = file_path
 
     # create context and handlers (always create them)
+    stats.set_stage("parse")
     ctx = UFEDFileContext(unzipped_dir=case_dir)
     logger = None
-    contact_handler = ContactHandler(ctx, logger)
-    chat_handler = ChatHandler(ctx, logger)
-    file_handler = FileHandler(ctx, logger)
+    if checkpointer is None:
+        checkpointer = Checkpointer(case_dir, interval_s=config.CHECKPOINT_INTERVAL_S,
+                                    every_units=config.CHECKPOINT_EVERY_UNITS)
+    if not resume:
+        # a fresh upload of the case: an earlier run's checkpoint is stale
+        checkpointer.clear()
 
     # If uploaded artifact is an archive/folder/XML -> use UFDR parser
     up = Path(file_path)
     suffix = up.suffix.lower()
     if suffix in (".zip", ".ufdr") or up.is_dir() or suffix == ".xml":
-        # parse_ufdr_archive will extract (if needed) and call handlers directly
-        parse_ufdr_archive(up, contact_handler, chat_handler, file_handler, case_dir)
+        # parse_ufdr_archive streams the report and calls handlers directly;
+        # zips are read from the case copy, which backs lazy file extraction
+        source = case_copy if suffix in (".zip", ".ufdr") and case_copy.exists() else up
+        workers = workers or config.PARSE_WORKERS
+        source_key = _checkpoint_source(source, workers > 1)
+        position = None
+        if resume:
+            state = checkpointer.load(source_key)
+            if state is not None:
+                ctx, stats, position = state["ctx"], state["stats"], state["position"]
+                stats.resumed()
+                stats.set_stage("parse")
+                on_stats(stats)
+                log.info("resuming case %s from checkpoint at %s", case_id, position)
+        checkpointer.bind(source_key, ctx, stats)
+
+        contact_handler = ContactHandler(ctx, logger)
+        chat_handler = ChatHandler(ctx, logger)
+        file_handler = FileHandler(ctx, logger)
+        parse_ufdr_archive(source, contact_handler, chat_handler, file_handler, case_dir,
+                           workers=workers, stats=stats, checkpointer=checkpointer, resume=position)
         # finalize using whatever ctx has
-        return _finalize_output(ctx, raw_meta={}, case_id=case_id, case_dir=case_dir)
-
-    # Otherwise fallback to demo JSON flow
-    # load raw JSON (BOM-safe)
-    with open(file_path, "r", encoding="utf-8-sig") as f:
-        raw = json.load(f)
-
-    # build toy models and run handlers
-    models = _convert_demo_json_to_models(raw)
-
-    # run handlers in sensible order
-    for m in models:
-        contact_handler.new_model(m)
-    for m in models:
-        chat_handler.new_model(m)
-    for m in models:
-        file_handler.new_model(m)
-
-    # finalize & return
-    return _finalize_output(ctx, raw_meta=raw.get("meta", {}), case_id=case_id, case_dir=case_dir)
+        summary = _finalize_output(ctx, raw_meta={}, case_id=case_id, case_dir=case_dir, stats=stats)
+        checkpointer.clear()
+        return summary
+
+    contact_handler = ContactHandler(ctx, logger)
+    chat_handler = ChatHandler(ctx, logger)
+    file_handler = FileHandler(ctx, logger)
+
+    # Otherwise fallback to demo JSON flow: one incremental pass that both
+    # validates the document and feeds the handlers (see json_stream)
+    stats.bytes_total = up.stat().st_size
+    meta = _ingest_demo_json(up, contact_handler, chat_handler, file_handler, stats)
+
+    return _finalize_output(ctx, raw_meta=meta, case_id=case_id, case_dir=case_dir, stats=stats)
@@ -2,6 +2,17 @@
 from typing import Dict, Any, List
 from .account import Account
 from .contact import Contact
+from .message_store import MessageColumns
+
+
+class OpenThread:
+    """A registered chat thread still taking messages (ChatHandler.open_thread / add_message)."""
+    __slots__ = ("thread", "accounts")
+
+    def __init__(self, thread: Dict[str, Any], accounts: Dict[Any, Account]):
+        self.thread = thread
+        # participant identifier -> Account, to resolve message senders
+        self.accounts = accounts
 
 class ChatHandler:
     """
@@ -12,6 +23,9 @@ class ChatHandler:
     Adds ChatThread-like structures into context.account_manager.add_chat_thread
     """
 
+    # decodedData model types this handler consumes (see model_dispatch)
+    model_types = ("Chat", "Email")
+
     def __init__(self, context, logger):
         self.context = context
         self.logger = logger
@@ -25,7 +39,7 @@ class ChatHandler:
 
     def _new_email(self, model: Dict[str, Any]):
         # Build a simple thread dict
-        thread = {"id": model.get("id"), "participants": [], "messages": []}
+        thread = {"id": model.get("id"), "participants": [], "messages": MessageColumns()}
         # From
         from_field = (model.get("fields") or {}).get("From") or []
         # Add participants from From/To/Cc/Bcc
@@ -57,27 +71,36 @@ class ChatHandler:
             ts = int(ts_str) if ts_str and ts_str.isdigit() else None
         except Exception:
             ts = None
-        msg = {
-            "from": thread["participants"][0] if thread["participants"] else None,
-            "subject": (model.get("fields") or {}).get("Subject"),
-            "body": (model.get("fields") or {}).get("Body"),
-            "timestamp": ts or 0,
-            "attachments": []
-        }
         # attachments
+        msg_attachments = []
         attachments = (model.get("fields") or {}).get("Attachments") or []
         for att in attachments:
-            msg["attachments"].append(att.get("attributes", {}).get("file_id"))
-            msg["attachments"].append(att.get("attributes", {}).get("URL"))
-        thread["messages"].append(msg)
+            msg_attachments.append(att.get("attributes", {}).get("file_id"))
+            msg_attachments.append(att.get("attributes", {}).get("URL"))
+        thread["messages"].add(
+            thread["participants"][0] if thread["participants"] else None,
+            (model.get("fields") or {}).get("Subject"),
+            (model.get("fields") or {}).get("Body"),
+            ts or 0,
+            msg_attachments,
+        )
         # hand over to account manager
         self.context.account_manager.add_chat_thread(thread)
 
     def _new_chat(self, model: Dict[str, Any]):
         source = (model.get("fields") or {}).get("Source") or ""
         participants = (model.get("fields") or {}).get("Participants") or []
+        chat = self.open_thread(model.get("id") or model.get("fields", {}).get("id"), source, participants)
+        for message_model in (model.get("fields") or {}).get("Messages") or []:
+            self.add_message(chat, message_model)
+
+    def open_thread(self, thread_id: Any, source: str, participants: List[Dict[str, Any]]) -> "OpenThread":
+        """
+        Register a chat thread whose messages follow one at a time through
+        add_message() (streamed inputs); _new_chat() is open_thread + add_message.
+        """
         id_account_map = {}
-        thread = {"id": model.get("id") or model.get("fields", {}).get("id"), "participants": [], "messages": []}
+        thread = {"id": thread_id, "participants": [], "messages": MessageColumns()}
 
         for p in participants:
             is_phone_owner = p.get("fields", {}).get("IsPhoneOwner", "false").lower() == "true"
@@ -89,50 +112,53 @@ class ChatHandler:
                 id_account_map[identifier] = acct
                 self.context.account_manager.add_contact_from_name_accounts(name, [acct])
 
-        # messages
-        messages = (model.get("fields") or {}).get("Messages") or []
-        for message_model in messages:
-            from_id = None
-            from_field = (message_model.get("fields") or {}).get("From") or []
-            if from_field:
-                fm = from_field[0]
-                from_id = (fm.get("fields") or {}).get("Identifier")
-            ts_str = (message_model.get("fields") or {}).get("TimeStamp")
-            try:
-                ts = int(ts_str) if ts_str and ts_str.isdigit() else None
-            except Exception:
-                ts = None
-            msg = {
-                "from": id_account_map.get(from_id),
-                "subject": (message_model.get("fields") or {}).get("Subject"),
-                "body": (message_model.get("fields") or {}).get("Body"),
-                "timestamp": ts or 0,
-                "attachments": []
-            }
-            # attachments under "Attachments" or "Attachment"
-            atts = (message_model.get("fields") or {}).get("Attachments") or []
-            for att in atts:
-                file_id = (att.get("attributes") or {}).get("file_id")
-                if not file_id and (att.get("fields") or {}).get("attachment_extracted_path"):
-                    file_id = "attachment_" + str(att.get("id") or "")
-                if file_id:
-                    msg["attachments"].append(file_id)
-                url = (att.get("attributes") or {}).get("URL")
-                if url:
-                    msg["attachments"].append(url)
-            atts2 = (message_model.get("fields") or {}).get("Attachment") or []
-            for att in atts2:
-                file_id = (att.get("attributes") or {}).get("file_id")
-                if not file_id and (att.get("fields") or {}).get("attachment_extracted_path"):
-                    file_id = "attachment_" + str(att.get("id") or "")
-                if file_id:
-                    msg["attachments"].append(file_id)
-                url = (att.get("attributes") or {}).get("URL")
-                if url:
-                    msg["attachments"].append(url)
-            thread["messages"].append(msg)
-
+        # messages are appended to the registered thread in place
         self.context.account_manager.add_chat_thread(thread)
+        return OpenThread(thread, id_account_map)
+
+    def add_message(self, chat: "OpenThread", message_model: Dict[str, Any]):
+        thread, id_account_map = chat.thread, chat.accounts
+        from_id = None
+        from_field = (message_model.get("fields") or {}).get("From") or []
+        if from_field:
+            fm = from_field[0]
+            from_id = (fm.get("fields") or {}).get("Identifier")
+        ts_str = (message_model.get("fields") or {}).get("TimeStamp")
+        try:
+            ts = int(ts_str) if ts_str and ts_str.isdigit() else None
+        except Exception:
+            ts = None
+        # stored column-wise (see message_store), not as one dict per message
+        msg_attachments = []
+        # attachments under "Attachments" or "Attachment"
+        atts = (message_model.get("fields") or {}).get("Attachments") or []
+        for att in atts:
+            file_id = (att.get("attributes") or {}).get("file_id")
+            if not file_id and (att.get("fields") or {}).get("attachment_extracted_path"):
+                file_id = "attachment_" + str(att.get("id") or "")
+            if file_id:
+                msg_attachments.append(file_id)
+            url = (att.get("attributes") or {}).get("URL")
+            if url:
+                msg_attachments.append(url)
+        atts2 = (message_model.get("fields") or {}).get("Attachment") or []
+        for att in atts2:
+            file_id = (att.get("attributes") or {}).get("file_id")
+            if not file_id and (att.get("fields") or {}).get("attachment_extracted_path"):
+                file_id = "attachment_" + str(att.get("id") or "")
+            if file_id:
+                msg_attachments.append(file_id)
+            url = (att.get("attributes") or {}).get("URL")
+            if url:
+                msg_attachments.append(url)
+        thread["messages"].add(
+            id_account_map.get(from_id),
+            (message_model.get("fields") or {}).get("Subject"),
+            (message_model.get("fields") or {}).get("Body"),
+            ts or 0,
+            msg_attachments,
+        )
+
 
     def _is_valid_email(self, s: str) -> bool:
         try:
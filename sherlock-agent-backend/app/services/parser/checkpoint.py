@@ -0,0 +1,114 @@
+# app/services/parser/checkpoint.py
+"""
+Parse checkpoints: a long parse periodically pickles its state to
+data/cases/<case_id>/checkpoint.pkl so a crashed run can resume.
+
+A checkpoint holds
+- source:   what is being parsed (file name, size, parser mode); a checkpoint
+            for another source or mode is ignored
+- position: where to continue, always on a unit boundary
+            sequential: {"mode": "sequential", "units": <top-level files/models done>}
+            parallel:   {"mode": "parallel", "chunk": <next chunk index>, "offset": <its byte offset>}
+- ctx / stats: the UFEDFileContext (incl. AccountManager) and ParseStats
+
+The file is replaced atomically, so a crash while saving leaves the
+previous checkpoint intact.
+"""
+import os
+import time
+import pickle
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("checkpoint")
+
+CHECKPOINT_FILE = "checkpoint.pkl"
+CHECKPOINT_VERSION = 1
+
+
+class Checkpointer:
+    """
+    Saves a checkpoint when `interval_s` seconds or `every_units` units
+    passed since the last one (either trigger may be 0 = off).
+    The parsers call maybe_save() after each completed unit / chunk.
+    """
+
+    def __init__(self, case_dir: Path, interval_s: float = 300, every_units: int = 0):
+        self.path = Path(case_dir) / CHECKPOINT_FILE
+        self.interval_s = interval_s
+        self.every_units = every_units
+        self.source: Optional[Dict[str, Any]] = None
+        self.ctx = None
+        self.stats = None
+        self.saves = 0
+        self._last_time = time.monotonic()
+        self._last_units = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.interval_s or self.every_units)
+
+    def bind(self, source: Dict[str, Any], ctx, stats):
+        """Attach the state that save() persists."""
+        self.source = source
+        self.ctx = ctx
+        self.stats = stats
+
+    def maybe_save(self, position: Dict[str, Any], units: int) -> bool:
+        if self.ctx is None or not self.enabled:
+            return False
+        if self.every_units and units - self._last_units >= self.every_units:
+            due = True
+        else:
+            due = bool(self.interval_s) and time.monotonic() - self._last_time >= self.interval_s
+        if not due:
+            return False
+        self.save(position)
+        self._last_units = units
+        return True
+
+    def save(self, position: Dict[str, Any]):
+        t0 = time.monotonic()
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "source": self.source,
+            "position": dict(position),
+            "ctx": self.ctx,
+            "stats": self.stats,
+            "saved_at": time.time(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=CHECKPOINT_FILE + ".", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.saves += 1
+        self._last_time = time.monotonic()
+        logger.info("checkpoint %d saved at %s (%.2fs)", self.saves, position, self._last_time - t0)
+
+    def load(self, source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The saved state for `source`, or None when there is no usable checkpoint."""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            logger.warning("unreadable checkpoint %s: %s", self.path, e)
+            return None
+        if state.get("version") != CHECKPOINT_VERSION or state.get("source") != source:
+            logger.warning("checkpoint %s was written for %s, not %s; ignoring it",
+                           self.path, state.get("source"), source)
+            return None
+        return state
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
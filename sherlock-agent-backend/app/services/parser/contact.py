@@ -4,7 +4,7 @@ from typing import List
 from .account import Account
 from .account_tools import name_share_score
 
-@dataclass
+@dataclass(slots=True)
 class Contact:
     names: List[str] = field(default_factory=list)
     accounts: List[Account] = field(default_factory=list)
@@ -42,18 +42,15 @@ class Contact:
     def can_be_merged(self, other: "Contact") -> bool:
         if not self.accounts:
             return False
-        best = -1.0
+        common = set(self.base_identifiers).intersection(other.base_identifiers)
+        if not common:
+            return False
+        # common is a subset of both identifier sets, so what remains of the
+        # rules is: a nameless side, or a name share score above 0.5
+        if not self.names or not other.names:
+            return True
         for n in self.names:
             for m in other.names:
-                s = name_share_score(n, m)
-                if s > best:
-                    best = s
-        common = set(self.base_identifiers).intersection(set(other.base_identifiers))
-        if common:
-            if best > 0.5 and set(self.base_identifiers).issuperset(common) and set(other.base_identifiers).issuperset(common):
-                return True
-            if (not self.names or best > 0.5) and set(self.base_identifiers).issuperset(common):
-                return True
-            if (not other.names or best > 0.5) and set(other.base_identifiers).issuperset(common):
-                return True
+                if name_share_score(n, m) > 0.5:
+                    return True
         return False
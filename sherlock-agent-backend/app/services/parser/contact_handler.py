@@ -10,6 +10,9 @@ class ContactHandler:
       - model['fields'] -> dict of fields, where 'Entries' (if present) is a list of entry-models
     Each entry-model is a dict with keys: 'type', 'fields' (dict), 'attributes' (dict)
     """
+    # decodedData model types this handler consumes (see model_dispatch)
+    model_types = ("Contact",)
+
     def __init__(self, context, logger):
         self.context = context
         self.logger = logger
@@ -9,17 +9,41 @@ class FileHandler:
     Responsible for adding TaggedFile objects to context when attachments are discovered.
     """
 
+    # decodedData model types this handler consumes (see model_dispatch)
+    model_types = ("Email",)
+
     def __init__(self, context, logger):
         self.context = context
         self.logger = logger
 
     def new_file(self, tagged_file: TaggedFile):
+        # the SAX parser hands over plain dicts built from <file> elements
+        if isinstance(tagged_file, dict):
+            tagged_file = self._tagged_file_from_dict(tagged_file)
         # context.add_file will handle path normalization and dedup
         try:
             self.context.add_file(tagged_file)
         except Exception as e:
             self.logger and self.logger.error(f"Error adding tagged file: {e}")
 
+    @staticmethod
+    def _tagged_file_from_dict(d: Dict[str, Any]) -> TaggedFile:
+        mobile_path = Path(d["mobile_path"]) if d.get("mobile_path") else None
+        # files without a local copy keep their mobile path as the only reference
+        local_path = Path(d["local_path"]) if d.get("local_path") else mobile_path
+        # built through the constructor so __post_init__ interns fs / mimetype
+        tf = TaggedFile(
+            id=d.get("id"),
+            fs=d.get("fs"),
+            fsid=d.get("fsid"),
+            local_path=local_path,
+            mobile_path=mobile_path,
+            mimetype=d.get("mimetype"),
+            size=d.get("size") or 0,
+            metadata=dict(d.get("metadata") or {}),
+        )
+        return tf
+
     def new_model(self, model: Dict[str, Any]):
         # Java version created attachment objects when processing Email models.
         if model.get("type") == "Email":
@@ -0,0 +1,127 @@
+# app/services/parser/json_stream.py
+"""
+Incremental reader for JSON exports shaped as one top-level object whose
+big members are arrays ({"meta": {...}, "contacts": [...], ...}).
+
+iter_members() reads the file in blocks and yields
+    (key, value)          for a member that is not streamed
+    (key, ITEM, value)    for each element of a streamed array member
+as each value is decoded with JSONDecoder.raw_decode, so only the current
+element (plus one read block) is in memory and the file is read once.
+Syntax errors raise JSONStreamError with the character offset; a
+document is valid exactly when iteration finishes.
+"""
+import re
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+READ_CHARS = 1024 * 1024
+# a single value may not exceed this many characters (bounds memory on garbage input)
+MAX_VALUE_CHARS = 512 * 1024 * 1024
+
+ITEM = object()
+
+_WS = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+class _Reader:
+    """A text buffer over a file that grows on demand and drops what was consumed."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.base = 0        # file offset (in chars) of buf[0]
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        # at least as much as is buffered, so a value spanning many blocks is re-scanned O(log n) times
+        chunk = self.f.read(max(READ_CHARS, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos:
+            self.base += self.pos
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def error(self, msg: str, pos: Optional[int] = None):
+        raise JSONStreamError(f"{msg} at char {self.base + (self.pos if pos is None else pos)}")
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file), not consumed."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            self.error(f"expected {' or '.join(repr(x) for x in chars)}, got {c!r}" if c else
+                       f"unexpected end of document, expected {' or '.join(repr(x) for x in chars)}")
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        """Decode one complete value at the cursor, reading more until it is complete."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if len(self.buf) - self.pos > MAX_VALUE_CHARS or not self.fill():
+                    self.error(e.msg, e.pos)
+                continue
+            # a number or literal ending at the buffer end may continue in the next block
+            if end >= len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_members(f, streamed: Iterable[str]) -> Iterator[Tuple]:
+    """Members of the top-level object read from text stream `f`; arrays under `streamed` keys element by element."""
+    streamed = set(streamed)
+    r = _Reader(f)
+    r.expect("{")
+    if r.peek() == "}":
+        r.pos += 1
+    else:
+        while True:
+            if r.peek() != '"':
+                r.error("expected a member name")
+            key = r.value()
+            r.expect(":")
+            if key in streamed and r.peek() == "[":
+                r.pos += 1
+                if r.peek() == "]":
+                    r.pos += 1
+                else:
+                    while True:
+                        yield key, ITEM, r.value()
+                        if r.expect(",]") == "]":
+                            break
+            else:
+                yield key, r.value()
+            if r.expect(",}") == "}":
+                break
+    if r.peek():
+        r.error("extra data after the document")
+
+
+def open_json(path: Path):
+    """Text stream for iter_members(); a UTF-8 BOM is skipped."""
+    return open(path, "r", encoding="utf-8-sig")
@@ -0,0 +1,73 @@
+# app/services/parser/message_store.py
+"""
+Column-backed message storage for one chat thread.
+A thread can hold millions of messages; one dict per message repeats the
+keys from/subject/body/timestamp/attachments every time. MessageColumns keeps
+one list (or int64 array) per field instead, with the rarely used fields
+(id, subject, attachments) stored sparsely. Iterating yields the familiar
+message dicts, built on the fly, so serializers don't need to change.
+"""
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class MessageColumns:
+    __slots__ = ("_from", "_body", "_timestamp", "_id", "_subject", "_attachments")
+
+    def __init__(self):
+        self._from: List[Any] = []
+        self._body: List[Optional[str]] = []
+        self._timestamp = array("q")
+        # sparse columns: row -> value, only for rows that have one
+        self._id: Dict[int, Any] = {}
+        self._subject: Dict[int, str] = {}
+        self._attachments: Dict[int, List[str]] = {}
+
+    def add(self, from_account, subject: Optional[str], body: Optional[str], timestamp: int,
+            attachments: Optional[List[str]] = None, id_=None):
+        row = len(self._body)
+        self._from.append(from_account)
+        self._body.append(body)
+        try:
+            self._timestamp.append(timestamp or 0)
+        except (OverflowError, TypeError):
+            # out-of-range / non-int timestamp: fall back to a plain list column
+            self._timestamp = list(self._timestamp)
+            self._timestamp.append(timestamp or 0)
+        if id_ is not None:
+            self._id[row] = id_
+        if subject is not None:
+            self._subject[row] = subject
+        if attachments:
+            self._attachments[row] = list(attachments)
+
+    def append(self, msg: Dict[str, Any]):
+        """dict-style insert (same keys as the serialized message)."""
+        self.add(msg.get("from"), msg.get("subject"), msg.get("body"), msg.get("timestamp"),
+                 msg.get("attachments"), msg.get("id"))
+
+    def row(self, i: int) -> Dict[str, Any]:
+        return {
+            "id": self._id.get(i),
+            "from": self._from[i],
+            "subject": self._subject.get(i),
+            "body": self._body[i],
+            "timestamp": self._timestamp[i],
+            "attachments": list(self._attachments.get(i, ())),
+        }
+
+    def __len__(self):
+        return len(self._body)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.row(k) for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.row(i)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self.row(i)
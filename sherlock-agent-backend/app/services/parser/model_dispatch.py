@@ -0,0 +1,161 @@
+# app/services/parser/model_dispatch.py
+"""
+Type-subscribed dispatch of decodedData models.
+Handlers declare the model types they consume in a `model_types` class
+attribute; models nobody subscribed to are skipped by the parser before
+anything is built. Subscribed models are handed over as LazyModel views
+that convert a field only when a handler reads it.
+"""
+import logging
+from time import perf_counter
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("model_dispatch")
+
+
+def local_name(tag: str) -> str:
+    # strip "{namespace}" from a tag
+    return tag.rsplit("}", 1)[1] if "}" in tag else tag
+
+
+def _text(elem) -> Optional[str]:
+    if elem is None:
+        return None
+    text = (elem.text or "").strip()
+    return text if text != "" else None
+
+
+class LazyFields(Mapping):
+    """
+    Field mapping of a <model> element. The children are indexed by name on
+    first access; each value is converted (and cached) when it is read.
+    Same value shapes as ufed_sax_parser._build_model_from_element.
+    """
+    __slots__ = ("_elem", "_index", "_cache")
+
+    def __init__(self, elem):
+        self._elem = elem
+        self._index = None
+        self._cache = {}
+
+    def _children(self) -> Dict[str, Any]:
+        if self._index is None:
+            index = {}
+            for child in self._elem:
+                if local_name(child.tag) in ("field", "multiField", "modelField", "multiModelField"):
+                    # later duplicates win, like the eager builder
+                    index[child.attrib.get("name")] = child
+            self._index = index
+        return self._index
+
+    def __getitem__(self, name):
+        if name in self._cache:
+            return self._cache[name]
+        child = self._children()[name]
+        tag = local_name(child.tag)
+        if tag == "field":
+            value = None
+            for v in child:
+                if local_name(v.tag) == "value":
+                    value = _text(v)
+                    break
+        elif tag == "multiField":
+            value = [t for t in (_text(v) for v in child if local_name(v.tag) == "value") if t is not None]
+        else:
+            value = [LazyModel(sub) for sub in child if local_name(sub.tag) == "model"]
+        self._cache[name] = value
+        return value
+
+    def __iter__(self):
+        return iter(self._children())
+
+    def __len__(self):
+        return len(self._children())
+
+
+class LazyModel(Mapping):
+    """
+    Read-only dict view over a <model> element with the keys
+    id / type / attributes / fields. Only valid while the element is alive,
+    i.e. for the duration of the handler call: handlers must copy what they keep.
+    """
+    __slots__ = ("_elem", "_fields")
+    _KEYS = ("id", "type", "attributes", "fields")
+
+    def __init__(self, elem):
+        self._elem = elem
+        self._fields = None
+
+    def __getitem__(self, key):
+        if key == "id" or key == "type":
+            return self._elem.attrib.get(key)
+        if key == "attributes":
+            return self._elem.attrib
+        if key == "fields":
+            if self._fields is None:
+                self._fields = LazyFields(self._elem)
+            return self._fields
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+
+class ModelDispatcher:
+    """
+    Routes models to the handlers subscribed to their type, in registration
+    order. A handler without `model_types` receives every model.
+    Handler exceptions are logged and counted instead of aborting the parse;
+    time spent in each handler goes to the "handler.<class>" timer.
+    """
+
+    def __init__(self, handlers: Iterable[Any], stats=None):
+        self.stats = stats
+        self._handlers = list(handlers)
+        self._catch_all = any(getattr(h, "model_types", None) is None for h in self._handlers)
+        # type -> subscribed handlers, in registration order
+        self._by_type: Dict[Optional[str], List[Any]] = {}
+        # handler -> its ParseStats timer ("handler.<class>")
+        self._timer_names: Dict[Any, str] = {}
+
+    def _subscribers(self, mtype: Optional[str]) -> List[Any]:
+        subs = self._by_type.get(mtype)
+        if subs is None:
+            subs = [h for h in self._handlers
+                    if getattr(h, "model_types", None) is None or mtype in h.model_types]
+            self._by_type[mtype] = subs
+        return subs
+
+    @property
+    def model_types(self) -> Optional[frozenset]:
+        """Subscribed types, or None when some handler wants everything."""
+        if self._catch_all:
+            return None
+        return frozenset(t for h in self._handlers for t in h.model_types)
+
+    def wants(self, mtype: Optional[str]) -> bool:
+        return bool(self._subscribers(mtype))
+
+    def dispatch(self, model) -> None:
+        mtype = model.get("type")
+        stats = self.stats
+        for h in self._subscribers(mtype):
+            t0 = perf_counter()
+            try:
+                h.new_model(model)
+            except Exception as e:
+                name = type(h).__name__
+                logger.warning("%s failed on %s model %s: %s", name, mtype, model.get("id"), e)
+                logger.debug("handler traceback", exc_info=True)
+                if stats is not None:
+                    stats.handler_error(name)
+            if stats is not None:
+                stats.add_time(self._timer_names.get(h) or self._timer_name(h), perf_counter() - t0)
+
+    def _timer_name(self, handler) -> str:
+        name = self._timer_names[handler] = "handler." + type(handler).__name__
+        return name
@@ -0,0 +1,173 @@
+# app/services/parser/parse_stats.py
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from app.utils.memory import current_rss_bytes
+from . import account_tools
+
+
+class ParseStats:
+    """
+    Per-parse bookkeeping shared by the parsers and case_parser.
+    Counts top-level elements and samples RSS every `rss_sample_every`
+    elements to keep a high-water mark for this parse (the OS counter is
+    per process and would mix in earlier parses of a long-lived worker).
+
+    Time is kept two ways: wall time per stage (copy / parse / write, closed
+    by set_stage) and cumulative timers for the hot paths inside a stage
+    (iterparse, handler.<Name>, sink write ...), fed with add_time() or
+    `with stats.timer(name)`. Timers nest, so they don't add up to a stage.
+    """
+
+    # class-level defaults keep stats pickled by older checkpoints loadable
+    stage = "parse"
+    bytes_read = 0
+    bytes_total: Optional[int] = None
+    stage_started: Optional[float] = None
+    stage_s: Optional[Dict[str, float]] = None
+    timers: Optional[Dict[str, List[float]]] = None
+
+    def __init__(self, rss_sample_every: int = 500):
+        self.rss_sample_every = max(1, rss_sample_every)
+        self.elements = 0
+        self.start_rss_bytes = current_rss_bytes()
+        self.peak_rss_bytes = self.start_rss_bytes
+        self.started_at = time.time()
+        # top-level models seen per type / skipped because nobody subscribed
+        self.models_by_type: Counter = Counter()
+        self.models_skipped = 0
+        # exceptions swallowed per handler class
+        self.handler_errors: Counter = Counter()
+        # identifier caches are process-wide: keep the counters at start to report deltas
+        self._cache_start = account_tools.identifier_cache_stats()
+        # times this parse was restored from a checkpoint
+        self.resumes = 0
+        self._cache_before_resume: Dict[str, Dict[str, int]] = {}
+        # what the parse is doing (copy / parse / write / done) and how far the report has been read
+        self.stage = "starting"
+        self.bytes_read = 0
+        self.bytes_total = None
+        # wall seconds per finished stage; name -> [seconds, calls] for the timers
+        self.stage_started = time.perf_counter()
+        self.stage_s = {}
+        self.timers = {}
+
+    def tick(self, n: int = 1):
+        before = self.elements
+        self.elements += n
+        if before // self.rss_sample_every != self.elements // self.rss_sample_every:
+            self.sample_rss()
+
+    def count_model(self, mtype: Optional[str], skipped: bool = False):
+        self.models_by_type[mtype or "?"] += 1
+        if skipped:
+            self.models_skipped += 1
+
+    def handler_error(self, handler_name: str):
+        self.handler_errors[handler_name] += 1
+
+    def sample_rss(self) -> int:
+        rss = current_rss_bytes()
+        if rss > self.peak_rss_bytes:
+            self.peak_rss_bytes = rss
+        return rss
+
+    def resumed(self):
+        """Called on stats restored from a checkpoint, in the resuming process."""
+        self.resumes += 1
+        # bank the cache deltas of the earlier process, restart from this one's counters
+        self._cache_before_resume = self.identifier_cache()
+        self._cache_start = account_tools.identifier_cache_stats()
+        # perf_counter of another process: the interrupted stage restarts its clock here
+        self.stage_started = None
+        self.sample_rss()
+
+    def identifier_cache(self) -> Dict[str, Dict[str, int]]:
+        """Hits / misses of the identifier caches during this parse."""
+        out = {}
+        for name, now in account_tools.identifier_cache_stats().items():
+            start = self._cache_start.get(name, {})
+            before = self._cache_before_resume.get(name, {})
+            out[name] = {"hits": now["hits"] - start.get("hits", 0) + before.get("hits", 0),
+                         "misses": now["misses"] - start.get("misses", 0) + before.get("misses", 0)}
+        return out
+
+    def set_stage(self, stage: str):
+        now = time.perf_counter()
+        if self.stage_s is None:     # restored from an older checkpoint
+            self.stage_s = {}
+        if self.stage_started is not None:
+            self.stage_s[self.stage] = self.stage_s.get(self.stage, 0.0) + now - self.stage_started
+        self.stage = stage
+        self.stage_started = now
+
+    def add_time(self, name: str, seconds: float, calls: int = 1):
+        if self.timers is None:
+            self.timers = {}
+        t = self.timers.get(name)
+        if t is None:
+            self.timers[name] = [seconds, calls]
+        else:
+            t[0] += seconds
+            t[1] += calls
+
+    def timer(self, name: str) -> "_Timer":
+        return _Timer(self, name)
+
+    def timings(self) -> Dict[str, Any]:
+        """{"stages": {stage: s}, "timers": {name: {"s", "calls"}}}, rounded for the summary."""
+        stages = dict(self.stage_s or {})
+        if self.stage_started is not None and self.stage != "done":
+            stages[self.stage] = stages.get(self.stage, 0.0) + time.perf_counter() - self.stage_started
+        return {
+            "stages": {k: round(v, 4) for k, v in stages.items()},
+            "timers": {k: {"s": round(v[0], 4), "calls": v[1]} for k, v in sorted((self.timers or {}).items())},
+        }
+
+    def progress(self) -> Dict[str, Any]:
+        """Live counters; cheap enough to poll from another thread while the parse runs."""
+        return {
+            "stage": self.stage,
+            "bytes_read": self.bytes_read,
+            "bytes_total": self.bytes_total,
+            "elements": self.elements,
+            "models_by_type": dict(self.models_by_type),
+            "handler_errors": dict(self.handler_errors),
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "elapsed_s": round(time.time() - self.started_at, 3),
+            "timings": self.timings(),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.sample_rss()
+        return {
+            "elements": self.elements,
+            "bytes_read": self.bytes_read,
+            "start_rss_bytes": self.start_rss_bytes,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "duration_s": round(time.time() - self.started_at, 3),
+            "models_by_type": dict(self.models_by_type),
+            "models_skipped": self.models_skipped,
+            "handler_errors": dict(self.handler_errors),
+            "identifier_cache": self.identifier_cache(),
+            "resumes": self.resumes,
+            "timings": self.timings(),
+        }
+
+
+class _Timer:
+    """Context manager adding its wall time to ParseStats timer `name`."""
+    __slots__ = ("stats", "name", "t0")
+
+    def __init__(self, stats: ParseStats, name: str):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add_time(self.name, time.perf_counter() - self.t0)
+        return False
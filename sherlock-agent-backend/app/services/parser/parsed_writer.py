@@ -0,0 +1,384 @@
+# app/services/parser/parsed_writer.py
+"""
+Streaming output of the normalized case (parsed.json).
+The document handed to a sink is a plain dict whose collection values may be
+iterators: they are encoded item by item as they are produced, so the
+serialized case never exists in memory as a whole. Dicts holding iterators
+(e.g. a chat thread with its messages) are streamed the same way.
+
+Formats (config.PARSED_FORMAT):
+- pretty  : parsed.json, indent=2 (byte-identical to json.dump(indent=2))
+- compact : parsed.json without whitespace
+- ndjson  : parsed/<collection>.ndjson, one item per line, plus parsed/header.json
+            for the scalar keys
+
+parsed.json can also be written precompressed (parsed.json.gz, and
+parsed.json.zst when zstandard is installed), compressed in the same pass as
+the JSON is encoded, so /parsed serves bytes without re-encoding.
+
+The event timeline is ordered through ExternalSorter (sorted runs spilled to
+disk, merged with heapq.merge).
+"""
+import json
+import zlib
+import heapq
+import pickle
+import shutil
+import logging
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger("parsed_writer")
+
+PARSED_FILE = "parsed.json"
+NDJSON_DIR = "parsed"
+HEADER_FILE = "header.json"
+FORMATS = ("pretty", "compact", "ndjson")
+
+_WRITE_BUFFER = 1024 * 1024
+
+# Content-Encoding -> suffix of the precompressed parsed.json, in serving preference
+ENCODINGS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+# one encoder per layout: json.dumps would build a new one for every item
+_ENCODERS: Dict[Optional[int], json.JSONEncoder] = {}
+
+
+def _dumps(value: Any, indent: Optional[int]) -> str:
+    enc = _ENCODERS.get(indent)
+    if enc is None:
+        if indent is None:
+            enc = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        else:
+            enc = json.JSONEncoder(ensure_ascii=False, indent=indent)
+        _ENCODERS[indent] = enc
+    return enc.encode(value)
+
+
+def _is_streamed(value: Any) -> bool:
+    return isinstance(value, Iterator) or (
+        isinstance(value, dict) and any(isinstance(v, Iterator) for v in value.values()))
+
+
+def encode(value: Any, write: Callable[[str], Any], indent: Optional[int] = 2, level: int = 0):
+    """
+    Write `value` as JSON through `write`. Iterators are encoded as lists,
+    lazily; everything else goes through json.dumps.
+    """
+    if isinstance(value, Iterator):
+        _encode_list(value, write, indent, level)
+    elif isinstance(value, dict) and _is_streamed(value):
+        _encode_dict(value, write, indent, level)
+    else:
+        text = _dumps(value, indent)
+        if indent and level and "\n" in text:
+            # json escapes newlines inside strings, so every "\n" is layout
+            text = text.replace("\n", "\n" + " " * (indent * level))
+        write(text)
+
+
+def _encode_list(items, write, indent, level):
+    inner = "\n" + " " * (indent * (level + 1)) if indent else ""
+    first = True
+    for item in items:
+        write("[" if first else ",")
+        first = False
+        write(inner)
+        encode(item, write, indent, level + 1)
+    if first:
+        write("[]")
+        return
+    if indent:
+        write("\n" + " " * (indent * level))
+    write("]")
+
+
+def _encode_dict(obj, write, indent, level):
+    inner = "\n" + " " * (indent * (level + 1)) if indent else ""
+    sep = ": " if indent else ":"
+    first = True
+    for key, value in obj.items():
+        write("{" if first else ",")
+        first = False
+        write(inner)
+        write(_dumps(str(key), None) + sep)
+        encode(value, write, indent, level + 1)
+    if indent:
+        write("\n" + " " * (indent * level))
+    write("}")
+
+
+def _remove_path(p: Path):
+    if p.is_dir():
+        shutil.rmtree(p, ignore_errors=True)
+    elif p.exists():
+        p.unlink()
+
+
+def available_encodings(names) -> List[str]:
+    """The requested encodings this process can produce (zstd needs zstandard)."""
+    out = []
+    for name in names:
+        if name not in ENCODINGS:
+            raise ValueError(f"unknown parsed encoding {name!r} (expected one of {', '.join(ENCODINGS)})")
+        if name == "zstd" and zstandard is None:
+            logger.warning("zstandard not installed; not writing parsed.json.zst")
+            continue
+        out.append(name)
+    return out
+
+
+def encoded_path(case_dir: Path, encoding: str) -> Path:
+    return Path(case_dir) / (PARSED_FILE + ENCODINGS[encoding])
+
+
+def _compressor(encoding: str):
+    if encoding == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    return zstandard.ZstdCompressor(level=10).compressobj()
+
+
+class _TeeWriter:
+    """
+    Text sink writing UTF-8 to `out` and, compressed, to each of `encoded`.
+    Small writes are gathered so every output sees ~1 MB chunks.
+    """
+
+    def __init__(self, out, encoded: Dict[str, Any]):
+        self.out = out
+        self.encoded = [(f, _compressor(enc)) for enc, f in encoded.items()]
+        self._parts: List[str] = []
+        self._size = 0
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= _WRITE_BUFFER:
+            self.flush()
+
+    def flush(self):
+        if not self._parts:
+            return
+        raw = "".join(self._parts).encode("utf-8")
+        self._parts, self._size = [], 0
+        self.out.write(raw)
+        for f, comp in self.encoded:
+            f.write(comp.compress(raw))
+
+    def close(self):
+        self.flush()
+        for f, comp in self.encoded:
+            f.write(comp.flush())
+
+
+class ParsedSink(ABC):
+    """
+    Destination of the normalized case. write() consumes the document once
+    and must leave either the complete new output or the previous one.
+    """
+
+    def __init__(self, case_dir: Path):
+        self.case_dir = Path(case_dir)
+
+    @abstractmethod
+    def write(self, doc: Dict[str, Any]):
+        ...
+
+
+class JsonSink(ParsedSink):
+    """parsed.json, pretty (indent=2) or compact (indent=None), plus its `encodings`."""
+
+    def __init__(self, case_dir: Path, indent: Optional[int] = 2, encodings=()):
+        super().__init__(case_dir)
+        self.indent = indent
+        self.encodings = list(encodings)
+
+    def _part(self, suffix: str = ""):
+        return tempfile.NamedTemporaryFile("wb", dir=str(self.case_dir), prefix=PARSED_FILE + suffix + ".",
+                                           suffix=".part", delete=False, buffering=_WRITE_BUFFER)
+
+    def write(self, doc: Dict[str, Any]):
+        parts = {None: self._part()}
+        try:
+            for enc in self.encodings:
+                parts[enc] = self._part(ENCODINGS[enc])
+            tee = _TeeWriter(parts[None], {enc: f for enc, f in parts.items() if enc})
+            encode(doc, tee.write, self.indent)
+            tee.close()
+            for f in parts.values():
+                f.close()
+            # variants first: parsed.json itself marks the new parse (case_manager stamps)
+            for enc in ENCODINGS:
+                if enc in parts:
+                    Path(parts[enc].name).replace(encoded_path(self.case_dir, enc))
+                else:
+                    encoded_path(self.case_dir, enc).unlink(missing_ok=True)
+            Path(parts[None].name).replace(self.case_dir / PARSED_FILE)
+        except BaseException:
+            for f in parts.values():
+                f.close()
+                Path(f.name).unlink(missing_ok=True)
+            raise
+        _remove_path(self.case_dir / NDJSON_DIR)
+
+
+class NdjsonSink(ParsedSink):
+    """parsed/<collection>.ndjson for every streamed key, parsed/header.json for the rest."""
+
+    def write(self, doc: Dict[str, Any]):
+        target = self.case_dir / NDJSON_DIR
+        tmp_dir = Path(tempfile.mkdtemp(dir=str(self.case_dir), prefix=NDJSON_DIR + ".", suffix=".part"))
+        try:
+            header = {"keys": list(doc.keys()), "values": {}}
+            for key, value in doc.items():
+                if not isinstance(value, Iterator):
+                    header["values"][key] = value
+                    continue
+                with open(tmp_dir / f"{key}.ndjson", "w", encoding="utf-8", buffering=_WRITE_BUFFER) as out:
+                    for item in value:
+                        encode(item, out.write, None)
+                        out.write("\n")
+            (tmp_dir / HEADER_FILE).write_text(_dumps(header, 2), encoding="utf-8")
+            # swap directories: keep the old output until the new one is complete
+            old = None
+            if target.exists():
+                old = target.with_name(tmp_dir.name + ".old")
+                target.rename(old)
+            tmp_dir.rename(target)
+            if old is not None:
+                shutil.rmtree(old, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        _remove_path(self.case_dir / PARSED_FILE)
+        for enc in ENCODINGS:
+            encoded_path(self.case_dir, enc).unlink(missing_ok=True)
+
+
+def open_sink(case_dir: Path, fmt: str = "pretty", encodings=()) -> ParsedSink:
+    """`encodings` (gzip, zstd) apply to parsed.json; the ndjson layout is written plain."""
+    if fmt == "pretty":
+        return JsonSink(case_dir, indent=2, encodings=available_encodings(encodings))
+    if fmt == "compact":
+        return JsonSink(case_dir, indent=None, encodings=available_encodings(encodings))
+    if fmt == "ndjson":
+        return NdjsonSink(case_dir)
+    raise ValueError(f"unknown parsed output format {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+
+def parsed_exists(case_dir: Path) -> bool:
+    case_dir = Path(case_dir)
+    return (case_dir / PARSED_FILE).exists() or (case_dir / NDJSON_DIR / HEADER_FILE).exists()
+
+
+def load_parsed(case_dir: Path) -> Dict[str, Any]:
+    """Load the normalized case as one dict, whatever format it was written in."""
+    case_dir = Path(case_dir)
+    p = case_dir / PARSED_FILE
+    if p.exists():
+        with open(p, "r", encoding="utf-8") as f:
+            return json.load(f)
+    d = case_dir / NDJSON_DIR
+    header_path = d / HEADER_FILE
+    if not header_path.exists():
+        raise FileNotFoundError(f"{PARSED_FILE} not found in {case_dir}")
+    header = json.loads(header_path.read_text(encoding="utf-8"))
+    out = {}
+    for key in header.get("keys", []):
+        if key in header.get("values", {}):
+            out[key] = header["values"][key]
+            continue
+        with open(d / f"{key}.ndjson", "r", encoding="utf-8") as f:
+            out[key] = [json.loads(line) for line in f if line.strip()]
+    return out
+
+
+def event_sort_key(event: Dict[str, Any]):
+    """
+    Total order for timeline events: untimed events (no / zero timestamp)
+    first, then by timestamp. Mixed int / str timestamps can't raise.
+    """
+    ts = event.get("timestamp")
+    if not ts:
+        return (0, 0, "")
+    if isinstance(ts, (int, float)):
+        return (1, ts, "")
+    return (2, 0, str(ts))
+
+
+class ExternalSorter:
+    """
+    Stable sort of an arbitrarily long record stream. Records are buffered up
+    to `run_size`, each full buffer is sorted and spilled to a temp file, and
+    iteration merges the runs with heapq.merge.
+    Iterate once, then close() (or use as a context manager).
+    """
+
+    _BATCH = 1000
+
+    def __init__(self, key: Callable[[Any], Any], run_size: int = 100_000, tmp_dir: Optional[Path] = None):
+        self.key = key
+        self.run_size = max(1, int(run_size))
+        self._tmp_parent = str(tmp_dir) if tmp_dir is not None else None
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._buffer: List[Any] = []
+        self._runs: List[Path] = []
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, record: Any):
+        self._buffer.append(record)
+        self.count += 1
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix=".sort-", dir=self._tmp_parent)
+        self._buffer.sort(key=self.key)
+        path = Path(self._tmp.name) / f"run{len(self._runs):05d}.pkl"
+        with open(path, "wb") as f:
+            for i in range(0, len(self._buffer), self._BATCH):
+                pickle.dump(self._buffer[i:i + self._BATCH], f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._runs.append(path)
+        self._buffer = []
+
+    @staticmethod
+    def _read_run(path: Path):
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+
+    def __iter__(self):
+        self._buffer.sort(key=self.key)
+        if not self._runs:
+            return iter(self._buffer)
+        logger.debug("merging %d sorted runs (%d records)", len(self._runs) + 1, self.count)
+        # heapq.merge favours earlier iterables on ties: runs are in arrival order
+        streams = [self._read_run(p) for p in self._runs] + [iter(self._buffer)]
+        return heapq.merge(*streams, key=self.key)
+
+    def close(self):
+        self._buffer = []
+        self._runs = []
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
@@ -1,10 +1,11 @@
 # tagged_file.py
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict
 
 
-@dataclass
+@dataclass(slots=True)
 class TaggedFile:
     id: str = None
     fs: str = None
@@ -20,3 +21,8 @@ class TaggedFile:
     def __post_init__(self):
         if self.metadata is None:
             self.metadata = {}
+        # a handful of distinct filesystem / mime values repeat across every file
+        if type(self.fs) is str:
+            self.fs = sys.intern(self.fs)
+        if type(self.mimetype) is str:
+            self.mimetype = sys.intern(self.mimetype)
@@ -0,0 +1,119 @@
+# app/services/parser/ufdr_archive.py
+"""
+Zip-backed access to a UFDR archive without unpacking it.
+- the report XML is located through the zip central directory and streamed
+- tagged files are extracted one by one, only when their bytes are needed
+A small sidecar (ufdr_source.json) in the case directory remembers which
+archive backs the case so endpoints / preprocessing can extract on demand.
+"""
+import json
+import shutil
+import tempfile
+import zipfile
+import logging
+import posixpath
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("ufdr_archive")
+
+SOURCE_FILE = "ufdr_source.json"
+# directory (inside the case dir) that mirrors the archive layout
+EXTRACT_ROOT = "ufdr"
+
+
+def _report_priority(name: str):
+    base = posixpath.basename(name).lower()
+    # prefer files named 'report' or containing 'decoded' in name, then shallow paths
+    return (0 if "report" in base or "decoded" in base else 1, name.count("/"), base)
+
+
+class UFDRArchive:
+    def __init__(self, archive_path: Path):
+        self.archive_path = Path(archive_path)
+        self._zf = zipfile.ZipFile(str(self.archive_path), "r")
+
+    def close(self):
+        self._zf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def find_report(self) -> zipfile.ZipInfo:
+        candidates = [i for i in self._zf.infolist()
+                      if not i.is_dir() and i.filename.lower().endswith(".xml")]
+        if not candidates:
+            raise FileNotFoundError("No XML found inside UFDR archive")
+        return sorted(candidates, key=lambda i: _report_priority(i.filename))[0]
+
+    def open_member(self, info):
+        """Binary stream over one member (decompressed on the fly)."""
+        return self._zf.open(info, "r")
+
+    def get_member(self, name: str) -> Optional[zipfile.ZipInfo]:
+        name = name.replace("\\", "/").lstrip("/")
+        try:
+            return self._zf.getinfo(name)
+        except KeyError:
+            return None
+
+    def extract_member(self, info: zipfile.ZipInfo, dest_root: Path) -> Path:
+        """Extract a single member below dest_root (keeps the archive layout)."""
+        dest_root = Path(dest_root).resolve()
+        target = (dest_root / info.filename).resolve()
+        if dest_root != target and dest_root not in target.parents:
+            raise ValueError(f"refusing to extract outside {dest_root}: {info.filename}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # unique temp name: concurrent requests may extract the same member
+        with self._zf.open(info, "r") as src, tempfile.NamedTemporaryFile(
+                dir=str(target.parent), prefix=target.name + ".", suffix=".part", delete=False) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        Path(dst.name).replace(target)
+        return target
+
+
+def write_source_info(case_dir: Path, archive_path: Path, report_name: str):
+    info = {"archive": str(Path(archive_path).resolve()), "extract_root": EXTRACT_ROOT, "report": report_name}
+    (Path(case_dir) / SOURCE_FILE).write_text(json.dumps(info, indent=2), encoding="utf-8")
+
+
+def read_source_info(case_dir: Path) -> Optional[dict]:
+    p = Path(case_dir) / SOURCE_FILE
+    if not p.exists():
+        return None
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        logger.warning("unreadable %s in %s", SOURCE_FILE, case_dir)
+        return None
+
+
+def ensure_local_file(case_dir: Path, local_path: Path) -> Optional[Path]:
+    """
+    Return a path on disk holding the bytes of a tagged file.
+    If the case is backed by a UFDR archive and the file was not extracted yet,
+    extract just that member. Returns None when the file can't be resolved.
+    """
+    local_path = Path(local_path)
+    if local_path.exists():
+        return local_path
+    src = read_source_info(case_dir)
+    if not src:
+        return None
+    root = (Path(case_dir) / src.get("extract_root", EXTRACT_ROOT)).resolve()
+    try:
+        rel = local_path.resolve().relative_to(root)
+    except ValueError:
+        return None
+    archive_path = Path(src["archive"])
+    if not archive_path.exists():
+        return None
+    with UFDRArchive(archive_path) as archive:
+        info = archive.get_member(rel.as_posix())
+        if info is None:
+            return None
+        logger.info("lazily extracting %s from %s", info.filename, archive_path)
+        return archive.extract_member(info, root)
@@ -14,7 +14,7 @@ class UFEDFileContext:
         self._path_file_map: Dict[Path, TaggedFile] = {}
 
     def add_file(self, tagged_file: TaggedFile):
-        if not tagged_file.local_path.is_absolute():
+        if tagged_file.local_path is not None and not tagged_file.local_path.is_absolute():
             tagged_file.local_path = self.unzipped_ufdr_directory.joinpath(tagged_file.local_path)
         if tagged_file.size <= 0 and tagged_file.local_path and tagged_file.local_path.exists():
             tagged_file.size = tagged_file.local_path.stat().st_size
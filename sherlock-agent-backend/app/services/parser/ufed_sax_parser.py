@@ -1,12 +1,21 @@
 # app/services/parser/ufed_sax_parser.py
 import xml.etree.ElementTree as ET
 from pathlib import Path
-import zipfile
-import tempfile
-import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import os
+import io
+import re
+import mmap
 import logging
-from typing import Iterable, Callable, Optional, Dict, Any
+import posixpath
+from time import perf_counter
+from typing import Iterable, Callable, Optional, Dict, Any, List, Tuple, Union, BinaryIO
+
+from app import config
+from .ufdr_archive import UFDRArchive, EXTRACT_ROOT, write_source_info
+from .parse_stats import ParseStats
+from .model_dispatch import ModelDispatcher, LazyModel, local_name
 
 logger = logging.getLogger("ufed_sax_parser")
 
@@ -18,9 +27,9 @@ def _safe_text(elem: ET.Element) -> Optional[str]:
     return text if text != "" else None
 
 def _iter_find_first(elem: ET.Element, tag: str):
-    # returns first subelement matching tag (no namespace handling here)
+    # returns first subelement matching tag (namespace ignored)
     for c in elem:
-        if c.tag == tag:
+        if local_name(c.tag) == tag:
             return c
     return None
 
@@ -35,6 +44,8 @@ def _build_model_from_element(model_elem: ET.Element) -> Dict[str, Any]:
       "fields": { "FieldName": <value | list | models> }  # see below
     }
     The structure handles <field>, <multiField>, <modelField>, <multiModelField>.
+    Eager counterpart of model_dispatch.LazyModel, used where the model has to
+    leave the parser (e.g. pickled back from a parse worker).
     """
     m = {
         "id": model_elem.attrib.get("id"),
@@ -46,7 +57,7 @@ def _build_model_from_element(model_elem: ET.Element) -> Dict[str, Any]:
     # iterate children and parse typical UFED structure
     # We assume direct children are <field>, <multiField>, <modelField>, <multiModelField>
     for child in model_elem:
-        tag = child.tag
+        tag = local_name(child.tag)
         if tag == "field":
             # single value: <field name="Name" type="..."><value>...</value></field>
             name = child.attrib.get("name")
@@ -55,7 +66,9 @@ def _build_model_from_element(model_elem: ET.Element) -> Dict[str, Any]:
         elif tag == "multiField":
             name = child.attrib.get("name")
             values = []
-            for v in child.findall("value"):
+            for v in child:
+                if local_name(v.tag) != "value":
+                    continue
                 tv = _safe_text(v)
                 if tv is not None:
                     values.append(tv)
@@ -64,8 +77,9 @@ def _build_model_from_element(model_elem: ET.Element) -> Dict[str, Any]:
             name = child.attrib.get("name")
             models = []
             # child contains many <model> nodes in UFED format
-            for submodel in child.findall("model"):
-                models.append(_build_model_from_element(submodel))
+            for submodel in child:
+                if local_name(submodel.tag) == "model":
+                    models.append(_build_model_from_element(submodel))
             m["fields"][name] = models
         else:
             # unknown child, ignore or store raw text
@@ -94,19 +108,26 @@ def _build_tagged_file_from_element(file_elem: ET.Element, base_dir: Path) -> Di
         tf["mobile_path"] = str(p)
     # try to read metadata children (metadata/item name="Local Path">...</item>)
     for section in file_elem:
-        if section.tag == "metadata":
-            for item in section.findall("item"):
+        stag = local_name(section.tag)
+        if stag == "metadata":
+            for item in section:
+                if local_name(item.tag) != "item":
+                    continue
                 name = item.attrib.get("name")
                 val = _safe_text(item)
                 if name and val:
                     if name == "Local Path":
+                        # UFED writes windows separators ("files\\Image\\x.jpg")
+                        val = val.replace("\\", "/")
                         tf["local_path"] = str((base_dir / Path(val)).resolve()) if not Path(val).is_absolute() else val
                     else:
                         # generic metadata store
                         tf.setdefault("metadata", {})[name] = val
-        elif section.tag == "accessInfo":
+        elif stag == "accessInfo":
             # timestamps
-            for ts in section.findall("timestamp"):
+            for ts in section:
+                if local_name(ts.tag) != "timestamp":
+                    continue
                 nm = ts.attrib.get("name")
                 val = _safe_text(ts)
                 if nm and val:
@@ -124,20 +145,69 @@ def _build_tagged_file_from_element(file_elem: ET.Element, base_dir: Path) -> Di
     return tf
 
 # Main parser - top-level ---------------------------------------------------
-def parse_ufdr(report_path: Path,
+def parse_ufdr(report_path: Union[Path, BinaryIO],
                contact_handler,
                chat_handler,
                file_handler,
-               case_dir: Path):
+               case_dir: Path,
+               stats: Optional[ParseStats] = None,
+               checkpointer=None,
+               resume: Optional[Dict[str, Any]] = None):
     """
-    Parse a UFDR XML report file (report_path) and call handlers.
+    Parse a UFDR XML report (a path or a binary stream, e.g. a zip member) and call handlers.
     - contact_handler, chat_handler, file_handler must have new_model() / new_file() methods.
     - case_dir is used to resolve relative local paths referenced in taggedFiles.
+    Only top-level <model> elements of decodedData are dispatched; nested models
+    (entries, participants, messages ...) are built as part of their parent.
+
+    Memory stays bounded: once an element outside a <model>/<file> ends it is
+    cleared and detached from its parent, so the tree never holds more than
+    the open ancestors plus the unit being built.
+
+    `checkpointer` (see checkpoint.Checkpointer) is offered a save after each
+    unit; `resume` is a sequential checkpoint position: its first `units`
+    top-level units are read past without being built or dispatched.
     """
 
     # guard: ensure file exists
-    if not report_path.exists():
+    is_stream = hasattr(report_path, "read")
+    if not is_stream and not Path(report_path).exists():
         raise FileNotFoundError(f"report XML not found: {report_path}")
+    stats = stats or ParseStats()
+    if is_stream:
+        # reading a zip member includes inflating it
+        _parse_stream(report_path, contact_handler, chat_handler, file_handler, case_dir, stats, checkpointer, resume,
+                      read_timer="unzip")
+    else:
+        stats.bytes_total = Path(report_path).stat().st_size
+        with open(report_path, "rb") as f:
+            _parse_stream(f, contact_handler, chat_handler, file_handler, case_dir, stats, checkpointer, resume)
+
+    # finished parsing
+    stats.sample_rss()
+    logger.info("ufdr parsing finished for %s (%d elements, peak rss %d bytes)",
+                report_path, stats.elements, stats.peak_rss_bytes)
+
+
+class _CountingReader:
+    """Binary stream that adds what iterparse reads to stats.bytes_read, and the time to timer `timer`."""
+
+    def __init__(self, raw: BinaryIO, stats: ParseStats, timer: str = "read"):
+        self.raw = raw
+        self.stats = stats
+        self.timer = timer
+
+    def read(self, n: int = -1) -> bytes:
+        t0 = perf_counter()
+        data = self.raw.read(n)
+        self.stats.add_time(self.timer, perf_counter() - t0)
+        self.stats.bytes_read += len(data)
+        return data
+
+
+def _parse_stream(stream: BinaryIO, contact_handler, chat_handler, file_handler, case_dir: Path,
+                  stats: ParseStats, checkpointer, resume: Optional[Dict[str, Any]], read_timer: str = "read"):
+    dispatcher = ModelDispatcher((contact_handler, chat_handler, file_handler), stats)
 
     # We'll stream-parse the XML for 'model' entries inside decodedData
     context_base = case_dir
@@ -145,77 +215,329 @@ def parse_ufdr(report_path: Path,
     # Use iterparse to catch end events for model/file elements
     # We need to detect which section we are in: taggedFiles or decodedData
     events = ("start", "end")
+    stats.bytes_read = 0
     try:
-        it = ET.iterparse(str(report_path), events=events)
+        it = ET.iterparse(_CountingReader(stream, stats, read_timer), events=events)
     except Exception as e:
         logger.exception("iterparse failed: %s", e)
         raise
 
     current_section = None
-    # buffer for minimal tree for a single model or file element
+    # the top-level <model>/<file> currently streaming by; events inside it
+    # are ignored until it ends, its children survive until then
+    unit_elem = None
+    # unit_elem is a model nobody subscribed to: it is dropped unbuilt
+    skip_unit = False
+    # open elements outside units, root first
+    stack: List[ET.Element] = []
+    # top-level units seen so far; the first resume_units are already in the restored state
+    units = 0
+    resume_units = int((resume or {}).get("units") or 0)
+    # "iterparse" is the time between units (XML parsing, incl. the read /
+    # unzip timer); what happens with a unit is timed on its own
+    mark = perf_counter()
     for event, elem in it:
-        tag = elem.tag
+        if unit_elem is not None:
+            if elem is not unit_elem:
+                continue
+            # end of the unit
+            now = perf_counter()
+            stats.add_time("iterparse", now - mark)
+            unit_elem = None
+            stack.pop()
+            units += 1
+            if units <= resume_units:
+                elem.clear()
+                stack[-1].remove(elem)
+                continue
+            if current_section == "taggedFiles":
+                # Build a tagged file dict and call file_handler.new_file
+                try:
+                    tf = _build_tagged_file_from_element(elem, context_base)
+                    t1 = perf_counter()
+                    stats.add_time("build_file", t1 - now)
+                    file_handler.new_file(tf)
+                    stats.add_time("handler." + type(file_handler).__name__, perf_counter() - t1)
+                except Exception as e:
+                    logger.exception("error handling tagged file: %s", e)
+                    stats.handler_error(type(file_handler).__name__)
+            elif skip_unit:
+                stats.count_model(elem.attrib.get("type"), skipped=True)
+            else:
+                # top-level model inside decodedData: handlers read it lazily
+                # while the element is still alive
+                stats.count_model(elem.attrib.get("type"))
+                try:
+                    dispatcher.dispatch(LazyModel(elem))
+                except Exception as e:
+                    logger.exception("error dispatching model: %s", e)
+            stats.tick()
+            # clear and detach processed elements to keep memory flat
+            elem.clear()
+            stack[-1].remove(elem)
+            if checkpointer is not None:
+                checkpointer.maybe_save({"mode": "sequential", "units": units}, units)
+            mark = perf_counter()
+            continue
 
         # Keep tag local (strip namespace if present)
-        if "}" in tag:
-            tag = tag.split("}", 1)[1]
+        tag = local_name(elem.tag)
 
         if event == "start":
+            stack.append(elem)
             # detect sections
             if tag == "taggedFiles":
                 current_section = "taggedFiles"
             elif tag == "decodedData":
                 current_section = "decodedData"
-            elif tag == "modelType":
-                # model type sub-section (optional)
-                pass
-            # continue
-        elif event == "end":
-            if tag == "file" and current_section == "taggedFiles":
-                # Build a tagged file dict and call file_handler.new_file
-                try:
-                    tf = _build_tagged_file_from_element(elem, context_base)
-                    # file_handler.new_file expects TaggedFile-like object; try to pass dict
-                    file_handler.new_file(tf)
-                except Exception as e:
-                    logger.exception("error handling tagged file: %s", e)
-                finally:
-                    # clear element to free memory
-                    elem.clear()
             elif tag == "model" and current_section == "decodedData":
-                # this is a model element inside decodedData
+                unit_elem = elem
+                skip_unit = units < resume_units or not dispatcher.wants(elem.attrib.get("type"))
+            elif tag == "file" and current_section == "taggedFiles":
+                unit_elem = elem
+                skip_unit = False
+            continue
+
+        # end of an element outside any unit
+        stack.pop()
+        if tag in ("taggedFiles", "decodedData"):
+            # leaving a section: reset section marker
+            current_section = None
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+# Parallel parser -------------------------------------------------------------
+# Matches the tags that delimit independent units of work. Attribute values
+# containing '>' are not expected in UFED reports.
+_SPLIT_TAG_RE = re.compile(rb"<(/?)(taggedFiles|decodedData|modelType|model|file)\b([^>]*)>")
+_ROOT_START_RE = re.compile(rb"<([A-Za-z_][\w.:-]*)\b[^>]*>")
+
+
+def _find_root_start(buf) -> Tuple[int, bytes]:
+    """Return (end offset, tag name) of the document element's start tag."""
+    pos = 0
+    while True:
+        m = _ROOT_START_RE.search(buf, pos)
+        if m is None:
+            raise ValueError("no root element found in report XML")
+        # skip anything that sits inside a comment or processing instruction
+        comment = buf.rfind(b"<!--", 0, m.start())
+        if comment != -1 and buf.find(b"-->", comment, m.start()) == -1:
+            pos = buf.find(b"-->", m.start()) + 3
+            continue
+        return m.end(), m.group(1)
+
+
+def _scan_chunks(report_path: Path, chunk_bytes: int) -> Tuple[bytes, bytes, List[Tuple[str, int, int]]]:
+    """
+    Split a report into independent chunks without building a tree.
+    Returns (prolog incl. root start tag, root tag name, [(section, start, end), ...])
+    where every chunk is a run of consecutive top-level <file> (taggedFiles)
+    or <model> (decodedData, within one <modelType>) elements, in document order.
+    """
+    chunks: List[Tuple[str, int, int]] = []
+    with open(report_path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            raise ValueError(f"empty report XML: {report_path}")
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            root_end, root_tag = _find_root_start(buf)
+            prolog = bytes(buf[:root_end])
+
+            section = None
+            unit = b"model"
+            depth = 0
+            chunk_start = None
+            last_end = None
+            for m in _SPLIT_TAG_RE.finditer(buf, root_end):
+                closing, tag, rest = m.group(1), m.group(2), m.group(3)
+                if tag in (b"taggedFiles", b"decodedData"):
+                    if chunk_start is not None:
+                        chunks.append((section, chunk_start, last_end))
+                        chunk_start = None
+                    if closing or rest.endswith(b"/"):
+                        section = None
+                    else:
+                        section = tag.decode()
+                        unit = b"file" if tag == b"taggedFiles" else b"model"
+                        depth = 0
+                    continue
+                if section is None:
+                    continue
+                if tag == b"modelType" and depth == 0:
+                    # chunks never straddle a <modelType> boundary
+                    if chunk_start is not None:
+                        chunks.append((section, chunk_start, last_end))
+                        chunk_start = None
+                    continue
+                if tag != unit:
+                    continue
+                if closing:
+                    depth -= 1
+                    if depth != 0:
+                        continue
+                elif rest.endswith(b"/"):
+                    if depth != 0:
+                        continue
+                else:
+                    depth += 1
+                    if depth == 1 and chunk_start is None:
+                        chunk_start = m.start()
+                    continue
+                # a top-level unit just ended (or was self-closing)
+                if chunk_start is None:
+                    chunk_start = m.start()
+                last_end = m.end()
+                if last_end - chunk_start >= chunk_bytes:
+                    chunks.append((section, chunk_start, last_end))
+                    chunk_start = None
+            if chunk_start is not None and last_end is not None and last_end > chunk_start:
+                chunks.append((section, chunk_start, last_end))
+    return prolog, root_tag, chunks
+
+
+def _parse_chunk(args) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Worker entry point: parse one chunk and return built items in order,
+    as ("file", tagged_file_dict) / ("model", model_dict) tuples.
+    Models whose type is not in `wanted` (None = all) are not built and come
+    back as ("skipped", model_type).
+    """
+    report_path, prolog, root_tag, section, start, end, base_dir, wanted = args
+    with open(report_path, "rb") as fh:
+        fh.seek(start)
+        body = fh.read(end - start)
+    # re-wrap the fragment in the original root (keeps namespaces/encoding)
+    wrapped = b"".join((prolog, b"<", section.encode(), b">", body,
+                        b"</", section.encode(), b"></", root_tag, b">"))
+    del body
+
+    out: List[Tuple[str, Dict[str, Any]]] = []
+    unit = "file" if section == "taggedFiles" else "model"
+    depth = 0
+    stack: List[ET.Element] = []
+    for event, elem in ET.iterparse(io.BytesIO(wrapped), events=("start", "end")):
+        tag = elem.tag
+        if "}" in tag:
+            tag = tag.split("}", 1)[1]
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        # top-level units are the grandchildren of the wrapping root
+        if len(stack) != 2 or tag != unit:
+            continue
+        try:
+            if unit == "file":
+                out.append(("file", _build_tagged_file_from_element(elem, Path(base_dir))))
+            elif wanted is not None and elem.attrib.get("type") not in wanted:
+                out.append(("skipped", elem.attrib.get("type")))
+            else:
+                out.append(("model", _build_model_from_element(elem)))
+        except Exception as e:
+            logger.exception("error building %s in chunk %d-%d: %s", unit, start, end, e)
+        stack[-1].remove(elem)
+    return out
+
+
+def parse_ufdr_parallel(report_path: Path,
+                        contact_handler,
+                        chat_handler,
+                        file_handler,
+                        case_dir: Path,
+                        workers: int = None,
+                        chunk_bytes: int = None,
+                        stats: Optional[ParseStats] = None,
+                        checkpointer=None,
+                        resume: Optional[Dict[str, Any]] = None):
+    """
+    Multi-process variant of parse_ufdr().
+    The report is split into chunks of top-level <file>/<model> elements;
+    worker processes build the dicts and the parent feeds the handlers in
+    document order, so AccountManager / UFEDFileContext end up exactly as
+    with the sequential parser.
+    Checkpoints are offered after each merged chunk; `resume` (a parallel
+    checkpoint position) restarts at its chunk index / byte offset.
+    """
+    workers = workers or config.PARSE_WORKERS
+    chunk_bytes = chunk_bytes or config.PARSE_CHUNK_BYTES
+    stats = stats or ParseStats()
+    dispatcher = ModelDispatcher((contact_handler, chat_handler, file_handler), stats)
+    report_path = Path(report_path)
+    if not report_path.exists():
+        raise FileNotFoundError(f"report XML not found: {report_path}")
+
+    stats.bytes_total = report_path.stat().st_size
+    with stats.timer("scan_chunks"):
+        prolog, root_tag, chunks = _scan_chunks(report_path, chunk_bytes)
+    logger.info("parallel parse of %s: %d chunks, %d workers", report_path, len(chunks), workers)
+    first_chunk = int((resume or {}).get("chunk") or 0)
+    if first_chunk:
+        offset = chunks[first_chunk][1] if first_chunk < len(chunks) else None
+        if offset != resume.get("offset"):
+            raise ValueError(f"checkpoint offset {resume.get('offset')} does not match chunk {first_chunk} "
+                             f"of {report_path} (at {offset})")
+        logger.info("resuming at chunk %d/%d (byte %s)", first_chunk, len(chunks), offset)
+    tasks = [(index, (str(report_path), prolog, root_tag, section, start, end, str(case_dir), dispatcher.model_types))
+             for index, (section, start, end) in enumerate(chunks) if index >= first_chunk]
+
+    file_timer = "handler." + type(file_handler).__name__
+
+    def _merge(index, items):
+        t0 = perf_counter()
+        for kind, obj in items:
+            if kind == "file":
+                t1 = perf_counter()
                 try:
-                    model = _build_model_from_element(elem)
-                    # dispatch to handlers by type. The model dict has "type"
-                    mtype = (model.get("type") or "").lower()
-                    # call both handlers (they will ignore types they don't handle)
-                    try:
-                        contact_handler.new_model(model)
-                    except Exception:
-                        logger.debug("contact_handler new_model threw; continuing", exc_info=True)
-                    try:
-                        chat_handler.new_model(model)
-                    except Exception:
-                        logger.debug("chat_handler new_model threw; continuing", exc_info=True)
-                    try:
-                        file_handler.new_model(model)
-                    except Exception:
-                        logger.debug("file_handler new_model threw; continuing", exc_info=True)
+                    file_handler.new_file(obj)
                 except Exception as e:
-                    logger.exception("error building model: %s", e)
-                finally:
-                    elem.clear()
-
-            elif tag in ("taggedFiles", "decodedData") and event == "end":
-                # leaving a section: reset section marker
-                current_section = None
-                elem.clear()
+                    logger.exception("error handling tagged file: %s", e)
+                    stats.handler_error(type(file_handler).__name__)
+                stats.add_time(file_timer, perf_counter() - t1)
+            elif kind == "skipped":
+                stats.count_model(obj, skipped=True)
             else:
-                # clear other end elements to keep memory low
-                elem.clear()
+                stats.count_model(obj.get("type"))
+                dispatcher.dispatch(obj)
+        stats.tick(len(items))
+        stats.bytes_read = chunks[index][2]
+        stats.add_time("merge", perf_counter() - t0)
+        if checkpointer is not None:
+            nxt = index + 1
+            position = {"mode": "parallel", "chunk": nxt,
+                        "offset": chunks[nxt][1] if nxt < len(chunks) else None}
+            checkpointer.maybe_save(position, stats.elements)
 
-    # finished parsing
-    logger.info("ufdr parsing finished for %s", report_path)
+    # "build_chunk" (inline) / "chunk_wait" (pool): parsing + building the
+    # chunk's models, or the part of it the merge had to wait for
+    if workers <= 1:
+        for index, task in tasks:
+            with stats.timer("build_chunk"):
+                items = _parse_chunk(task)
+            _merge(index, items)
+    else:
+        # keep a bounded window of chunks in flight and merge them in order
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            task_iter = iter(tasks)
+            for index, task in task_iter:
+                pending.append((index, pool.submit(_parse_chunk, task)))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                index, future = pending.popleft()
+                with stats.timer("chunk_wait"):
+                    items = future.result()
+                nxt = next(task_iter, None)
+                if nxt is not None:
+                    pending.append((nxt[0], pool.submit(_parse_chunk, nxt[1])))
+                _merge(index, items)
+
+    stats.sample_rss()
+    logger.info("ufdr parallel parsing finished for %s (peak rss %d bytes in parent)",
+                report_path, stats.peak_rss_bytes)
 
 
 # Utility to accept zip/ufdr path and find a report XML ----------------------
@@ -223,39 +545,66 @@ def parse_ufdr_archive(archive_path: Path,
                        contact_handler,
                        chat_handler,
                        file_handler,
-                       case_dir: Path):
+                       case_dir: Path,
+                       workers: int = 1,
+                       stats: Optional[ParseStats] = None,
+                       checkpointer=None,
+                       resume: Optional[Dict[str, Any]] = None):
     """
-    If archive_path is a zip (.ufdr or .zip) it will be unpacked to a temp dir and we will
-    search for the primary XML report. If archive_path is a directory, it will try to find
-    an XML inside. Finally it calls parse_ufdr(report_xml, ...).
+    - zip (.ufdr or .zip): the report XML is found through the central directory
+      and streamed straight out of the archive; nothing else is extracted.
+      Tagged files resolve below <case_dir>/ufdr/ and are extracted lazily
+      (see ufdr_archive.ensure_local_file). With workers > 1 only the report
+      member is extracted, since the parallel parser needs byte offsets.
+    - directory: the report XML is searched inside it.
+    - .xml file: parsed directly.
+    Finally it calls parse_ufdr(report_xml, ...), or parse_ufdr_parallel(...)
+    when more than one worker is requested. `checkpointer` / `resume` are
+    passed through (the position must come from the same mode).
     """
     archive_path = Path(archive_path)
-    temp_dir = None
-    try:
+    parallel = bool(workers and workers > 1)
+    stats = stats or ParseStats()
+
+    def _parse(report, base):
+        if parallel:
+            parse_ufdr_parallel(report, contact_handler, chat_handler, file_handler, base,
+                                workers=workers, stats=stats, checkpointer=checkpointer, resume=resume)
+        else:
+            parse_ufdr(report, contact_handler, chat_handler, file_handler, base, stats=stats,
+                       checkpointer=checkpointer, resume=resume)
+
+    if archive_path.is_dir() or archive_path.suffix.lower() == ".xml":
         if archive_path.is_dir():
-            base = archive_path
+            # heuristics to find likely report xml files
+            candidates = list(archive_path.rglob("*.xml"))
+            # prefer files named 'report' or containing 'decoded' or 'ufdr' in name
+            prioritized = sorted(candidates, key=lambda p: (0 if "report" in p.name.lower() or "decoded" in p.name.lower() else 1, p.name))
+            if not prioritized:
+                raise FileNotFoundError("No XML found inside UFDR archive")
+            report = prioritized[0]
         else:
-            # assume zip file
-            temp_dir = Path(tempfile.mkdtemp(prefix="ufdr_"))
-            with zipfile.ZipFile(str(archive_path), "r") as zf:
-                zf.extractall(str(temp_dir))
-            base = temp_dir
-
-        # heuristics to find likely report xml files
-        candidates = list(base.rglob("*.xml"))
-        # prefer files named 'report' or containing 'decoded' or 'ufdr' in name
-        prioritized = sorted(candidates, key=lambda p: (0 if "report" in p.name.lower() or "decoded" in p.name.lower() else 1, p.name))
-        if not prioritized:
-            raise FileNotFoundError("No XML found inside UFDR archive")
-
-        report = prioritized[0]
+            report = archive_path
         logger.info("Using report XML: %s", report)
-        parse_ufdr(report, contact_handler, chat_handler, file_handler, base)
+        _parse(report, report.parent)
+        return
 
-    finally:
-        # clean up temporary dir only if we created it
-        if temp_dir is not None and temp_dir.exists():
+    # zip archive: stream the report member, never extractall
+    extract_root = Path(case_dir) / EXTRACT_ROOT
+    with UFDRArchive(archive_path) as archive:
+        info = archive.find_report()
+        logger.info("Using report XML: %s!%s", archive_path, info.filename)
+        write_source_info(case_dir, archive_path, info.filename)
+        # relative paths in the report are relative to the report's folder
+        base = extract_root / posixpath.dirname(info.filename)
+        if parallel:
+            with stats.timer("unzip"):
+                report = archive.extract_member(info, extract_root)
             try:
-                shutil.rmtree(str(temp_dir))
-            except Exception:
-                pass
+                _parse(report, base)
+            finally:
+                report.unlink(missing_ok=True)
+        else:
+            with archive.open_member(info) as stream:
+                stats.bytes_total = info.file_size
+                _parse(stream, base)
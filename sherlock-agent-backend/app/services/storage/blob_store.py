@@ -0,0 +1,101 @@
+# app/services/storage/blob_store.py
+"""
+Append-only text blobs with a fixed-width index, read through mmap.
+
+A blob is two files next to case.db:
+- <name>.bin : the UTF-8 texts, back to back
+- <name>.idx : one little-endian (offset, length) int64 pair per text, in
+               append order; length -1 stands for None
+
+Readers map both files and decode only the slices they are asked for, so
+the texts stay in the page cache (shared by every process serving the
+case) instead of in each process's heap.
+"""
+import os
+import mmap
+import struct
+from pathlib import Path
+from typing import Optional
+
+_ENTRY = struct.Struct("<qq")
+_BUFFER = 1024 * 1024
+
+
+class BlobWriter:
+    """Writes <name>.bin / .idx as .part files; commit() renames them into place."""
+
+    def __init__(self, directory: Path, name: str):
+        self.directory = Path(directory)
+        self.name = name
+        self._paths = [self.directory / f"{name}{ext}" for ext in (".bin", ".idx")]
+        self._data = open(self._part(self._paths[0]), "wb", buffering=_BUFFER)
+        self._index = open(self._part(self._paths[1]), "wb", buffering=_BUFFER)
+        self.offset = 0
+        self.count = 0
+
+    @staticmethod
+    def _part(p: Path) -> Path:
+        return p.with_name(p.name + ".part")
+
+    def append(self, text: Optional[str]) -> int:
+        """Store `text`; returns its index."""
+        if text is None:
+            self._index.write(_ENTRY.pack(self.offset, -1))
+        else:
+            raw = text.encode("utf-8", "surrogatepass")
+            self._data.write(raw)
+            self._index.write(_ENTRY.pack(self.offset, len(raw)))
+            self.offset += len(raw)
+        self.count += 1
+        return self.count - 1
+
+    def commit(self):
+        self._data.close()
+        self._index.close()
+        for p in self._paths:
+            os.replace(self._part(p), p)
+
+    def abort(self):
+        self._data.close()
+        self._index.close()
+        for p in self._paths:
+            self._part(p).unlink(missing_ok=True)
+
+
+def _map(path: Path) -> Optional[mmap.mmap]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None  # mmap can't map an empty file
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class BlobReader:
+    def __init__(self, directory: Path, name: str):
+        directory = Path(directory)
+        self._data = _map(directory / f"{name}.bin")
+        self._index = _map(directory / f"{name}.idx")
+        self._data_view = memoryview(self._data) if self._data is not None else None
+        self.count = len(self._index) // _ENTRY.size if self._index is not None else 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, i: int) -> Optional[str]:
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        offset, length = _ENTRY.unpack_from(self._index, i * _ENTRY.size)
+        if length < 0:
+            return None
+        if length == 0:
+            return ""
+        # decoded straight from the mapping, without an intermediate bytes copy
+        return str(self._data_view[offset:offset + length], "utf-8", "surrogatepass")
+
+    def close(self):
+        if self._data_view is not None:
+            self._data_view.release()
+            self._data_view = None
+        for m in (self._data, self._index):
+            if m is not None:
+                m.close()
+        self._data = self._index = None
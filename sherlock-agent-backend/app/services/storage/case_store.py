@@ -0,0 +1,759 @@
+# app/services/storage/case_store.py
+"""
+Per-case SQLite store (data/cases/<case_id>/case.db), written at parse time
+next to parsed.json. The read endpoints query it instead of decoding the
+whole parsed.json: filters, counts and paging run as indexed SQL.
+
+Every row keeps its parsed.json object in a `doc` column (compact JSON), so
+responses are unchanged; the other columns exist to filter / sort on.
+Message bodies are the exception: with a body blob (blob_store, named in
+meta.body_blob) they are stored once, outside SQLite, and put back into
+the returned messages by row id; doc and the body column then hold null.
+
+Text search runs on two FTS5 indexes over the same per-row text (contact
+names + account types / identifiers (contact_text), message subject + body
+(message_text), file mimetype + paths (file_text)); the scans and
+ParsedCase match the same text:
+- text_tok: unicode61 tokens, ranked (bm25) whole-word / prefix matches
+- text_tri: trigrams, substring matches for queries of 3+ characters
+Both are contentless; an index rowid is `row id * 4 + kind` (TEXT_KINDS).
+
+Timeline events also carry ts_ms (UTC epoch ms, see app.utils.timeutil):
+time windows are index range scans on it, and timeline_rollup holds the
+per-hour / per-day event counts by type for the histogram.
+
+Collections page by key (`after` = the row id of the last item seen, which
+is the item's position in parsed.json), so a deep page costs as much as the
+first one; `offset` still works for callers that want it.
+
+Cases parsed before the store existed have no case.db: open_case() then
+falls back to ParsedCase, the same query API over the decoded parsed.json.
+"""
+import re
+import json
+import uuid
+import bisect
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.services.parser.parsed_writer import load_parsed
+from app.services.storage.blob_store import BlobReader, BlobWriter
+from app.utils.timeutil import BUCKETS, bucket_start, to_epoch_ms
+
+logger = logging.getLogger("case_store")
+
+DB_FILE = "case.db"
+SCHEMA_VERSION = 4
+# body blob files: <prefix><generation>.bin / .idx
+BODY_BLOB_PREFIX = "bodies-"
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE contacts (
+    id INTEGER PRIMARY KEY,           -- position in parsed.json
+    names TEXT,
+    device_owner INTEGER,
+    doc TEXT NOT NULL
+);
+CREATE TABLE accounts (
+    contact_id INTEGER NOT NULL,
+    type TEXT,
+    identifier TEXT
+);
+CREATE TABLE threads (
+    id INTEGER PRIMARY KEY,
+    thread_id TEXT,
+    message_count INTEGER DEFAULT 0,
+    participants TEXT
+);
+CREATE TABLE messages (
+    id INTEGER PRIMARY KEY,           -- document order
+    thread_row INTEGER NOT NULL,
+    thread_id TEXT,
+    message_id TEXT,
+    timestamp INTEGER,
+    sender TEXT,
+    subject TEXT,
+    body TEXT,
+    doc TEXT NOT NULL
+);
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    file_id TEXT,
+    mimetype TEXT,
+    local_path TEXT,
+    mobile_path TEXT,
+    size INTEGER,
+    doc TEXT NOT NULL
+);
+CREATE TABLE events (
+    id INTEGER PRIMARY KEY,           -- timeline order
+    type TEXT,
+    timestamp INTEGER,
+    ts_ms INTEGER,                    -- timestamp as epoch ms, NULL when untimed
+    event_id TEXT,
+    doc TEXT NOT NULL
+);
+CREATE TABLE timeline_rollup (
+    bucket TEXT NOT NULL,             -- hour | day
+    start_ms INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (bucket, start_ms, type)
+) WITHOUT ROWID;
+"""
+
+# created after the bulk load: cheaper than maintaining them row by row
+_INDEXES = """
+CREATE INDEX accounts_identifier ON accounts(identifier);
+CREATE INDEX accounts_contact ON accounts(contact_id);
+CREATE INDEX threads_thread_id ON threads(thread_id);
+CREATE INDEX messages_thread ON messages(thread_id, id);
+CREATE INDEX messages_timestamp ON messages(timestamp);
+CREATE INDEX files_file_id ON files(file_id);
+CREATE INDEX events_timestamp ON events(timestamp);
+CREATE INDEX events_type ON events(type, timestamp);
+CREATE INDEX events_ts ON events(ts_ms);
+"""
+
+# floor to the bucket, also for times before 1970 (SQLite's % truncates)
+_ROLLUP = ("INSERT INTO timeline_rollup(bucket, start_ms, type, count) "
+           "SELECT ?, ts_ms - ((ts_ms % ?) + ?) % ?, coalesce(type, ''), COUNT(*) FROM events "
+           "WHERE ts_ms IS NOT NULL GROUP BY 2, 3")
+
+# text index: kind code of each row's rowid (rowid & 3), and the text indexed per kind
+TEXT_KINDS = {"contact": 0, "message": 1, "file": 2}
+_TEXT_TABLES = {
+    "text_tok": "unicode61 remove_diacritics 2",
+    "text_tri": "trigram",
+}
+# messages are indexed as they are added (their bodies may not be in SQLite)
+# contact_text() / file_text() in SQL, over a row of their table
+_CONTACT_TEXT_SQL = ("coalesce(contacts.names, '') || ' ' || coalesce((SELECT group_concat(t, ' ') FROM "
+                     "(SELECT coalesce(a.type, '') || ' ' || coalesce(a.identifier, '') AS t FROM accounts a "
+                     "WHERE a.contact_id = contacts.id ORDER BY a.rowid)), '')")
+_FILE_TEXT_SQL = "coalesce(mimetype, '') || ' ' || coalesce(local_path, '') || ' ' || coalesce(mobile_path, '')"
+_TEXT_SOURCES = (
+    f"SELECT id * 4 + 0, {_CONTACT_TEXT_SQL} FROM contacts",
+    f"SELECT id * 4 + 2, {_FILE_TEXT_SQL} FROM files",
+)
+# trigram queries need at least one whole trigram
+_SUBSTRING_MIN = 3
+_WORD = re.compile(r"\w+")
+
+
+def contact_text(contact: Dict[str, Any]) -> str:
+    """
+    What a contact's text filter / search matches: its names, then each
+    account's type and identifier. The same string is indexed (text_tri),
+    scanned (_CONTACT_TEXT_SQL) and built by ParsedCase.
+    """
+    accounts = [f"{_text(a.get('type'))} {_text(a.get('identifier'))}"
+                for a in contact.get("accounts") or [] if isinstance(a, dict)]
+    return " ".join(contact.get("names") or []) + " " + " ".join(accounts)
+
+
+def message_text(msg: Dict[str, Any]) -> str:
+    """What a message's text filter / search matches: subject, then body (as indexed)."""
+    return f"{_text(msg.get('subject'))} {_text(msg.get('body'))}"
+
+
+def file_text(f: Dict[str, Any]) -> str:
+    """What a file's text filter / search matches: mimetype and paths (as indexed)."""
+    return f"{_text(f.get('mimetype'))} {_text(f.get('local_path'))} {_text(f.get('mobile_path'))}"
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _lower(value):
+    # unicode-aware lower(); SQLite's own only folds ASCII
+    return value.lower() if isinstance(value, str) else value
+
+
+def _as_int(value) -> Optional[int]:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+class CaseStoreWriter:
+    """
+    Bulk loader used by case_parser._finalize_output. Rows are buffered and
+    inserted with executemany; the database is built as case.db.part and
+    renamed into place by commit(), so readers never see a partial store.
+    With text_index, the FTS5 search indexes are filled as well; with
+    body_blob, message bodies go to a blob file instead of SQLite.
+    """
+
+    def __init__(self, case_dir: Path, batch_size: int = 5000, text_index: bool = True,
+                 body_blob: bool = True):
+        self.case_dir = Path(case_dir)
+        self.path = self.case_dir / DB_FILE
+        self.tmp_path = self.case_dir / (DB_FILE + ".part")
+        self.tmp_path.unlink(missing_ok=True)
+        self.batch_size = batch_size
+        self.text_index = text_index
+        self.conn = sqlite3.connect(str(self.tmp_path))
+        # a throwaway file until commit(): no journal, no fsync per statement
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.executescript(_SCHEMA)
+        self.text_index = text_index and self._create_text_tables()
+        # a new generation per parse: readers of the previous case.db keep their blob
+        self.blob = BlobWriter(self.case_dir, BODY_BLOB_PREFIX + uuid.uuid4().hex[:12]) if body_blob else None
+        self._pending: Dict[str, List[tuple]] = {}
+        self._sql = {
+            "contacts": "INSERT INTO contacts(id, names, device_owner, doc) VALUES (?,?,?,?)",
+            "accounts": "INSERT INTO accounts(contact_id, type, identifier) VALUES (?,?,?)",
+            "threads": "INSERT INTO threads(id, thread_id, participants) VALUES (?,?,?)",
+            "messages": "INSERT INTO messages(id, thread_row, thread_id, message_id, timestamp, sender, "
+                        "subject, body, doc) VALUES (?,?,?,?,?,?,?,?,?)",
+            "files": "INSERT INTO files(id, file_id, mimetype, local_path, mobile_path, size, doc) "
+                     "VALUES (?,?,?,?,?,?,?)",
+            "events": "INSERT INTO events(id, type, timestamp, ts_ms, event_id, doc) VALUES (?,?,?,?,?,?)",
+            "text_tok": "INSERT INTO text_tok(rowid, text) VALUES (?,?)",
+            "text_tri": "INSERT INTO text_tri(rowid, text) VALUES (?,?)",
+        }
+        self._counts = {name: 0 for name in self._sql}
+        # thread row -> number of messages, written by commit()
+        self._thread_messages: Dict[int, int] = {}
+
+    def _add(self, table: str, row: tuple):
+        rows = self._pending.setdefault(table, [])
+        rows.append(row)
+        self._counts[table] += 1
+        if len(rows) >= self.batch_size:
+            self._flush(table)
+
+    def _flush(self, table: str):
+        rows = self._pending.get(table)
+        if rows:
+            self.conn.executemany(self._sql[table], rows)
+            self._pending[table] = []
+
+    def add_contact(self, contact: Dict[str, Any]):
+        row_id = self._counts["contacts"]
+        self._add("contacts", (row_id, " ".join(contact.get("names") or []),
+                               1 if contact.get("device_owner") else 0, _dumps(contact)))
+        for a in contact.get("accounts") or []:
+            if isinstance(a, dict):
+                self._add("accounts", (row_id, a.get("type"), a.get("identifier")))
+
+    def add_thread(self, thread_id: Any, participants: List[Any]) -> int:
+        row_id = self._counts["threads"]
+        self._add("threads", (row_id, thread_id, _dumps(participants)))
+        return row_id
+
+    def add_message(self, thread_row: int, thread_id: Any, msg: Dict[str, Any]):
+        self._thread_messages[thread_row] = self._thread_messages.get(thread_row, 0) + 1
+        sender = msg.get("from")
+        sender = sender.get("identifier") if isinstance(sender, dict) else sender
+        row_id = self._counts["messages"]
+        body = msg.get("body")
+        if self.text_index:
+            text = (row_id * 4 + TEXT_KINDS["message"], message_text(msg))
+            self._add("text_tok", text)
+            self._add("text_tri", text)
+        if self.blob is not None:
+            # row ids are dense from 0, so blob index == row id
+            self.blob.append(body if body is None or isinstance(body, str) else str(body))
+            msg = dict(msg, body=None)
+            body = None
+        self._add("messages", (row_id, thread_row, thread_id, msg.get("id"), _as_int(msg.get("timestamp")),
+                               sender, msg.get("subject"), body, _dumps(msg)))
+
+    def add_file(self, f: Dict[str, Any]):
+        self._add("files", (self._counts["files"], f.get("id"), f.get("mimetype"), f.get("local_path"),
+                            f.get("mobile_path"), _as_int(f.get("size")), _dumps(f)))
+
+    def add_event(self, e: Dict[str, Any]):
+        self._add("events", (self._counts["events"], e.get("type"), _as_int(e.get("timestamp")),
+                             to_epoch_ms(e.get("timestamp")),
+                             e.get("id"), _dumps(e)))
+
+    def commit(self, meta: Optional[Dict[str, Any]] = None):
+        for table in self._sql:
+            self._flush(table)
+        self.conn.executescript(_INDEXES)
+        for name, ms in BUCKETS.items():
+            self.conn.execute(_ROLLUP, (name, ms, ms, ms))
+        self.conn.executemany("UPDATE threads SET message_count = ? WHERE id = ?",
+                              [(n, row) for row, n in self._thread_messages.items()])
+        meta = dict(meta or {})
+        meta["schema_version"] = SCHEMA_VERSION
+        if self.text_index:
+            self._finish_text_index()
+        meta["text_index"] = self.text_index
+        if self.blob is not None:
+            self.blob.commit()
+            meta["body_blob"] = self.blob.name
+        self.conn.executemany("INSERT INTO meta(key, value) VALUES (?, ?)",
+                              [(k, _dumps(v)) for k, v in meta.items()])
+        self.conn.commit()
+        self.conn.close()
+        self.tmp_path.replace(self.path)
+        _remove_blobs(self.case_dir, keep=self.blob.name if self.blob is not None else None)
+        logger.info("case store written to %s (%s)", self.path, self._counts)
+
+    def _create_text_tables(self) -> bool:
+        """False when this SQLite lacks FTS5 / trigram."""
+        try:
+            for table, tokenizer in _TEXT_TABLES.items():
+                self.conn.execute(f"CREATE VIRTUAL TABLE {table} USING fts5(text, content='', "
+                                  f"tokenize='{tokenizer}')")
+        except sqlite3.OperationalError as e:
+            logger.warning("no text index for %s (%s); search will scan", self.path, e)
+            for table in _TEXT_TABLES:
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            return False
+        return True
+
+    def _finish_text_index(self):
+        """Index contacts / files from the loaded rows, then merge each index into one segment."""
+        for table in _TEXT_TABLES:
+            for source in _TEXT_SOURCES:
+                self.conn.execute(f"INSERT INTO {table}(rowid, text) {source}")
+            # one b-tree segment per index: fewer lookups per query
+            self.conn.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+
+    def abort(self):
+        try:
+            self.conn.close()
+            if self.blob is not None:
+                self.blob.abort()
+        finally:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def _remove_blobs(case_dir: Path, keep: Optional[str] = None):
+    for p in Path(case_dir).glob(BODY_BLOB_PREFIX + "*"):
+        if keep is None or not p.name.startswith(keep + "."):
+            p.unlink(missing_ok=True)
+
+
+def remove_store(case_dir: Path):
+    """Delete a case's case.db and body blobs (e.g. when re-parsed without a store)."""
+    (Path(case_dir) / DB_FILE).unlink(missing_ok=True)
+    _remove_blobs(case_dir)
+
+
+class Page(NamedTuple):
+    """One page of a collection. `next` is the key to pass as `after` for the following page."""
+    items: List[Dict[str, Any]]
+    total: Optional[int]          # None when the caller asked not to count
+    next: Optional[int]
+
+
+def _next_offset(offset: int, n: int, total: int) -> Optional[int]:
+    return offset + n if n and offset + n < total else None
+
+
+def _docs(rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+    return [json.loads(r[0]) for r in rows]
+
+
+def _histogram(bucket: str, rows: Iterable[tuple], untimed: int) -> Dict[str, Any]:
+    """Response of CaseStore.histogram from (start_ms, type, count) rows sorted by start_ms."""
+    buckets: List[Dict[str, Any]] = []
+    for start, type_, n in rows:
+        if not buckets or buckets[-1]["start"] != start:
+            buckets.append({"start": start, "total": 0, "counts": {}})
+        buckets[-1]["counts"][type_] = n
+        buckets[-1]["total"] += n
+    return {"bucket": bucket, "bucket_ms": BUCKETS[bucket], "buckets": buckets, "untimed": untimed}
+
+
+class CaseStore:
+    """Read side of case.db. Open one per request (connections are cheap)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        self.conn.create_function("plower", 1, _lower, deterministic=True)
+        self.conn.create_function("epoch_ms", 1, to_epoch_ms, deterministic=True)
+        self._has_text_index: Optional[bool] = None
+        self._has_time_index: Optional[bool] = None
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'body_blob'").fetchone()
+        self.bodies = BlobReader(self.path.parent, json.loads(row[0])) if row else None
+        # message_text() in SQL; the body is in the blob or in SQLite
+        body = "msg_body(id)" if self.bodies is not None else "body"
+        self._message_text = f"coalesce(subject, '') || ' ' || coalesce({body}, '')"
+        if self.bodies is not None:
+            self.conn.create_function("msg_body", 1, self.bodies.get, deterministic=True)
+
+    def close(self):
+        self.conn.close()
+        if self.bodies is not None:
+            self.bodies.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _page(self, sql: str, args: tuple, limit: Optional[int], offset: int) -> List[tuple]:
+        if limit is None:
+            return self.conn.execute(sql + " LIMIT -1 OFFSET ?", args + (max(offset, 0),)).fetchall()
+        return self.conn.execute(sql + " LIMIT ? OFFSET ?", args + (max(limit, 0), max(offset, 0))).fetchall()
+
+    def _count(self, sql: str, args: tuple = ()) -> int:
+        return self.conn.execute(sql, args).fetchone()[0]
+
+    def _messages(self, rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+        """Messages from (doc, thread_id, id) rows, bodies read from the blob when there is one."""
+        out = []
+        for doc, thread_id, row_id in rows:
+            m = json.loads(doc)
+            if self.bodies is not None:
+                m["body"] = self.bodies.get(row_id)
+            m["_thread_id"] = thread_id
+            out.append(m)
+        return out
+
+    @property
+    def has_text_index(self) -> bool:
+        if self._has_text_index is None:
+            self._has_text_index = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'text_tri'").fetchone() is not None
+        return self._has_text_index
+
+    @property
+    def has_time_index(self) -> bool:
+        """ts_ms + timeline_rollup; stores written before them compute both on the fly."""
+        if self._has_time_index is None:
+            self._has_time_index = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'timeline_rollup'").fetchone() is not None
+        return self._has_time_index
+
+    def _time_clauses(self, from_ms: Optional[int], to_ms: Optional[int]) -> Tuple[List[str], List[Any]]:
+        ts = "ts_ms" if self.has_time_index else "epoch_ms(timestamp)"
+        clauses, args = [], []
+        if from_ms is not None:
+            clauses.append(f"{ts} >= ?")
+            args.append(from_ms)
+        if to_ms is not None:
+            clauses.append(f"{ts} < ?")
+            args.append(to_ms)
+        return clauses, args
+
+    def _text_filter(self, kind: str, q: str) -> Optional[Tuple[str, tuple]]:
+        """`id IN (...)` clause answering a substring filter from text_tri, None if the index can't."""
+        if len(q) < _SUBSTRING_MIN or not self.has_text_index:
+            return None
+        return (f"id IN (SELECT rowid >> 2 FROM text_tri WHERE text_tri MATCH ? AND rowid & 3 = {TEXT_KINDS[kind]})",
+                (_phrase(q),))
+
+    def _select(self, table: str, cols: str, clauses: List[str], args: List[Any], limit: Optional[int],
+                offset: int, after: Optional[int], count: bool, convert) -> Page:
+        """Rows of `table` in id order, after key `after` (seek on the primary key) or from `offset`."""
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        total = self._count(f"SELECT COUNT(*) FROM {table} {where}", tuple(args)) if count else None
+        if after is not None:
+            clauses, args, offset = clauses + ["id > ?"], args + [after], 0
+            where = "WHERE " + " AND ".join(clauses)
+        # one row more than asked tells whether another page follows
+        rows = self._page(f"SELECT id, {cols} FROM {table} {where} ORDER BY id", tuple(args),
+                          None if limit is None else max(limit, 0) + 1, offset)
+        more = limit is not None and len(rows) > limit
+        if more:
+            rows = rows[:limit]
+        return Page(convert([r[1:] for r in rows]), total, rows[-1][0] if more and rows else None)
+
+    # --- collections ---
+    def contacts(self, q: str = "", limit: Optional[int] = None, offset: int = 0,
+                 after: Optional[int] = None, count: bool = True) -> Page:
+        clauses, args = [], []
+        if q:
+            clause, text_args = (self._text_filter("contact", q)
+                                 or (f"instr(plower({_CONTACT_TEXT_SQL}), ?) > 0", (q.lower(),)))
+            clauses.append(clause)
+            args += text_args
+        return self._select("contacts", "doc", clauses, args, limit, offset, after, count, _docs)
+
+    def messages(self, thread_id: Optional[str] = None, q: str = "", limit: Optional[int] = 100,
+                 offset: int = 0, after: Optional[int] = None, count: bool = True) -> Page:
+        """Messages in document order: by thread, then by position in the thread."""
+        clauses, args = [], []
+        if thread_id:
+            clauses.append("thread_id = ?")
+            args.append(thread_id)
+        text = self._text_filter("message", q) if q else None
+        if text:
+            clauses.append(text[0])
+            args += text[1]
+        elif q:
+            clauses.append(f"instr(plower({self._message_text}), ?) > 0")
+            args.append(q.lower())
+        return self._select("messages", "doc, thread_id, id", clauses, args, limit, offset, after, count,
+                            self._messages)
+
+    def files(self, q: str = "", limit: Optional[int] = None, offset: int = 0,
+              after: Optional[int] = None, count: bool = True) -> Page:
+        clauses, args = [], []
+        text = self._text_filter("file", q) if q else None
+        if text:
+            clauses, args = [text[0]], list(text[1])
+        elif q:
+            clauses, args = [f"instr(plower({_FILE_TEXT_SQL}), ?) > 0"], [q.lower()]
+        return self._select("files", "doc", clauses, args, limit, offset, after, count, _docs)
+
+    def file(self, file_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT doc FROM files WHERE file_id = ? ORDER BY id LIMIT 1", (file_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def timeline(self, limit: Optional[int] = 200, offset: int = 0, after: Optional[int] = None,
+                 count: bool = True, from_ms: Optional[int] = None, to_ms: Optional[int] = None) -> Page:
+        """Events in timeline order; from_ms / to_ms (epoch ms, to exclusive) keep timed events in that window."""
+        clauses, args = self._time_clauses(from_ms, to_ms)
+        return self._select("events", "doc", clauses, args, limit, offset, after, count, _docs)
+
+    def histogram(self, bucket: str = "day", from_ms: Optional[int] = None,
+                  to_ms: Optional[int] = None) -> Dict[str, Any]:
+        """Event counts per bucket and type for the buckets overlapping [from_ms, to_ms)."""
+        size = BUCKETS[bucket]
+        lo = bucket_start(from_ms, size) if from_ms is not None else None
+        if self.has_time_index:
+            sql, args = "SELECT start_ms, type, count FROM timeline_rollup WHERE bucket = ?", [bucket]
+            if lo is not None:
+                sql += " AND start_ms >= ?"
+                args.append(lo)
+            if to_ms is not None:
+                sql += " AND start_ms < ?"
+                args.append(to_ms)
+            rows = self.conn.execute(sql + " ORDER BY start_ms, type", args).fetchall()
+            untimed = self._count("SELECT COUNT(*) FROM events WHERE ts_ms IS NULL")
+        else:
+            ts = "epoch_ms(timestamp)"
+            start = f"{ts} - (({ts} % ?) + ?) % ?"
+            rows = [r for r in self.conn.execute(
+                f"SELECT {start}, coalesce(type, ''), COUNT(*) FROM events WHERE {ts} IS NOT NULL "
+                f"GROUP BY 1, 2 ORDER BY 1, 2", (size, size, size)).fetchall()
+                if (lo is None or r[0] >= lo) and (to_ms is None or r[0] < to_ms)]
+            untimed = self._count(f"SELECT COUNT(*) FROM events WHERE {ts} IS NULL")
+        return _histogram(bucket, rows, untimed)
+
+    def search(self, q: str, limit: int = 100, offset: int = 0) -> Page:
+        """
+        Ranked hits from the text index: rows containing every word of q as a
+        whole word / prefix first (bm25), then rows containing q as a
+        substring (bm25 over trigrams). Without an index: scan_search().
+        Ranked results page by offset (`next` is the next offset).
+        """
+        if not self.has_text_index:
+            return self.scan_search(q, limit, offset)
+        words = _WORD.findall(q)
+        if len(q) >= _SUBSTRING_MIN:
+            tok, sub = " ".join(_phrase(w) for w in words), _phrase(q)
+        else:
+            tok, sub = " ".join(_phrase(w) + "*" for w in words), ""
+        # (index, extra condition, args) per tier; substring hits exclude the word hits above them
+        tiers = []
+        if tok:
+            tiers.append(("text_tok", "", (tok,)))
+        if sub:
+            extra = " AND rowid NOT IN (SELECT rowid FROM text_tok WHERE text_tok MATCH ?)" if tok else ""
+            tiers.append(("text_tri", extra, (sub, tok) if tok else (sub,)))
+        if not tiers:
+            # short and without word characters ("+", "@"): nothing the index can match
+            return self.scan_search(q, limit, offset)
+        keys, total = [], 0
+        for table, extra, args in tiers:
+            frm = f"FROM {table} WHERE {table} MATCH ?{extra}"
+            n = self._count("SELECT COUNT(*) " + frm, args)
+            # translate the global window into this tier's window; bm25 only runs for tiers on the page
+            start = max(offset - total, 0)
+            want = limit - len(keys)
+            if want > 0 and start < n:
+                keys += [r[0] for r in self._page(f"SELECT rowid {frm} ORDER BY bm25({table}), rowid",
+                                                  args, want, start)]
+            total += n
+        return Page(self._hits(keys), total, _next_offset(offset, len(keys), total))
+
+    def _hits(self, keys: List[int]) -> List[Dict[str, Any]]:
+        """Search hits for text index rowids, in the given order."""
+        ids: Dict[int, List[int]] = {}
+        for key in keys:
+            ids.setdefault(key & 3, []).append(key >> 2)
+        objs: Dict[int, Dict[str, Any]] = {}
+        for kind, code in TEXT_KINDS.items():
+            rows = ids.get(code)
+            if not rows:
+                continue
+            table, cols = {"contact": ("contacts", "doc"), "message": ("messages", "doc, thread_id, id"),
+                           "file": ("files", "doc")}[kind]
+            marks = ",".join("?" * len(rows))
+            found = self.conn.execute(f"SELECT id, {cols} FROM {table} WHERE id IN ({marks})", rows).fetchall()
+            for row_id, *rest in found:
+                obj = self._messages([rest])[0] if kind == "message" else json.loads(rest[0])
+                objs[row_id * 4 + code] = {"type": kind, "obj": obj}
+        return [objs[k] for k in keys if k in objs]
+
+    def scan_search(self, q: str, limit: int = 100, offset: int = 0) -> Page:
+        """Contacts, then messages, then files whose text contains q (full scan)."""
+        q = q.lower()
+        parts = (
+            ("contact", f"FROM contacts WHERE instr(plower({_CONTACT_TEXT_SQL}), ?) > 0", (q,), "doc"),
+            ("message", f"FROM messages WHERE instr(plower({self._message_text}), ?) > 0", (q,), "doc, thread_id, id"),
+            ("file", f"FROM files WHERE instr(plower({_FILE_TEXT_SQL}), ?) > 0", (q,), "doc"),
+        )
+        hits, total = [], 0
+        for kind, frm, args, cols in parts:
+            n = self._count("SELECT COUNT(*) " + frm, args)
+            # translate the global window into this part's window
+            start = max(offset - total, 0)
+            want = limit - len(hits)
+            if want > 0 and start < n:
+                rows = self._page(f"SELECT {cols} {frm} ORDER BY id", args, want, start)
+                objs = self._messages(rows) if kind == "message" else _docs(rows)
+                hits.extend({"type": kind, "obj": o} for o in objs)
+            total += n
+        return Page(hits, total, _next_offset(offset, len(hits), total))
+
+
+class ParsedCase:
+    """
+    CaseStore's query API over a decoded parsed.json, for cases without a
+    case.db. Same results, computed in Python.
+    """
+
+    def __init__(self, parsed: Dict[str, Any]):
+        self.parsed = parsed
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    @staticmethod
+    def _window(items: List[Any], limit: Optional[int], offset: int) -> List[Any]:
+        offset = max(offset, 0)
+        return items[offset:] if limit is None else items[offset: offset + max(limit, 0)]
+
+    @staticmethod
+    def _keyed(keyed: List[Tuple[int, Any]], limit: Optional[int], offset: int, after: Optional[int],
+               count: bool) -> Page:
+        """CaseStore._select over (position, item) pairs: keys are the same row ids."""
+        total = len(keyed) if count else None
+        if after is not None:
+            keyed, offset = keyed[bisect.bisect_right(keyed, after, key=lambda kv: kv[0]):], 0
+        window = ParsedCase._window(keyed, None if limit is None else max(limit, 0) + 1, offset)
+        more = limit is not None and len(window) > limit
+        if more:
+            window = window[:limit]
+        return Page([item for _, item in window], total, window[-1][0] if more and window else None)
+
+    def _flat_messages(self):
+        for t in self.parsed.get("chat_threads", []):
+            for m in t.get("messages", []):
+                yield t.get("id"), m
+
+    def contacts(self, q: str = "", limit: Optional[int] = None, offset: int = 0,
+                 after: Optional[int] = None, count: bool = True) -> Page:
+        q = q.lower()
+        keyed = [(i, c) for i, c in enumerate(self.parsed.get("contacts", []))
+                 if not q or q in contact_text(c).lower()]
+        return self._keyed(keyed, limit, offset, after, count)
+
+    def messages(self, thread_id: Optional[str] = None, q: str = "", limit: Optional[int] = 100, offset: int = 0,
+                 after: Optional[int] = None, count: bool = True) -> Page:
+        q = q.lower()
+        keyed = []
+        for i, (tid, m) in enumerate(self._flat_messages()):
+            if thread_id and tid != thread_id:
+                continue
+            if q and q not in message_text(m).lower():
+                continue
+            keyed.append((i, (tid, m)))
+        page = self._keyed(keyed, limit, offset, after, count)
+        items = []
+        for tid, m in page.items:
+            msg = dict(m)
+            msg["_thread_id"] = tid
+            items.append(msg)
+        return page._replace(items=items)
+
+    def files(self, q: str = "", limit: Optional[int] = None, offset: int = 0,
+              after: Optional[int] = None, count: bool = True) -> Page:
+        q = q.lower()
+        keyed = [(i, f) for i, f in enumerate(self.parsed.get("files", [])) if not q or q in file_text(f).lower()]
+        return self._keyed(keyed, limit, offset, after, count)
+
+    def file(self, file_id: str):
+        for f in self.parsed.get("files", []):
+            if f.get("id") == file_id:
+                return f
+        return None
+
+    def timeline(self, limit: Optional[int] = 200, offset: int = 0, after: Optional[int] = None,
+                 count: bool = True, from_ms: Optional[int] = None, to_ms: Optional[int] = None) -> Page:
+        keyed = list(enumerate(self.parsed.get("events", [])))
+        if from_ms is not None or to_ms is not None:
+            keyed = [(i, e) for i, e in keyed if self._in_window(to_epoch_ms(e.get("timestamp")), from_ms, to_ms)]
+        return self._keyed(keyed, limit, offset, after, count)
+
+    @staticmethod
+    def _in_window(ms: Optional[int], from_ms: Optional[int], to_ms: Optional[int]) -> bool:
+        return ms is not None and (from_ms is None or ms >= from_ms) and (to_ms is None or ms < to_ms)
+
+    def histogram(self, bucket: str = "day", from_ms: Optional[int] = None, to_ms: Optional[int] = None):
+        size = BUCKETS[bucket]
+        lo = bucket_start(from_ms, size) if from_ms is not None else None
+        counts: Dict[Tuple[int, str], int] = {}
+        untimed = 0
+        for e in self.parsed.get("events", []):
+            ms = to_epoch_ms(e.get("timestamp"))
+            if ms is None:
+                untimed += 1
+                continue
+            key = (bucket_start(ms, size), e.get("type") or "")
+            if self._in_window(key[0], lo, to_ms):
+                counts[key] = counts.get(key, 0) + 1
+        return _histogram(bucket, [(start, t, n) for (start, t), n in sorted(counts.items())], untimed)
+
+    def search(self, q: str, limit: int = 100, offset: int = 0) -> Page:
+        q = q.lower()
+        hits = []
+        for c in self.parsed.get("contacts", []):
+            if q in contact_text(c).lower():
+                hits.append({"type": "contact", "obj": c})
+        for tid, m in self._flat_messages():
+            if q in message_text(m).lower():
+                item = dict(m)
+                item["_thread_id"] = tid
+                hits.append({"type": "message", "obj": item})
+        for f in self.parsed.get("files", []):
+            if q in file_text(f).lower():
+                hits.append({"type": "file", "obj": f})
+        page = self._window(hits, limit, offset)
+        return Page(page, len(hits), _next_offset(offset, len(page), len(hits)))
+
+
+def open_case(case_dir: Path, load=load_parsed):
+    """
+    CaseStore when case.db exists, else ParsedCase over parsed.json
+    (decoded by `load`, e.g. the case_manager cache).
+    Raises FileNotFoundError when the case has neither.
+    """
+    case_dir = Path(case_dir)
+    db = case_dir / DB_FILE
+    if db.exists():
+        try:
+            return CaseStore(db)
+        except sqlite3.Error as e:
+            logger.warning("cannot open %s, falling back to parsed.json: %s", db, e)
+    return ParsedCase(load(case_dir))
@@ -0,0 +1,229 @@
+# app/services/storage/catalog.py
+"""
+Case catalog: one SQLite table (data/cases/catalog.db) with a row per case,
+so /cases is an indexed query instead of a stat() and summary.json read per
+case directory.
+
+Rows are written by parse_uploaded_file (parsing -> parsed | failed, with
+the summary) and by model runs; every write is a single upsert
+transaction. The first use on a data dir without a catalog imports the
+existing case directories once; rebuild() does that again on demand.
+
+Times are ISO 8601 UTC strings ("2024-01-31T12:00:00Z"), which sort as
+text.
+"""
+import json
+import sqlite3
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.storage.case_store import Page
+
+logger = logging.getLogger("catalog")
+
+CATALOG_FILE = "catalog.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    case_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,             -- queued | parsing | parsed | failed | cancelled | unknown
+    owner TEXT,
+    source TEXT,                      -- uploaded file name
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    total_contacts INTEGER,
+    total_messages INTEGER,
+    total_files INTEGER,
+    total_events INTEGER,
+    summary TEXT,                     -- summary.json
+    models TEXT,                      -- {model: {"run_at", "count"}}
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS cases_updated ON cases(updated_at, case_id);
+CREATE INDEX IF NOT EXISTS cases_created ON cases(created_at, case_id);
+CREATE INDEX IF NOT EXISTS cases_status ON cases(status, updated_at);
+CREATE INDEX IF NOT EXISTS cases_owner ON cases(owner, updated_at);
+"""
+
+# sort name -> SQL expression (totals are NULL while parsing)
+SORTS = {
+    "updated_at": "updated_at",
+    "created_at": "created_at",
+    "case_id": "case_id",
+    "total_messages": "coalesce(total_messages, -1)",
+    "total_contacts": "coalesce(total_contacts, -1)",
+    "total_files": "coalesce(total_files, -1)",
+}
+
+_COLUMNS = ("case_id, status, owner, source, created_at, updated_at, summary, models, error")
+
+
+def now_iso() -> str:
+    return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+
+
+def ms_to_iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).replace(tzinfo=None, microsecond=0).isoformat() + "Z"
+
+
+def _loads(value: Optional[str]):
+    return json.loads(value) if value else None
+
+
+class CaseCatalog:
+    def __init__(self, cases_root: Path):
+        # relative roots resolve against the working directory of each call
+        self.cases_root = Path(cases_root)
+
+    @property
+    def path(self) -> Path:
+        return self.cases_root / CATALOG_FILE
+
+    def _connect(self) -> sqlite3.Connection:
+        fresh = not self.path.exists()
+        self.cases_root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        if fresh:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        if fresh:
+            self._import_dirs(conn)
+        return conn
+
+    # --- writes ---
+    def _upsert(self, case_id: str, fields: Dict[str, Any]):
+        fields = dict(fields)
+        now = now_iso()
+        fields.setdefault("updated_at", now)
+        cols = ", ".join(fields)
+        marks = ", ".join("?" * len(fields))
+        updates = ", ".join(f"{k} = excluded.{k}" for k in fields)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"INSERT INTO cases(case_id, status, created_at, {cols}) VALUES (?, ?, ?, {marks}) "
+                             f"ON CONFLICT(case_id) DO UPDATE SET {updates}",
+                             (case_id, fields.get("status", "unknown"), fields.get("created_at", now),
+                              *fields.values()))
+        finally:
+            conn.close()
+
+    def begin_case(self, case_id: str, owner: Optional[str] = None, source: Optional[str] = None,
+                   status: str = "parsing"):
+        fields = {"status": status, "error": None}
+        if owner is not None:
+            fields["owner"] = owner
+        if source is not None:
+            fields["source"] = source
+        self._upsert(case_id, fields)
+
+    def record_summary(self, case_id: str, summary: Dict[str, Any], status: str = "parsed"):
+        self._upsert(case_id, {
+            "status": status,
+            "total_contacts": summary.get("total_contacts"),
+            "total_messages": summary.get("total_messages"),
+            "total_files": summary.get("total_files"),
+            "total_events": summary.get("total_events"),
+            "summary": json.dumps(summary, ensure_ascii=False),
+            "error": None,
+        })
+
+    def set_status(self, case_id: str, status: str, error: Optional[str] = None):
+        self._upsert(case_id, {"status": status, "error": error})
+
+    def record_model_run(self, case_id: str, model: str, count: int):
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute("SELECT models FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+                models = (_loads(row[0]) if row else None) or {}
+                now = now_iso()
+                models[model] = {"run_at": now, "count": count}
+                conn.execute("INSERT INTO cases(case_id, status, created_at, updated_at, models) "
+                             "VALUES (?, 'unknown', ?, ?, ?) ON CONFLICT(case_id) DO UPDATE SET "
+                             "updated_at = excluded.updated_at, models = excluded.models",
+                             (case_id, now, now, json.dumps(models)))
+        finally:
+            conn.close()
+
+    # --- reads ---
+    def list(self, limit: Optional[int] = None, offset: int = 0, after: Optional[List[Any]] = None,
+             sort: str = "updated_at", descending: bool = True, status: Optional[str] = None,
+             owner: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+             count: bool = True) -> Page:
+        """
+        Catalog rows as /cases items, ordered by (sort, case_id). since / until
+        bound updated_at (until exclusive). `after` is the previous page's
+        `next`: [sort value, case_id].
+        """
+        expr = SORTS[sort]
+        clauses, args = [], []
+        for clause, value in (("status = ?", status), ("owner = ?", owner),
+                              ("updated_at >= ?", since), ("updated_at < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                args.append(value)
+        conn = self._connect()
+        try:
+            where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+            total = conn.execute(f"SELECT COUNT(*) FROM cases {where}", args).fetchone()[0] if count else None
+            if after is not None:
+                clauses.append(f"({expr}, case_id) {'<' if descending else '>'} (?, ?)")
+                args += list(after)
+                where, offset = "WHERE " + " AND ".join(clauses), 0
+            direction = "DESC" if descending else "ASC"
+            sql = (f"SELECT {expr}, {_COLUMNS} FROM cases {where} "
+                   f"ORDER BY {expr} {direction}, case_id {direction} LIMIT ? OFFSET ?")
+            rows = conn.execute(sql, args + [-1 if limit is None else max(limit, 0) + 1, max(offset, 0)]).fetchall()
+        finally:
+            conn.close()
+        more = limit is not None and len(rows) > limit
+        if more:
+            rows = rows[:limit]
+        items = [self._item(r[1:]) for r in rows]
+        return Page(items, total, [rows[-1][0], rows[-1][1]] if more and rows else None)
+
+    @staticmethod
+    def _item(row: Tuple) -> Dict[str, Any]:
+        case_id, status, owner, source, created_at, updated_at, summary, models, error = row
+        return {"case_id": case_id, "summary": _loads(summary) or {}, "status": status, "owner": owner,
+                "source": source, "created_at": created_at, "updated_at": updated_at,
+                "models": _loads(models) or {}, "error": error}
+
+    # --- import ---
+    def rebuild(self):
+        """Re-import every case directory (e.g. after cases were copied in or deleted by hand)."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM cases")
+            self._import_dirs(conn)
+        finally:
+            conn.close()
+
+    def _import_dirs(self, conn: sqlite3.Connection):
+        rows = []
+        for d in self.cases_root.iterdir():
+            if not d.is_dir():
+                continue
+            summary = None
+            try:
+                summary = json.loads((d / "summary.json").read_text(encoding="utf-8"))
+            except Exception:
+                pass
+            mtime = datetime.utcfromtimestamp(d.stat().st_mtime).replace(microsecond=0).isoformat() + "Z"
+            summary = summary if isinstance(summary, dict) else None
+            rows.append((d.name, "parsed" if summary else "unknown",
+                         (summary or {}).get("parsed_at") or mtime, mtime,
+                         *((summary or {}).get(k) for k in
+                           ("total_contacts", "total_messages", "total_files", "total_events")),
+                         json.dumps(summary, ensure_ascii=False) if summary else None))
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO cases(case_id, status, created_at, updated_at, total_contacts, "
+                             "total_messages, total_files, total_events, summary) VALUES (?,?,?,?,?,?,?,?,?)", rows)
+        logger.info("catalog %s: imported %d case directories", self.path, len(rows))
+
+
+case_catalog = CaseCatalog(Path("data") / "cases")
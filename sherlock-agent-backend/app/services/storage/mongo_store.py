@@ -0,0 +1,253 @@
+# app/services/storage/mongo_store.py
+"""
+Bulk ingestion of a parsed case into MongoDB (contacts, messages, media and
+events collections, every document tagged with case_id), fed row by row
+from case_parser._finalize_output alongside the case store.
+
+- documents are buffered per collection and written with unordered
+  insert_many batches of `batch_size`
+- at most `max_in_flight` batches are outstanding; further adds block
+  until one completes, so memory stays bounded when the server is slower
+  than the parser
+- indexes are created once the load is done
+- re-ingest is idempotent: begin() deletes the case's documents, and _ids
+  are deterministic (<case_id>:<seq>), so a retried batch only hits
+  duplicate keys, which are ignored
+
+pymongo is optional. MemoryDatabase is an in-process stand-in with the
+subset of the pymongo API used here (config.MONGO_URI = "memory://").
+"""
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.utils.timeutil import to_epoch_ms
+
+try:
+    from pymongo import MongoClient, ASCENDING
+    from pymongo.errors import BulkWriteError
+except ImportError:  # optional dependency
+    MongoClient = None
+    ASCENDING = 1
+
+    class BulkWriteError(Exception):
+        def __init__(self, details: Dict[str, Any]):
+            super().__init__("batch op errors occurred")
+            self.details = details
+
+logger = logging.getLogger("mongo_store")
+
+MEMORY_URI = "memory://"
+DUPLICATE_KEY = 11000
+
+COLLECTIONS = ("contacts", "messages", "media", "events")
+
+# created after the load; create_index is a no-op for an existing index
+INDEXES: Dict[str, List[List[Tuple[str, int]]]] = {
+    "contacts": [[("case_id", ASCENDING), ("seq", ASCENDING)],
+                 [("case_id", ASCENDING), ("accounts.identifier", ASCENDING)]],
+    "messages": [[("case_id", ASCENDING), ("seq", ASCENDING)],
+                 [("case_id", ASCENDING), ("thread_id", ASCENDING), ("seq", ASCENDING)],
+                 [("case_id", ASCENDING), ("timestamp", ASCENDING)]],
+    "media": [[("case_id", ASCENDING), ("seq", ASCENDING)],
+              [("case_id", ASCENDING), ("id", ASCENDING)]],
+    "events": [[("case_id", ASCENDING), ("seq", ASCENDING)],
+               [("case_id", ASCENDING), ("ts_ms", ASCENDING)],
+               [("case_id", ASCENDING), ("type", ASCENDING), ("ts_ms", ASCENDING)]],
+}
+
+
+class MongoIngestor:
+    """Row sink with the CaseStoreWriter interface (add_* / commit / abort)."""
+
+    def __init__(self, db, case_id: str, batch_size: int = 1000, max_in_flight: int = 4):
+        self.db = db
+        self.case_id = case_id
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="mongo-ingest")
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._pending: Dict[str, List[dict]] = {name: [] for name in COLLECTIONS}
+        self._futures: List[Future] = []
+        self._seq = {name: 0 for name in COLLECTIONS}
+        self._threads = 0
+        self.stats = {"documents": 0, "batches": 0, "duplicates": 0, "seconds": 0.0}
+        self._stats_lock = threading.Lock()
+        self._t0 = time.perf_counter()
+
+    # --- lifecycle ---
+    def begin(self):
+        """Drop what an earlier ingest of this case left behind."""
+        for name in COLLECTIONS:
+            self.db[name].delete_many({"case_id": self.case_id})
+        return self
+
+    def commit(self, meta: Optional[Dict[str, Any]] = None):
+        for name in COLLECTIONS:
+            self._flush(name)
+        try:
+            for f in self._futures:
+                f.result()
+        finally:
+            self._pool.shutdown(wait=True)
+        for name, specs in INDEXES.items():
+            for keys in specs:
+                self.db[name].create_index(keys)
+        self.stats["seconds"] = round(time.perf_counter() - self._t0, 3)
+        logger.info("case %s ingested into mongo: %s", self.case_id, self.stats)
+
+    def abort(self):
+        for name in COLLECTIONS:
+            self._pending[name] = []
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    # --- rows ---
+    def add_contact(self, contact: Dict[str, Any]):
+        self._add("contacts", dict(contact))
+
+    def add_thread(self, thread_id: Any, participants: List[Any]) -> int:
+        # threads are implied by messages.thread_id
+        self._threads += 1
+        return self._threads - 1
+
+    def add_message(self, thread_row: int, thread_id: Any, msg: Dict[str, Any]):
+        doc = dict(msg)
+        doc["thread_id"] = thread_id
+        self._add("messages", doc)
+
+    def add_file(self, f: Dict[str, Any]):
+        self._add("media", dict(f))
+
+    def add_event(self, e: Dict[str, Any]):
+        doc = dict(e)
+        doc["ts_ms"] = to_epoch_ms(e.get("timestamp"))
+        self._add("events", doc)
+
+    # --- internals ---
+    def _add(self, name: str, doc: Dict[str, Any]):
+        seq = self._seq[name]
+        self._seq[name] = seq + 1
+        # document "id" keys are the parser's own ids; _id only has to be unique per collection
+        doc["_id"] = f"{self.case_id}:{seq}"
+        doc["case_id"] = self.case_id
+        doc["seq"] = seq
+        batch = self._pending[name]
+        batch.append(doc)
+        if len(batch) >= self.batch_size:
+            self._flush(name)
+
+    def _flush(self, name: str):
+        batch = self._pending[name]
+        if not batch:
+            return
+        self._pending[name] = []
+        self._slots.acquire()
+        # surface a failed batch at the next flush instead of at commit()
+        for f in self._futures:
+            if f.done() and f.exception() is not None:
+                self._slots.release()
+                raise f.exception()
+        self._futures = [f for f in self._futures if not f.done()]
+        future = self._pool.submit(self._insert, name, batch)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _insert(self, name: str, batch: List[dict]) -> int:
+        try:
+            self.db[name].insert_many(batch, ordered=False)
+            duplicates = 0
+        except BulkWriteError as e:
+            errors = (e.details or {}).get("writeErrors", [])
+            if any(err.get("code") != DUPLICATE_KEY for err in errors):
+                raise
+            duplicates = len(errors)
+        with self._stats_lock:
+            self.stats["documents"] += len(batch) - duplicates
+            self.stats["duplicates"] += duplicates
+            self.stats["batches"] += 1
+        return duplicates
+
+
+# --- in-process stand-in ---
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    return all(doc.get(k) == v for k, v in query.items())
+
+
+class MemoryCollection:
+    """insert_many / delete_many / find / count_documents / create_index on dicts, equality filters only."""
+
+    def __init__(self, name: str, latency_s: float = 0.0):
+        self.name = name
+        self.latency_s = latency_s
+        self.docs: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: List[List[Tuple[str, int]]] = []
+        self._lock = threading.Lock()
+
+    def insert_many(self, docs: Iterable[Dict[str, Any]], ordered: bool = True):
+        if self.latency_s:
+            time.sleep(self.latency_s)  # one round trip per batch
+        errors = []
+        with self._lock:
+            for i, doc in enumerate(docs):
+                if doc.get("_id") in self.docs:
+                    errors.append({"index": i, "code": DUPLICATE_KEY, "errmsg": "duplicate key"})
+                    if ordered:
+                        break
+                    continue
+                self.docs[doc["_id"]] = dict(doc)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    def delete_many(self, query: Dict[str, Any]):
+        with self._lock:
+            for key in [k for k, d in self.docs.items() if _matches(d, query)]:
+                del self.docs[key]
+
+    def find(self, query: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(d) for d in self.docs.values() if _matches(d, query or {})]
+
+    def count_documents(self, query: Dict[str, Any]) -> int:
+        with self._lock:
+            return sum(1 for d in self.docs.values() if _matches(d, query))
+
+    def create_index(self, keys, **kwargs):
+        keys = list(keys)
+        if keys not in self.indexes:
+            self.indexes.append(keys)
+        return "_".join(f"{k}_{d}" for k, d in keys)
+
+
+class MemoryDatabase:
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name, self.latency_s)
+        return self._collections[name]
+
+
+_memory_db: Optional[MemoryDatabase] = None
+# one MongoClient (and its connection pool) per URI, for the life of the process
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def open_database(uri: str, name: str):
+    """pymongo database for `uri`, or the process-wide MemoryDatabase for memory://."""
+    global _memory_db
+    if uri == MEMORY_URI:
+        if _memory_db is None:
+            _memory_db = MemoryDatabase()
+        return _memory_db
+    if MongoClient is None:
+        raise RuntimeError("MONGO_URI is set but pymongo is not installed")
+    with _clients_lock:
+        client = _clients.get(uri)
+        if client is None:
+            client = _clients[uri] = MongoClient(uri)
+    return client[name]
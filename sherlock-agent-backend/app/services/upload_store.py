@@ -0,0 +1,166 @@
+# app/services/upload_store.py
+"""
+Resumable chunked uploads.
+
+    POST  /uploads                 {"filename", "size", "sha256"?}  -> upload_id
+    PATCH /uploads/<id>            body = bytes at Upload-Offset
+    GET   /uploads/<id>            -> offset to resume from
+    POST  /uploads/<id>/complete   -> case_id (+ job_id)
+
+An upload is data/uploads/<upload_id>/ holding data.part and upload.json.
+The offset is the size of data.part, so an interrupted chunk resumes from
+whatever reached the disk. Every chunk is fed to a RollingDigest while it
+is written; the digest is final when the last byte lands. complete() moves
+data.part into the case directory with a rename, so the evidence is
+written once.
+
+Chunks of one upload are serialized with an exclusive flock on data.part;
+a concurrent chunk is refused instead of interleaved.
+"""
+import os
+import json
+import uuid
+import fcntl
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from werkzeug.utils import secure_filename
+
+from app.services.export.hasher import RollingDigest
+from app.services.storage.catalog import now_iso
+
+logger = logging.getLogger("upload_store")
+
+UPLOADS_ROOT = Path("data") / "uploads"
+DATA_FILE = "data.part"
+STATE_FILE = "upload.json"
+_BLOCK = 1024 * 1024
+
+
+class UploadError(Exception):
+    """A request the upload can't take; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 400, offset: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class UploadStore:
+    def __init__(self, root: Path = UPLOADS_ROOT):
+        self.root = Path(root)
+        # upload_id -> RollingDigest of data.part; rebuilt from disk when missing or stale
+        self._digests: Dict[str, RollingDigest] = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise UploadError(f"upload {upload_id} not found", 404)
+        return self.root / upload_id
+
+    def _state(self, upload_id: str) -> Dict[str, Any]:
+        try:
+            return json.loads((self._dir(upload_id) / STATE_FILE).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise UploadError(f"upload {upload_id} not found", 404)
+
+    def _save(self, state: Dict[str, Any]):
+        path = self._dir(state["upload_id"]) / STATE_FILE
+        tmp = path.with_name(path.name + ".part")
+        tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    # --- protocol ---
+    def create(self, filename: str, size: int, sha256: Optional[str] = None,
+               owner: Optional[str] = None) -> Dict[str, Any]:
+        name = secure_filename(filename or "")
+        if not name:
+            raise UploadError("invalid filename")
+        if size < 0:
+            raise UploadError("size must be >= 0")
+        upload_id = uuid.uuid4().hex[:16]
+        d = self._dir(upload_id)
+        d.mkdir(parents=True)
+        (d / DATA_FILE).touch()
+        state = {"upload_id": upload_id, "filename": name, "size": size, "owner": owner,
+                 "expected_sha256": (sha256 or "").lower() or None, "status": "uploading",
+                 "created_at": now_iso(), "case_id": None, "sha256": None}
+        self._save(state)
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        state = self._state(upload_id)
+        data = self._dir(upload_id) / DATA_FILE
+        state["offset"] = data.stat().st_size if data.exists() else state["size"]
+        return state
+
+    def append(self, upload_id: str, offset: int, stream, length: Optional[int] = None) -> Dict[str, Any]:
+        """Write `stream` at `offset`, which must be the current end of the upload (else 409)."""
+        state = self._state(upload_id)
+        if state["status"] != "uploading":
+            raise UploadError(f"upload {upload_id} is {state['status']}", 409)
+        with open(self._dir(upload_id) / DATA_FILE, "ab") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError("another chunk of this upload is being written", 409)
+            current = os.fstat(f.fileno()).st_size
+            if offset != current:
+                raise UploadError(f"offset {offset} does not match upload offset {current}", 409, current)
+            if length is not None and current + length > state["size"]:
+                raise UploadError(f"chunk ends past the declared size {state['size']}", 413, current)
+            digest = self._digest(upload_id, current)
+            while True:
+                block = stream.read(_BLOCK)
+                if not block:
+                    break
+                if digest.offset + len(block) > state["size"]:
+                    raise UploadError(f"chunk ends past the declared size {state['size']}", 413, digest.offset)
+                f.write(block)
+                digest.update(block)
+            f.flush()
+        return self.status(upload_id)
+
+    def complete(self, upload_id: str, case_dir: Path) -> Dict[str, Any]:
+        """
+        Check size and digest, then rename data.part to <case_dir>/<filename>.
+        Returns the upload state with "path" and "sha256".
+        """
+        state = self.status(upload_id)
+        if state["status"] != "uploading":
+            raise UploadError(f"upload {upload_id} is {state['status']}", 409)
+        if state["offset"] != state["size"]:
+            raise UploadError(f"upload has {state['offset']} of {state['size']} bytes", 409, state["offset"])
+        data = self._dir(upload_id) / DATA_FILE
+        digest = self._digest(upload_id, state["offset"]).hexdigest()
+        if state["expected_sha256"] and digest != state["expected_sha256"]:
+            state.update(status="corrupt", sha256=digest)
+            self._save(state)
+            raise UploadError(f"sha256 mismatch: got {digest}, expected {state['expected_sha256']}", 422)
+        case_dir.mkdir(parents=True, exist_ok=True)
+        target = case_dir / state["filename"]
+        os.replace(data, target)
+        with self._lock:
+            self._digests.pop(upload_id, None)
+        state.pop("offset", None)
+        state.update(status="complete", sha256=digest, case_id=case_dir.name, completed_at=now_iso())
+        self._save(state)
+        logger.info("upload %s complete: %s (%d bytes, sha256 %s)", upload_id, target, state["size"], digest)
+        return dict(state, path=str(target))
+
+    def data_path(self, upload_id: str) -> Path:
+        return self._dir(upload_id) / DATA_FILE
+
+    def _digest(self, upload_id: str, offset: int) -> RollingDigest:
+        with self._lock:
+            digest = self._digests.get(upload_id)
+            if digest is None or digest.offset != offset:
+                # first chunk in this process, or bytes written elsewhere: re-read what is on disk
+                digest = RollingDigest.of_file(self._dir(upload_id) / DATA_FILE, limit=offset)
+                self._digests[upload_id] = digest
+            return digest
+
+
+upload_store = UploadStore()
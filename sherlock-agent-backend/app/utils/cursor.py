@@ -0,0 +1,74 @@
+# app/utils/cursor.py
+"""
+Opaque paging cursors for the collection endpoints.
+
+A cursor is url-safe base64 of a small JSON object:
+- {"after": <row key>, ...}  keyset pages (contacts, messages, files, timeline;
+                             [sort value, case_id] for /cases)
+- {"offset": <n>, ...}       ranked search results
+plus the page size and the total of the first page, so later pages neither
+recount nor need the client to repeat `limit`.
+Clients pass `next` of a response as `cursor` of the next request; the
+contents are not part of the API.
+"""
+import json
+import base64
+import binascii
+from typing import Any, Dict, Mapping, Optional
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Raises ValueError for anything encode_cursor() did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        state = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor")
+    if not isinstance(state, dict) or not all(
+            isinstance(state.get(k), int) or state.get(k) is None for k in ("offset", "limit", "total")):
+        raise ValueError("invalid cursor")
+    after = state.get("after")
+    # a row id, or [sort value, id] for catalog listings
+    if not (after is None or isinstance(after, int) or (
+            isinstance(after, list) and len(after) == 2
+            and all(isinstance(v, (int, float, str)) for v in after))):
+        raise ValueError("invalid cursor")
+    return state
+
+
+def page_args(args: Mapping[str, str], default_limit: Optional[int], compound: bool = False) -> Dict[str, Any]:
+    """
+    limit / offset / after / total from query args; `cursor` wins over
+    `offset`. Unparseable numbers fall back to the defaults.
+    `compound` endpoints take [sort value, id] keys instead of row ids.
+    Raises ValueError for a malformed cursor.
+    """
+    try:
+        limit = int(args["limit"]) if args.get("limit") not in (None, "") else default_limit
+        offset = int(args.get("offset", 0))
+    except (TypeError, ValueError):
+        limit, offset = default_limit, 0
+    paging = {"limit": limit, "offset": offset, "after": None, "total": None}
+    token = args.get("cursor")
+    if token:
+        state = decode_cursor(token)
+        if state.get("after") is not None and isinstance(state["after"], list) != compound:
+            raise ValueError("invalid cursor")
+        paging.update(after=state.get("after"), offset=state.get("offset") or 0, total=state.get("total"))
+        if args.get("limit") in (None, "") and state.get("limit") is not None:
+            paging["limit"] = state["limit"]
+    return paging
+
+
+def page_body(page, paging: Dict[str, Any], key: str = "items", by: str = "after") -> Dict[str, Any]:
+    """Response body for a case_store Page: items, total and the `next` cursor (None on the last page)."""
+    total = page.total if page.total is not None else paging["total"]
+    nxt = None
+    if page.next is not None:
+        nxt = encode_cursor({by: page.next, "limit": paging["limit"], "total": total})
+    return {key: page.items, "total": total, "next": nxt}
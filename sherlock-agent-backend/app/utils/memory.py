@@ -0,0 +1,29 @@
+# app/utils/memory.py
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process right now (0 if unknown)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except Exception:
+        pass
+    return max_rss_bytes()
+
+
+def max_rss_bytes() -> int:
+    """Lifetime RSS high-water mark of this process as reported by the OS."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
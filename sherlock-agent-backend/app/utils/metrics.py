@@ -0,0 +1,149 @@
+# app/utils/metrics.py
+"""
+Process-wide metrics, rendered in the Prometheus text format by
+GET /api/_metrics (debug_routes).
+
+- request latency: a histogram per (endpoint, method) and a counter per
+  (endpoint, method, status), fed by before/after_request hooks installed
+  with init_app(). For streamed responses (NDJSON, send_file) the latency
+  ends when the response starts, not when the body is sent.
+- parses: counts per outcome and the summed stage / timer seconds of the
+  ParseStats of every parse this process ran or reaped (record_parse).
+
+Counters live in this process only; every server process has its own.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, g, request
+
+# upper bounds in seconds; +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int):
+        # one count per bucket plus +Inf, not cumulative (rendering sums them up)
+        self.counts = [0] * (n_buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._responses: Dict[Tuple[str, str, int], int] = {}
+        self._parses: Dict[str, int] = {}
+        self._parse_stage_s: Dict[str, float] = {}
+        self._parse_timer_s: Dict[str, float] = {}
+        self._parse_timer_calls: Dict[str, int] = {}
+        self.started_at = time.time()
+
+    # --- recording ---
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            h = self._latency.get((endpoint, method))
+            if h is None:
+                h = self._latency[(endpoint, method)] = Histogram(len(self.buckets))
+            h.counts[i] += 1
+            h.sum += seconds
+            h.count += 1
+            key = (endpoint, method, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def record_parse(self, status: str, parse_stats: Optional[Dict[str, Any]] = None):
+        """One finished parse; `parse_stats` is ParseStats.to_dict() (summary["parse_stats"])."""
+        timings = (parse_stats or {}).get("timings") or {}
+        with self._lock:
+            self._parses[status] = self._parses.get(status, 0) + 1
+            for stage, s in (timings.get("stages") or {}).items():
+                self._parse_stage_s[stage] = self._parse_stage_s.get(stage, 0.0) + s
+            for name, t in (timings.get("timers") or {}).items():
+                self._parse_timer_s[name] = self._parse_timer_s.get(name, 0.0) + t["s"]
+                self._parse_timer_calls[name] = self._parse_timer_calls.get(name, 0) + t["calls"]
+
+    # --- exposition ---
+    def render(self, extra: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """
+        Prometheus text format (version 0.0.4). `extra` adds gauges:
+        {metric_name: {"help": ..., "value": number}}.
+        """
+        out: List[str] = []
+        with self._lock:
+            out += _header("sherlock_http_request_duration_seconds", "histogram",
+                           "Request latency per endpoint, until the response starts.")
+            for (endpoint, method), h in sorted(self._latency.items()):
+                labels = f'endpoint="{_esc(endpoint)}",method="{method}"'
+                cumulative = 0
+                for le, n in zip(self.buckets + (float("inf"),), h.counts):
+                    cumulative += n
+                    out.append(f'sherlock_http_request_duration_seconds_bucket{{{labels},le="{_le(le)}"}} {cumulative}')
+                out.append(f"sherlock_http_request_duration_seconds_sum{{{labels}}} {h.sum:.6f}")
+                out.append(f"sherlock_http_request_duration_seconds_count{{{labels}}} {h.count}")
+
+            out += _header("sherlock_http_responses_total", "counter", "Responses per endpoint and status.")
+            for (endpoint, method, status), n in sorted(self._responses.items()):
+                out.append(f'sherlock_http_responses_total{{endpoint="{_esc(endpoint)}",method="{method}",'
+                           f'status="{status}"}} {n}')
+
+            out += _header("sherlock_parses_total", "counter", "Finished parses per outcome.")
+            for status, n in sorted(self._parses.items()):
+                out.append(f'sherlock_parses_total{{status="{_esc(status)}"}} {n}')
+
+            out += _header("sherlock_parse_stage_seconds_total", "counter", "Wall time of parses per stage.")
+            for stage, s in sorted(self._parse_stage_s.items()):
+                out.append(f'sherlock_parse_stage_seconds_total{{stage="{_esc(stage)}"}} {s:.6f}')
+
+            out += _header("sherlock_parse_timer_seconds_total", "counter",
+                           "Time of parses per hot-path timer (timers nest).")
+            for name, s in sorted(self._parse_timer_s.items()):
+                out.append(f'sherlock_parse_timer_seconds_total{{timer="{_esc(name)}"}} {s:.6f}')
+            out += _header("sherlock_parse_timer_calls_total", "counter", "Calls per hot-path timer.")
+            for name, n in sorted(self._parse_timer_calls.items()):
+                out.append(f'sherlock_parse_timer_calls_total{{timer="{_esc(name)}"}} {n}')
+
+        out += _header("sherlock_process_start_time_seconds", "gauge", "Start time of this process (unix).")
+        out.append(f"sherlock_process_start_time_seconds {self.started_at:.3f}")
+        for name, m in sorted((extra or {}).items()):
+            out += _header(name, "gauge", m.get("help", ""))
+            out.append(f"{name} {m['value']}")
+        return "\n".join(out) + "\n"
+
+
+def _header(name: str, kind: str, help_text: str) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _esc(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+metrics = Metrics()
+
+
+def init_app(app: Flask):
+    """Time every request of `app` into `metrics`."""
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_t0 = time.perf_counter()
+
+    @app.after_request
+    def _observe(response):
+        t0 = g.pop("_metrics_t0", None)
+        if t0 is not None:
+            # the route rule, not the path, so case ids don't explode the label set
+            endpoint = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            metrics.observe_request(endpoint, request.method, response.status_code, time.perf_counter() - t0)
+        return response
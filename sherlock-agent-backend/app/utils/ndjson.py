@@ -0,0 +1,63 @@
+# app/utils/ndjson.py
+"""
+Streamed NDJSON responses for the collection endpoints.
+
+A client asks with `?format=ndjson` or `Accept: application/x-ndjson`. The
+collection is then walked in keyset chunks of CHUNK rows (the same `after`
+seek the JSON pages use) and each chunk is written as it is fetched, one
+record per line. Memory stays at one chunk and the first byte leaves after
+the first chunk, whatever the size of the case.
+"""
+import json
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from flask import Response
+
+MIMETYPE = "application/x-ndjson"
+CHUNK = 1000
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def wants_ndjson(request) -> bool:
+    fmt = request.args.get("format")
+    if fmt:
+        return fmt.lower() == "ndjson"
+    return request.accept_mimetypes.best_match(["application/json", MIMETYPE]) == MIMETYPE
+
+
+def iter_rows(fetch: Callable[..., Any], paging: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Records of `fetch(limit=, offset=, after=)` (a case query returning a
+    Page) from the paging start, chunk by chunk; paging["limit"] caps the
+    total when given.
+    """
+    remaining: Optional[int] = paging["limit"]
+    after, offset = paging["after"], paging["offset"]
+    while remaining is None or remaining > 0:
+        size = CHUNK if remaining is None else min(CHUNK, remaining)
+        page = fetch(limit=size, offset=offset, after=after)
+        yield from page.items
+        if remaining is not None:
+            remaining -= len(page.items)
+        if page.next is None:
+            break
+        after, offset = page.next, 0
+
+
+def ndjson_response(case, fetch: Callable[..., Any], paging: Dict[str, Any]) -> Response:
+    """Stream `fetch`'s records from `case`, closing the case once the response is done."""
+
+    def lines():
+        buf = []
+        for item in iter_rows(fetch, paging):
+            buf.append(_encoder.encode(item))
+            if len(buf) >= CHUNK:
+                yield "\n".join(buf) + "\n"
+                buf = []
+        if buf:
+            yield "\n".join(buf) + "\n"
+
+    resp = Response(lines(), mimetype=MIMETYPE)
+    resp.call_on_close(case.close)
+    return resp
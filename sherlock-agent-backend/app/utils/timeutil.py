@@ -0,0 +1,68 @@
+# app/utils/timeutil.py
+"""
+Timestamps as UTC epoch milliseconds.
+
+Extractions carry epoch seconds, milliseconds or microseconds (as int or
+digit string) or ISO 8601 strings. The unit of a number is guessed from
+its magnitude:
+    <= 0    untimed        (0 / -1 stand for "unknown")
+    < 1e11  seconds        (up to year 5138)
+    < 1e14  milliseconds   (from 1973-03-03 on)
+    < 1e17  microseconds
+    else    nanoseconds
+so millisecond stamps before March 1973 are read as seconds.
+"""
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+HOUR_MS = 3_600_000
+DAY_MS = 86_400_000
+BUCKETS = {"hour": HOUR_MS, "day": DAY_MS}
+
+
+def _number_to_ms(n: float) -> Optional[int]:
+    if n <= 0:
+        return None
+    if n < 1e11:
+        return int(n * 1000)
+    if n < 1e14:
+        return int(n)
+    if n < 1e17:
+        return int(n // 1000)
+    return int(n // 1_000_000)
+
+
+def to_epoch_ms(value: Any) -> Optional[int]:
+    """Epoch ms of an extraction timestamp; None for missing / non-positive / unparseable ones."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return _number_to_ms(value)
+    if not isinstance(value, str):
+        return None
+    s = value.strip()
+    if not s:
+        return None
+    if s.lstrip("-").isdigit():
+        return _number_to_ms(int(s))
+    try:
+        dt = datetime.fromisoformat(s[:-1] + "+00:00" if s.endswith(("Z", "z")) else s)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def parse_time_param(value: Optional[str]) -> Optional[int]:
+    """`from` / `to` query value (epoch s / ms or ISO 8601) as epoch ms. Raises ValueError."""
+    if value is None or not value.strip():
+        return None
+    ms = to_epoch_ms(value)
+    if ms is None and value.strip().lstrip("-").strip("0") != "":
+        raise ValueError(f"invalid time {value!r}")
+    return ms or 0
+
+
+def bucket_start(ms: int, bucket_ms: int) -> int:
+    return ms - ms % bucket_ms
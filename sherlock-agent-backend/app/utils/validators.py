@@ -1,8 +1,11 @@
-import json
+import codecs
 from pathlib import Path
 
 ALLOWED_EXTENSIONS = {"json", "zip"}
 
+_PROBE_BYTES = 64 * 1024
+_JSON_WS = b" \t\r\n"
+
 def is_allowed_file(filename: str) -> bool:
     """Check file extension."""
     if "." not in filename:
@@ -11,13 +14,26 @@ def is_allowed_file(filename: str) -> bool:
 
 
 def validate_json(path: Path):
-    """Try loading JSON & return (ok, error_msg)."""
+    """
+    Cheap shape check, return (ok, error_msg): the document must be one JSON
+    object. Only the head and tail of the file are read; the full syntax is
+    checked by the parse itself, which reads the file once (json_stream).
+    """
     try:
-        with open(path, "r", encoding="utf-8-sig") as f:
-            json.load(f)
-        return True, None
-    except Exception as e:
+        size = path.stat().st_size
+        with open(path, "rb") as f:
+            head = f.read(_PROBE_BYTES)
+            f.seek(max(0, size - _PROBE_BYTES))
+            tail = f.read()
+    except OSError as e:
         return False, f"Invalid JSON: {e}"
+    head = head[len(codecs.BOM_UTF8):] if head.startswith(codecs.BOM_UTF8) else head
+    head, tail = head.lstrip(_JSON_WS), tail.rstrip(_JSON_WS)
+    if not head.startswith(b"{"):
+        return False, "Invalid JSON: expected a top-level object"
+    if not tail.endswith(b"}"):
+        return False, "Invalid JSON: document is truncated (no closing '}')"
+    return True, None
 
 
 def validate_zip(path: Path):
@@ -26,15 +42,16 @@ def validate_zip(path: Path):
     return True, None
 
 
-def validate_upload(path: Path):
+def validate_upload(path: Path, name: str = None):
     """
-    Wrapper used by upload API.
+    Wrapper used by upload API. `name` gives the file type when `path`
+    has none of its own (a chunked upload's data.part).
     Returns: (ok: bool, error_msg: str | None)
     """
     if not path.exists():
         return False, "Uploaded file not found on server"
 
-    ext = path.suffix.lower().replace(".", "")
+    ext = Path(name or path.name).suffix.lower().replace(".", "")
 
     if ext not in ALLOWED_EXTENSIONS:
         return False, f"Unsupported file type '.{ext}', allowed: {ALLOWED_EXTENSIONS}"
@@ -0,0 +1,137 @@
+# benchmarks/bench_memory_layout.py
+"""
+Memory footprint of the in-memory parse results, old layout vs compact layout.
+Run from project root:
+    python -m benchmarks.bench_memory_layout [chats] [messages_per_chat] [contacts] [files]
+
+"legacy" rebuilds today's pre-compaction layout (plain dataclasses with a
+per-instance __dict__, one dict per message); "compact" uses the slotted
+Account / Contact / TaggedFile and MessageColumns threads the handlers now
+build. Both are measured with tracemalloc on the same synthetic data.
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.services.parser.account import Account
+from app.services.parser.contact import Contact
+from app.services.parser.tagged_file import TaggedFile
+from app.services.parser.message_store import MessageColumns
+
+
+# --- legacy layout (copied shapes, without behaviour) ---
+@dataclass(eq=True, frozen=True)
+class LegacyAccount:
+    type: str
+    identifier: Optional[str]
+    _base_identifier: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_base_identifier", self.identifier)
+
+
+@dataclass
+class LegacyContact:
+    names: List[str] = field(default_factory=list)
+    accounts: List[LegacyAccount] = field(default_factory=list)
+    base_identifiers: List[str] = field(default_factory=list)
+    device_owner: bool = False
+
+
+@dataclass
+class LegacyTaggedFile:
+    id: str = None
+    fs: str = None
+    fsid: str = None
+    local_path: Path = None
+    mobile_path: Path = None
+    mimetype: str = None
+    size: int = 0
+    crtime: int = 0
+    mtime: int = 0
+    metadata: Dict[str, str] = None
+
+
+def _phone(i: int) -> str:
+    # a fresh str object each call, like values read from XML
+    return "+4366" + str(i).zfill(8)
+
+
+def build_legacy(chats: int, per_chat: int, contacts: int, files: int):
+    out_contacts = []
+    for i in range(contacts):
+        acct = LegacyAccount("PHONE", _phone(i))
+        out_contacts.append(LegacyContact([f"Person {i}"], [acct], [acct.identifier]))
+    threads = []
+    for c in range(chats):
+        a, b = LegacyAccount("WHATSAPP", _phone(c)), LegacyAccount("WHATSAPP", _phone(c + 1))
+        msgs = []
+        for m in range(per_chat):
+            msgs.append({
+                "from": a if m % 2 == 0 else b,
+                "subject": None,
+                "body": f"message {m} in chat {c}",
+                "timestamp": 1700000000000 + m * 1000,
+                "attachments": [],
+            })
+        threads.append({"id": f"chat{c}", "participants": [a, b], "messages": msgs})
+    out_files = [LegacyTaggedFile(id=f"f{i}", fs="".join(["f", "s"]), mimetype="".join(["image/", "jpeg"]),
+                                  local_path=Path(f"files/img_{i}.jpg"), size=i, metadata={})
+                 for i in range(files)]
+    return out_contacts, threads, out_files
+
+
+def build_compact(chats: int, per_chat: int, contacts: int, files: int):
+    out_contacts = []
+    for i in range(contacts):
+        acct = Account(Account.Type.PHONE, _phone(i))
+        out_contacts.append(Contact([f"Person {i}"], [acct], [acct.base_identifier()]))
+    threads = []
+    for c in range(chats):
+        a, b = Account(Account.Type.WHATSAPP, _phone(c)), Account(Account.Type.WHATSAPP, _phone(c + 1))
+        msgs = MessageColumns()
+        for m in range(per_chat):
+            msgs.add(a if m % 2 == 0 else b, None, f"message {m} in chat {c}", 1700000000000 + m * 1000, [])
+        threads.append({"id": f"chat{c}", "participants": [a, b], "messages": msgs})
+    out_files = [TaggedFile(id=f"f{i}", fs="".join(["f", "s"]), mimetype="".join(["image/", "jpeg"]),
+                            local_path=Path(f"files/img_{i}.jpg"), size=i, metadata={})
+                 for i in range(files)]
+    return out_contacts, threads, out_files
+
+
+def measure(builder, *args):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = builder(*args)
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return current, peak, elapsed
+
+
+def main():
+    chats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    per_chat = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    contacts = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    files = int(sys.argv[4]) if len(sys.argv) > 4 else 20000
+    messages = chats * per_chat
+    print(f"{chats} chats x {per_chat} messages = {messages} messages, {contacts} contacts, {files} files")
+
+    results = {}
+    for name, builder in (("legacy", build_legacy), ("compact", build_compact)):
+        current, peak, elapsed = measure(builder, chats, per_chat, contacts, files)
+        results[name] = current
+        print(f"  {name:<8}: {current / 2**20:8.1f} MiB retained  {peak / 2**20:8.1f} MiB peak  "
+              f"{current / max(messages, 1):6.1f} B/message  {elapsed:6.2f}s")
+    print(f"  compact / legacy = {results['compact'] / results['legacy']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
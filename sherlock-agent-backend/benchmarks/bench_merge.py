@@ -0,0 +1,88 @@
+# benchmarks/bench_merge.py
+"""
+AccountManager.merge_candidates benchmark.
+Run from project root:
+    python -m benchmarks.bench_merge [n_contacts ...]      (default: 10000 100000 1000000)
+    python -m benchmarks.bench_merge --check 2000          compare with the old pairwise loop
+
+Synthetic population: address-book contacts with a name and one or two phone
+numbers, plus nameless chat participants re-using some of those numbers
+(the shape ChatHandler produces), so a good share of contacts merge.
+"""
+import sys
+import time
+import random
+
+from app.services.parser.account import Account
+from app.services.parser.account_manager import AccountManager
+
+FIRST = ["Anna", "Ben", "Clara", "David", "Eva", "Felix", "Greta", "Hans", "Ida", "Jonas", "Lena", "Max"]
+LAST = ["Gruber", "Huber", "Bauer", "Wagner", "Mueller", "Pichler", "Steiner", "Moser", "Mayer", "Hofer"]
+
+
+def build_manager(n: int, seed: int = 7) -> AccountManager:
+    rnd = random.Random(seed)
+    am = AccountManager()
+    numbers = max(1, int(n * 0.6))
+    for i in range(n):
+        num = f"+4366{rnd.randrange(numbers):08d}"
+        accounts = [Account(Account.Type.PHONE, num)]
+        if rnd.random() < 0.2:
+            accounts.append(Account(Account.Type.PHONE, f"+4366{rnd.randrange(numbers):08d}"))
+        if rnd.random() < 0.3:
+            # chat participant: no name
+            name = None
+            accounts = [Account(Account.Type.WHATSAPP, num[1:] + "@s.whatsapp.net")]
+        else:
+            name = f"{rnd.choice(FIRST)} {rnd.choice(LAST)}"
+        am.add_contact_from_name_accounts(name, accounts)
+    return am
+
+
+def legacy_merge(am: AccountManager):
+    """The pre-index pairwise loop, kept for parity checks."""
+    finished = False
+    while not finished:
+        finished = True
+        i = 0
+        while i < len(am.contacts):
+            j = i + 1
+            while j < len(am.contacts):
+                c1, c2 = am.contacts[i], am.contacts[j]
+                if c1.can_be_merged(c2):
+                    c1.merge(c2)
+                    am.contacts.pop(j)
+                    finished = False
+                else:
+                    j += 1
+            i += 1
+
+
+def _snapshot(am: AccountManager):
+    return [(tuple(c.names), tuple(c.base_identifiers), tuple(c.accounts)) for c in am.contacts]
+
+
+def main(argv):
+    if argv and argv[0] == "--check":
+        n = int(argv[1]) if len(argv) > 1 else 2000
+        old, new = build_manager(n), build_manager(n)
+        t0 = time.perf_counter(); legacy_merge(old); t_old = time.perf_counter() - t0
+        t0 = time.perf_counter(); new.merge_candidates(); t_new = time.perf_counter() - t0
+        print(f"n={n}: legacy {t_old:.2f}s -> {len(old.contacts)} contacts, "
+              f"indexed {t_new:.3f}s -> {len(new.contacts)} contacts, "
+              f"{'same result' if _snapshot(old) == _snapshot(new) else 'RESULTS DIFFER'}")
+        return
+    sizes = [int(a) for a in argv] or [10000, 100000, 1000000]
+    for n in sizes:
+        t0 = time.perf_counter()
+        am = build_manager(n)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        am.merge_candidates()
+        t_merge = time.perf_counter() - t0
+        print(f"n={n:>8}: build {t_build:6.2f}s  merge {t_merge:6.2f}s  "
+              f"({n / t_merge:9.0f} contacts/s) -> {len(am.contacts)} contacts")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,64 @@
+# benchmarks/bench_mongo_ingest.py
+"""
+Documents/second of MongoIngestor for a few batch sizes and in-flight limits.
+Run from project root:
+    python -m benchmarks.bench_mongo_ingest [messages] [latency_ms] [mongo_uri]
+
+Without a URI the in-process MemoryDatabase is used, with `latency_ms`
+(default 2) of simulated round trip per insert_many, which is what batching
+and in-flight batches hide. With a URI (needs pymongo) a real server is
+loaded into the "sherlock_bench" database. Each run ingests the same case
+twice to check that re-ingest replaces, not duplicates.
+"""
+import sys
+import time
+
+from app.services.storage.mongo_store import COLLECTIONS, MemoryDatabase, MongoIngestor, open_database
+
+
+def rows(messages: int):
+    """Parser-shaped rows: 1 contact per 20 messages, 1 file per 10, an event per message / file."""
+    for i in range(messages // 20):
+        yield "contact", {"names": [f"Person {i}"], "device_owner": False,
+                          "accounts": [{"type": "PHONE", "identifier": f"+4366{i:08d}"}]}
+    for i in range(messages):
+        msg = {"id": f"m{i}", "from": {"type": "PHONE", "identifier": f"+4366{i % 500:08d}"},
+               "subject": None, "body": f"message {i}", "timestamp": 1700000000000 + i * 1000, "attachments": []}
+        yield "message", (f"chat{i // 100}", msg)
+        yield "event", {"id": f"m{i}", "type": "message", "timestamp": msg["timestamp"], "brief": msg["body"],
+                        "ref": {"type": "message", "id": f"m{i}"}}
+    for i in range(messages // 10):
+        yield "file", {"id": f"f{i}", "local_path": f"files/img_{i}.jpg", "mobile_path": f"/sdcard/img_{i}.jpg",
+                       "mimetype": "image/jpeg", "size": 1024}
+
+
+def ingest(db, messages: int, batch_size: int, max_in_flight: int):
+    ing = MongoIngestor(db, "bench_case", batch_size=batch_size, max_in_flight=max_in_flight).begin()
+    t0 = time.perf_counter()
+    for kind, row in rows(messages):
+        if kind == "message":
+            ing.add_message(0, row[0], row[1])
+        else:
+            getattr(ing, f"add_{kind}")(row)
+    ing.commit()
+    return time.perf_counter() - t0, ing.stats
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    uri = sys.argv[3] if len(sys.argv) > 3 else ""
+    target = uri or f"MemoryDatabase, {latency_ms:g} ms per batch"
+    print(f"{messages} messages -> {target}")
+    for batch_size, max_in_flight in ((100, 1), (1000, 1), (1000, 4), (5000, 4)):
+        db = open_database(uri, "sherlock_bench") if uri else MemoryDatabase(latency_s=latency_ms / 1000)
+        ingest(db, messages, batch_size, max_in_flight)
+        elapsed, stats = ingest(db, messages, batch_size, max_in_flight)   # re-ingest
+        stored = sum(db[name].count_documents({"case_id": "bench_case"}) for name in COLLECTIONS)
+        print(f"  batch {batch_size:>5} x {max_in_flight} in flight: {stats['documents'] / elapsed:10,.0f} docs/s  "
+              f"({stats['documents']} docs, {stats['batches']} batches, {elapsed:6.2f}s; "
+              f"stored after re-ingest: {stored})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_parallel_parse.py
+"""
+Scaling benchmark for the multi-process UFDR parser.
+Run from project root:
+    python -m benchmarks.bench_parallel_parse [contacts] [chats] [messages_per_chat] [noise_models]
+
+Generates a synthetic report XML (benchmarks.synthetic_ufdr), parses it with
+the sequential parser and with parse_ufdr_parallel at several worker counts,
+checks that every run produces the same parsed.json and prints wall time /
+models per second.
+"""
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+from app.services.parser.ufed_context import UFEDFileContext
+from app.services.parser.contact_handler import ContactHandler
+from app.services.parser.chat_handler import ChatHandler
+from app.services.parser.file_handler import FileHandler
+from app.services.parser.ufed_sax_parser import parse_ufdr, parse_ufdr_parallel
+from app.services.parser.case_parser import _finalize_output
+from app.services.parser.parsed_writer import load_parsed
+from benchmarks.synthetic_ufdr import write_report
+
+
+def _run(report: Path, workers: int):
+    with tempfile.TemporaryDirectory(prefix="bench_case_") as tmp:
+        case_dir = Path(tmp)
+        ctx = UFEDFileContext(unzipped_dir=case_dir)
+        handlers = (ContactHandler(ctx, None), ChatHandler(ctx, None), FileHandler(ctx, None))
+        t0 = time.perf_counter()
+        if workers == 0:
+            parse_ufdr(report, *handlers, case_dir)
+        else:
+            parse_ufdr_parallel(report, *handlers, case_dir, workers=workers, chunk_bytes=1024 * 1024)
+        elapsed = time.perf_counter() - t0
+        _finalize_output(ctx, raw_meta={}, case_id="bench", case_dir=case_dir)
+        parsed = load_parsed(case_dir)
+    return elapsed, parsed
+
+
+def main():
+    contacts = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    chats = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    per_chat = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    noise = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    models = contacts + chats + noise
+
+    with tempfile.TemporaryDirectory(prefix="bench_ufdr_") as tmp:
+        report = Path(tmp) / "report.xml"
+        write_report(report, contacts, chats, per_chat, noise=noise)
+        size_mb = report.stat().st_size / (1024 * 1024)
+        print(f"report: {size_mb:.1f} MB, {models} top-level models, cpu_count={os.cpu_count()}")
+
+        base_time, base_parsed = _run(report, 0)
+        print(f"  sequential      : {base_time:7.2f}s  {models / base_time:9.0f} models/s")
+        for workers in (1, 2, 4, 8, 16):
+            if workers > 2 * (os.cpu_count() or 1) and workers > 2:
+                break
+            elapsed, parsed = _run(report, workers)
+            same = "same output" if parsed == base_parsed else "OUTPUT DIFFERS"
+            print(f"  workers={workers:<2}      : {elapsed:7.2f}s  {models / elapsed:9.0f} models/s  "
+                  f"x{base_time / elapsed:4.2f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# benchmarks/bench_suite.py
+"""
+Parser / API benchmark suite over synthetic UFDR extractions.
+Run from project root:
+    python -m benchmarks.bench_suite [--scales tiny,small,medium] [--workers 1,2]
+                                     [--requests 20] [--out bench_results.json]
+                                     [--compare old_results.json]
+
+For every scale of benchmarks.synthetic_ufdr.SCALES it generates a .ufdr in
+a temp directory and measures
+- parse_uploaded_file at each worker count: wall time, models/s, MB/s of
+  report XML, peak RSS, and the per-stage timings of the parse summary
+- AccountManager.merge_candidates on the parsed contacts
+- latency of the case endpoints (cold first request, then p50 / p95 / max)
+Each parse runs in a fresh spawned process, so peak RSS and the
+process-wide caches belong to that parse alone.
+
+Results are written as JSON together with the commit, interpreter and
+machine they were taken on; --compare prints the ratio of every headline
+number against an earlier results file (> 1 means slower / bigger).
+"""
+import os
+import sys
+import json
+import time
+import traceback
+import zipfile
+import platform
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.synthetic_ufdr import SCALES, write_ufdr
+
+ENDPOINTS = (
+    "/api/cases",
+    "/api/cases/{case_id}/summary",
+    "/api/cases/{case_id}/contacts?limit=100",
+    "/api/cases/{case_id}/messages?limit=100",
+    "/api/cases/{case_id}/timeline?limit=100",
+    "/api/cases/{case_id}/files?limit=100",
+    "/api/cases/{case_id}/search?q=message&limit=50",
+    "/api/cases/{case_id}/parsed",
+)
+_BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+# --- child processes ---
+def _parse_child(work_dir: str, upload: str, case_id: str, workers: int) -> Dict[str, Any]:
+    os.chdir(work_dir)
+    from app.services.parser.case_parser import parse_uploaded_file
+    from app.utils.memory import max_rss_bytes
+
+    t0 = time.perf_counter()
+    summary = parse_uploaded_file(upload, case_id, workers=workers)
+    return {"elapsed_s": time.perf_counter() - t0, "summary": summary, "max_rss_bytes": max_rss_bytes()}
+
+
+def _merge_child(work_dir: str, upload: str) -> Dict[str, Any]:
+    os.chdir(work_dir)
+    from app.services.parser.ufed_context import UFEDFileContext
+    from app.services.parser.contact_handler import ContactHandler
+    from app.services.parser.chat_handler import ChatHandler
+    from app.services.parser.file_handler import FileHandler
+    from app.services.parser.ufed_sax_parser import parse_ufdr_archive
+
+    case_dir = Path(work_dir) / "merge_case"
+    case_dir.mkdir(exist_ok=True)
+    ctx = UFEDFileContext(unzipped_dir=case_dir)
+    parse_ufdr_archive(Path(upload), ContactHandler(ctx, None), ChatHandler(ctx, None), FileHandler(ctx, None),
+                       case_dir)
+    am = ctx.account_manager
+    before = len(am.contacts)
+    t0 = time.perf_counter()
+    am.merge_candidates()
+    return {"seconds": time.perf_counter() - t0, "contacts_before": before, "contacts_after": len(am.contacts)}
+
+
+def _child_main(conn, fn, args):
+    try:
+        conn.send((True, fn(*args)))
+    except BaseException:
+        conn.send((False, traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _in_child(mp, fn, *args) -> Dict[str, Any]:
+    """fn(*args) in a fresh (non-daemon, so it may start the parse workers) process."""
+    recv, send = mp.Pipe(duplex=False)
+    proc = mp.Process(target=_child_main, args=(send, fn, args))
+    proc.start()
+    send.close()
+    try:
+        ok, value = recv.recv()
+    except EOFError:
+        ok, value = False, f"child exited with code {proc.join() or proc.exitcode}"
+    proc.join()
+    if not ok:
+        raise RuntimeError(f"{fn.__name__} failed in the child process:\n{value}")
+    return value
+
+
+# --- measurements ---
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def bench_endpoints(case_id: str, requests: int) -> Dict[str, Dict[str, Any]]:
+    from app.main import create_app
+
+    client = create_app().test_client()
+    out = {}
+    for template in ENDPOINTS:
+        url = template.format(case_id=case_id)
+        t0 = time.perf_counter()
+        resp = client.get(url)
+        resp.get_data()
+        cold = time.perf_counter() - t0
+        times = []
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            r = client.get(url)
+            r.get_data()     # streamed bodies count too
+            times.append(time.perf_counter() - t0)
+        out[template] = {"status": resp.status_code, "bytes": len(resp.get_data()),
+                         "cold_ms": round(cold * 1000, 3),
+                         "p50_ms": round(_percentile(times, 0.5) * 1000, 3),
+                         "p95_ms": round(_percentile(times, 0.95) * 1000, 3),
+                         "max_ms": round(max(times) * 1000, 3)}
+    return out
+
+
+def bench_scale(name: str, params: Dict[str, int], workers: List[int], requests: int, mp) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as tmp:
+        t0 = time.perf_counter()
+        upload = write_ufdr(Path(tmp) / f"{name}.ufdr", **params)
+        gen_s = time.perf_counter() - t0
+        with zipfile.ZipFile(upload) as zf:
+            report_bytes = zf.getinfo("report.xml").file_size
+        result: Dict[str, Any] = {"params": params, "archive_bytes": upload.stat().st_size,
+                                  "report_bytes": report_bytes, "generate_s": round(gen_s, 3), "parse": {}}
+        print(f"[{name}] {params}: archive {upload.stat().st_size / 2**20:.1f} MB, "
+              f"report {report_bytes / 2**20:.1f} MB (generated in {gen_s:.1f}s)")
+
+        case_id = None
+        for w in workers:
+            case_id = f"bench_{name}_w{w}"
+            run = _in_child(mp, _parse_child, tmp, str(upload), case_id, w)
+            summary, elapsed = run["summary"], run["elapsed_s"]
+            stats = summary.get("parse_stats") or {}
+            models = sum((stats.get("models_by_type") or {}).values())
+            result["parse"][str(w)] = {
+                "elapsed_s": round(elapsed, 3),
+                "models": models,
+                "models_per_s": round(models / elapsed, 1),
+                "mb_per_s": round(report_bytes / 2**20 / elapsed, 2),
+                "peak_rss_bytes": run["max_rss_bytes"],
+                "totals": {k: summary.get(k) for k in ("total_contacts", "total_threads", "total_messages",
+                                                       "total_files", "total_events")},
+                "timings": stats.get("timings"),
+            }
+            print(f"  parse workers={w}: {elapsed:7.2f}s  {models / elapsed:9.0f} models/s  "
+                  f"{report_bytes / 2**20 / elapsed:6.1f} MB/s  peak rss {run['max_rss_bytes'] / 2**20:.0f} MB")
+
+        merge = _in_child(mp, _merge_child, tmp, str(upload))
+        result["merge_candidates"] = {k: round(v, 4) if isinstance(v, float) else v for k, v in merge.items()}
+        print(f"  merge_candidates: {merge['seconds']:.3f}s "
+              f"({merge['contacts_before']} -> {merge['contacts_after']} contacts)")
+
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            result["endpoints"] = bench_endpoints(case_id, requests)
+        finally:
+            os.chdir(cwd)
+        for template, e in result["endpoints"].items():
+            print(f"  {template:<48} {e['status']}  cold {e['cold_ms']:8.1f} ms  p50 {e['p50_ms']:7.2f} ms  "
+                  f"p95 {e['p95_ms']:7.2f} ms")
+    return result
+
+
+def _environment() -> Dict[str, Any]:
+    def git(*args) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *args], cwd=_BASE_DIR, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    from app import config
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {k: getattr(config, k) for k in ("PARSE_CHUNK_BYTES", "PARSED_FORMAT", "PARSED_ENCODINGS",
+                                                   "CASE_STORE", "SEARCH_INDEX", "EVENT_SORT_RUN_SIZE")},
+    }
+
+
+# --- comparison ---
+def _headlines(scale: Dict[str, Any]):
+    """(label, value, higher_is_better) for the numbers --compare looks at."""
+    for w, run in scale.get("parse", {}).items():
+        yield f"parse workers={w} elapsed_s", run.get("elapsed_s"), False
+        yield f"parse workers={w} models_per_s", run.get("models_per_s"), True
+        yield f"parse workers={w} peak_rss_bytes", run.get("peak_rss_bytes"), False
+    yield "merge_candidates seconds", (scale.get("merge_candidates") or {}).get("seconds"), False
+    for template, e in scale.get("endpoints", {}).items():
+        yield f"{template} p50_ms", e.get("p50_ms"), False
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10) -> int:
+    """Print new/old ratios; returns how many numbers got worse by more than `threshold`."""
+    print(f"\ncompare {(old.get('environment') or {}).get('commit') or '?'} -> "
+          f"{(new.get('environment') or {}).get('commit') or '?'}  (ratio > 1: slower / bigger)")
+    worse = 0
+    for name, scale in new["scales"].items():
+        base = old.get("scales", {}).get(name)
+        if base is None:
+            continue
+        before = {label: value for label, value, _ in _headlines(base)}
+        for label, b, higher_better in _headlines(scale):
+            a = before.get(label)
+            if not a or not b:
+                continue
+            ratio = (a / b) if higher_better else (b / a)
+            flag = "  WORSE" if ratio > 1 + threshold else ""
+            worse += bool(flag)
+            print(f"  [{name}] {label:<60} {a:>12.4g} -> {b:>12.4g}  x{ratio:5.2f}{flag}")
+    return worse
+
+
+def main():
+    ap = argparse.ArgumentParser(description="parser / API benchmark suite")
+    ap.add_argument("--scales", default="tiny,small,medium", help=f"comma separated, of {', '.join(SCALES)}")
+    ap.add_argument("--workers", default="1,2", help="parse worker counts, comma separated")
+    ap.add_argument("--requests", type=int, default=20, help="timed requests per endpoint")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", help="earlier results file to compare against")
+    args = ap.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        ap.error(f"unknown scale(s) {unknown}, choose from {list(SCALES)}")
+    workers = [int(w) for w in args.workers.split(",")]
+
+    mp = multiprocessing.get_context("spawn")
+    results = {"environment": _environment(), "scales": {}}
+    for name in scales:
+        results["scales"][name] = bench_scale(name, SCALES[name], workers, args.requests, mp)
+
+    out = Path(args.out)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\nresults written to {out}")
+
+    if args.compare:
+        worse = compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), results)
+        sys.exit(1 if worse else 0)
+
+
+if __name__ == "__main__":
+    main()
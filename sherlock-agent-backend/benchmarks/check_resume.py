@@ -0,0 +1,93 @@
+# benchmarks/check_resume.py
+"""
+Checks that a parse resumed from a checkpoint writes the same parsed.json as
+an uninterrupted one.
+Run from project root:
+    python -m benchmarks.check_resume [contacts] [chats] [messages_per_chat]
+
+For the sequential parser and the parallel parser (2 workers) it
+1. parses a synthetic report (zipped, with tagged files) in one go,
+2. parses it again with a checkpointer that simulates a crash right after
+   its second checkpoint,
+3. resumes that case and compares parsed.json byte for byte.
+Both runs use the same case id (the case dir is removed in between), so paths
+in parsed.json match. Everything happens in a temp directory.
+"""
+import os
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+from app import config
+from app.services.parser.case_parser import parse_uploaded_file
+from app.services.parser.checkpoint import Checkpointer
+from benchmarks.synthetic_ufdr import write_ufdr
+
+
+class SimulatedCrash(BaseException):
+    """Not an Exception: nothing on the parse path may swallow it."""
+
+
+class CrashingCheckpointer(Checkpointer):
+    def __init__(self, case_dir: Path, every_units: int, crash_after: int):
+        super().__init__(case_dir, interval_s=0, every_units=every_units)
+        self.crash_after = crash_after
+
+    def save(self, position):
+        super().save(position)
+        if self.saves >= self.crash_after:
+            raise SimulatedCrash(position)
+
+
+def _parsed_bytes(case_id: str) -> bytes:
+    return (Path("data") / "cases" / case_id / "parsed.json").read_bytes()
+
+
+def check(upload: Path, workers: int, every_units: int) -> bool:
+    label = "parallel" if workers > 1 else "sequential"
+    case_id = f"{label}_case"
+    case_dir = Path("data") / "cases" / case_id
+    parse_uploaded_file(str(upload), case_id, workers=workers,
+                        checkpointer=Checkpointer(case_dir, interval_s=0))
+    expected = _parsed_bytes(case_id)
+    shutil.rmtree(case_dir)
+
+    try:
+        parse_uploaded_file(str(upload), case_id, workers=workers,
+                            checkpointer=CrashingCheckpointer(case_dir, every_units, crash_after=2))
+        print(f"  {label:<10}: run finished before the simulated crash, lower every_units")
+        return False
+    except SimulatedCrash as crash:
+        print(f"  {label:<10}: crashed after checkpoint at {crash.args[0]}")
+    summary = parse_uploaded_file(str(upload), case_id, workers=workers, resume=True,
+                                  checkpointer=Checkpointer(case_dir, interval_s=0))
+    same = _parsed_bytes(case_id) == expected
+    print(f"  {label:<10}: resumed {summary['parse_stats']['resumes']}x, "
+          f"{summary['total_contacts']} contacts / {summary['total_messages']} messages, "
+          f"parsed.json {'identical' if same else 'DIFFERS'}; "
+          f"checkpoint left: {(case_dir / 'checkpoint.pkl').exists()}")
+    return same
+
+
+def main():
+    contacts = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    chats = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    per_chat = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    with tempfile.TemporaryDirectory(prefix="check_resume_") as tmp:
+        os.chdir(tmp)
+        upload = write_ufdr(Path(tmp) / "extraction.ufdr", contacts, chats, per_chat, files=200)
+
+        # small chunks so the parallel parser checkpoints several times
+        config.PARSE_CHUNK_BYTES = 64 * 1024
+        units = contacts + chats + 200
+        ok = check(upload, 1, every_units=max(1, units // 5))
+        ok = check(upload, 2, every_units=max(1, units // 5)) and ok
+        os.chdir("/")
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
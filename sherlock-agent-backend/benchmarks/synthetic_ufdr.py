@@ -0,0 +1,132 @@
+# benchmarks/synthetic_ufdr.py
+"""
+Deterministic synthetic UFDR extractions for benchmarks and checks.
+Run from project root:
+    python -m benchmarks.synthetic_ufdr <out.ufdr|out.xml> [contacts] [chats] [messages_per_chat] [files] [noise]
+
+- write_report(): a UFED-like report.xml (no namespace) with taggedFiles and
+  decodedData (Contact / Chat models, optional InstalledApplication noise).
+- write_ufdr(): that report zipped with its tagged files under files/Image/,
+  as a .ufdr upload. Tagged files hold seeded pseudo-random bytes of the size
+  the report declares; zip entries carry a fixed timestamp, so the same
+  arguments give a byte-identical archive.
+- SCALES: named sizes shared by the benchmark suite.
+"""
+import sys
+import random
+import zipfile
+from pathlib import Path
+from typing import Dict
+from xml.sax.saxutils import escape
+
+# (contacts, chats, messages_per_chat, files)
+SCALES: Dict[str, Dict[str, int]] = {
+    "tiny": {"contacts": 500, "chats": 50, "messages_per_chat": 10, "files": 50},
+    "small": {"contacts": 5000, "chats": 500, "messages_per_chat": 20, "files": 500},
+    "medium": {"contacts": 20000, "chats": 2000, "messages_per_chat": 25, "files": 2000},
+    "large": {"contacts": 100000, "chats": 10000, "messages_per_chat": 30, "files": 10000},
+}
+
+# zip entries are dated so the archive bytes don't depend on the clock
+_ZIP_DATE = (2024, 1, 1, 0, 0, 0)
+
+
+def _field(name, value):
+    return f'<field name="{name}" type="String"><value type="String">{escape(str(value))}</value></field>'
+
+
+def file_size(i: int) -> int:
+    """Declared (and written) size of tagged file `i`."""
+    return 1000 + i % 4000
+
+
+def write_report(path: Path, contacts: int, chats: int, messages_per_chat: int, files: int = 0, noise: int = 0):
+    """
+    Write a small UFED-like report.xml (no namespace).
+    `noise` adds InstalledApplication models, a type no handler subscribes to.
+    """
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('<?xml version="1.0" encoding="utf-8"?>\n<project id="bench">\n<taggedFiles>\n')
+        for i in range(files):
+            out.write(f'<file id="f{i}" fs="fs" path="/sdcard/DCIM/img_{i}.jpg" size="{file_size(i)}">'
+                      f'<metadata section="File"><item name="Local Path">files/Image/img_{i}.jpg</item></metadata>'
+                      f'</file>\n')
+        out.write('</taggedFiles>\n<decodedData>\n<modelType type="Contact">\n')
+        for i in range(contacts):
+            out.write(f'<model type="Contact" id="c{i}">{_field("Name", f"Person {i}")}{_field("Source", "Phone")}'
+                      f'<multiModelField name="Entries">'
+                      f'<model type="PhoneNumber" id="c{i}e0">{_field("Value", f"+4366{i:08d}")}{_field("Category", "Mobile")}</model>'
+                      f'</multiModelField></model>\n')
+        out.write('</modelType>\n<modelType type="Chat">\n')
+        for c in range(chats):
+            a, b = f"+4366{c:08d}", f"+4366{(c + 1) % max(contacts, 1):08d}"
+            out.write(f'<model type="Chat" id="chat{c}">{_field("Source", "WhatsApp")}<multiModelField name="Participants">')
+            for j, ident in enumerate((a, b)):
+                out.write(f'<model type="Party" id="chat{c}p{j}">{_field("Identifier", ident)}'
+                          f'{_field("IsPhoneOwner", "true" if j == 0 else "false")}</model>')
+            out.write('</multiModelField><multiModelField name="Messages">')
+            for m in range(messages_per_chat):
+                sender = a if m % 2 == 0 else b
+                out.write(f'<model type="InstantMessage" id="chat{c}m{m}">'
+                          f'<modelField name="From"><model type="Party">{_field("Identifier", sender)}</model></modelField>'
+                          f'{_field("Body", f"message {m} in chat {c}")}{_field("TimeStamp", 1700000000000 + m * 1000)}'
+                          f'</model>')
+            out.write('</multiModelField></model>\n')
+        out.write('</modelType>\n<modelType type="InstalledApplication">\n')
+        for i in range(noise):
+            out.write(f'<model type="InstalledApplication" id="app{i}">{_field("Name", f"app {i}")}'
+                      f'<multiModelField name="Permissions">'
+                      + "".join(f'<model type="Permission">{_field("Name", f"perm {j}")}</model>' for j in range(5))
+                      + '</multiModelField></model>\n')
+        out.write('</modelType>\n</decodedData>\n</project>\n')
+
+
+def write_ufdr(path: Path, contacts: int, chats: int, messages_per_chat: int, files: int = 0, noise: int = 0,
+               seed: int = 0) -> Path:
+    """
+    Write a .ufdr (zip) holding report.xml and the `files` tagged files it
+    references. The report is generated next to `path` and removed after
+    zipping. Returns `path`.
+    """
+    path = Path(path)
+    report = path.with_name(path.stem + ".report.xml")
+    write_report(report, contacts, chats, messages_per_chat, files=files, noise=noise)
+    rnd = random.Random(seed)
+    try:
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            info = zipfile.ZipInfo("report.xml", _ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(report, "rb") as src, zf.open(info, "w") as dst:
+                while True:
+                    block = src.read(1024 * 1024)
+                    if not block:
+                        break
+                    dst.write(block)
+            for i in range(files):
+                # photos don't deflate: store them
+                zf.writestr(zipfile.ZipInfo(f"files/Image/img_{i}.jpg", _ZIP_DATE),
+                            rnd.getrandbits(8 * file_size(i)).to_bytes(file_size(i), "little"))
+    finally:
+        report.unlink(missing_ok=True)
+    return path
+
+
+def main():
+    if len(sys.argv) < 2:
+        raise SystemExit(__doc__)
+    out = Path(sys.argv[1])
+    contacts = int(sys.argv[2]) if len(sys.argv) > 2 else SCALES["small"]["contacts"]
+    chats = int(sys.argv[3]) if len(sys.argv) > 3 else SCALES["small"]["chats"]
+    per_chat = int(sys.argv[4]) if len(sys.argv) > 4 else SCALES["small"]["messages_per_chat"]
+    files = int(sys.argv[5]) if len(sys.argv) > 5 else SCALES["small"]["files"]
+    noise = int(sys.argv[6]) if len(sys.argv) > 6 else 0
+    if out.suffix.lower() == ".xml":
+        write_report(out, contacts, chats, per_chat, files=files, noise=noise)
+    else:
+        write_ufdr(out, contacts, chats, per_chat, files=files, noise=noise)
+    print(f"{out}: {out.stat().st_size / (1024 * 1024):.1f} MB, {contacts} contacts, {chats} chats x "
+          f"{per_chat} messages, {files} files, {noise} noise models")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from pathlib import Path
 # adjust import path if necessary
 try:
     from app.services.parser.case_parser import parse_uploaded_file
+    from app.services.parser.parsed_writer import load_parsed
 except Exception as e:
     raise SystemExit("Failed to import parse_uploaded_file from app.services.parser.case_parser: " + str(e))
 
@@ -25,8 +26,9 @@ case_id = "test_case_" + uuid.uuid4().hex[:8]
 print(f"[TEST HARNESS] Parsing demo file: {DEMO_PATH}")
 print(f"[TEST HARNESS] Using case_id: {case_id}")
 
-# call the parser
-normalized = parse_uploaded_file(str(DEMO_PATH), case_id=case_id)
+# call the parser (returns the summary; the normalized case is streamed to disk)
+summary = parse_uploaded_file(str(DEMO_PATH), case_id=case_id)
+normalized = load_parsed(ROOT / "data" / "cases" / case_id)
 
 # support both legacy keys and enhanced keys
 contacts = normalized.get("contacts", []) or normalized.get("contacts_out", [])
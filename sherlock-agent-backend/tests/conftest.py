@@ -0,0 +1,33 @@
+# tests/conftest.py
+import os
+import contextlib
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic_ufdr import write_ufdr
+
+BACKEND = Path(__file__).resolve().parent.parent
+DEMO_JSON = BACKEND / "demo_data" / "sample_case_1.json"
+
+
+@contextlib.contextmanager
+def in_dir(path: Path):
+    """The parser and the API resolve data/ against the working directory."""
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture(scope="session")
+def work_dir(tmp_path_factory) -> Path:
+    return tmp_path_factory.mktemp("work")
+
+
+@pytest.fixture(scope="session")
+def synthetic_upload(work_dir) -> Path:
+    """Small deterministic extraction: 300 contacts, 30 chats x 8 messages, 40 tagged files."""
+    return write_ufdr(work_dir / "synthetic.ufdr", contacts=300, chats=30, messages_per_chat=8, files=40)
@@ -0,0 +1,86 @@
+# tests/test_case_store.py
+"""CaseStore (case.db) and ParsedCase (parsed.json fallback) must answer every query alike."""
+import pytest
+
+from app.services.parser.case_parser import parse_uploaded_file
+from app.services.parser.parsed_writer import load_parsed
+from app.services.storage.case_store import CaseStore, ParsedCase, DB_FILE, contact_text, file_text, message_text
+from tests.conftest import DEMO_JSON, in_dir
+
+CONTACT_QUERIES = ["ph", "pho", "phone", "al", "alice", "person 1", "+4366", "+436600000012", "son 2", "x", "mobile"]
+# " message" / "jpg /sdcard" only match across the subject|body / local|mobile path boundary
+MESSAGE_QUERIES = ["me", "message 1", " message", "chat 2", "meet", "9pm", "x"]
+FILE_QUERIES = ["jp", "jpg", "img_1", "jpg /sdcard", "dcim"]
+
+
+@pytest.fixture(scope="module", params=["synthetic", "demo"])
+def case_dir(request, work_dir, synthetic_upload):
+    upload = synthetic_upload if request.param == "synthetic" else DEMO_JSON
+    case_id = f"store_{request.param}"
+    with in_dir(work_dir):
+        parse_uploaded_file(str(upload), case_id, workers=1)
+    return work_dir / "data" / "cases" / case_id
+
+
+@pytest.fixture
+def paths(case_dir):
+    """The three ways a contacts filter is answered: trigram index, SQL scan, parsed.json scan."""
+    indexed = CaseStore(case_dir / DB_FILE)
+    scanned = CaseStore(case_dir / DB_FILE)
+    scanned._has_text_index = False
+    yield {"trigram": indexed, "scan": scanned, "parsed": ParsedCase(load_parsed(case_dir))}
+    indexed.close()
+    scanned.close()
+
+
+def test_store_has_text_index(paths):
+    assert paths["trigram"].has_text_index
+
+
+@pytest.mark.parametrize("q", CONTACT_QUERIES)
+def test_contact_filter_parity(paths, q):
+    pages = {name: case.contacts(q=q) for name, case in paths.items()}
+    expected = [c for c in pages["parsed"].items]
+    for name, page in pages.items():
+        assert page.items == expected, name
+        assert page.total == len(expected), name
+    # the filter means "in names / account types / identifiers", never JSON keys
+    assert all(q.lower() in contact_text(c).lower() for c in expected)
+
+
+@pytest.mark.parametrize("q", MESSAGE_QUERIES)
+def test_message_filter_parity(paths, q):
+    expected = paths["parsed"].messages(q=q, limit=None)
+    for name, case in paths.items():
+        page = case.messages(q=q, limit=None)
+        assert page.items == expected.items, name
+        assert page.total == expected.total, name
+    assert all(q.lower() in message_text(m).lower() for m in expected.items)
+
+
+@pytest.mark.parametrize("q", FILE_QUERIES)
+def test_file_filter_parity(paths, q):
+    expected = paths["parsed"].files(q=q)
+    for name, case in paths.items():
+        assert case.files(q=q).items == expected.items, name
+    assert all(q.lower() in file_text(f).lower() for f in expected.items)
+
+
+def test_contact_filter_ignores_json_keys(paths):
+    # every contact has "accounts" / "platform" / "false" in its JSON
+    for case in paths.values():
+        assert case.contacts(q="platform").items == []
+        assert case.contacts(q="accounts").items == []
+
+
+# "+" / "@" / "." have no word characters and are too short for trigrams: the index falls back to a scan
+@pytest.mark.parametrize("q", ["message", "ph", "image", "jpg", "alice", "+4366000000", "+", "@", "."])
+def test_search_parity(paths, q):
+    scan = paths["scan"].search(q, limit=1000)
+    parsed = paths["parsed"].search(q, limit=1000)
+    assert scan.items == parsed.items
+    assert scan.total == parsed.total
+    # the ranked index finds the same rows, in its own order
+    ranked = paths["trigram"].search(q, limit=1000)
+    key = lambda hit: (hit["type"], repr(sorted(hit["obj"].items())))
+    assert sorted(map(key, ranked.items)) == sorted(map(key, parsed.items))
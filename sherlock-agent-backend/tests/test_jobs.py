@@ -0,0 +1,64 @@
+# tests/test_jobs.py
+"""A failed parse job keeps its checkpoint, and resume() continues from it."""
+import time
+import multiprocessing
+
+import pytest
+
+from app import config
+from app.services.job_queue import JobQueue, ACTIVE
+from app.services.parser.case_parser import parse_uploaded_file
+from app.services.parser.checkpoint import Checkpointer, CHECKPOINT_FILE
+from app.services.parser.parsed_writer import PARSED_FILE
+from tests.conftest import in_dir
+
+CASE_ID = "jobs_resume"
+
+
+def _wait(queue, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = queue.get(job_id)
+        if job["status"] not in ACTIVE:
+            return job
+        assert time.monotonic() < deadline, job
+        time.sleep(0.05)
+
+
+def test_resume_after_failure(work_dir, synthetic_upload, monkeypatch):
+    case_dir = work_dir / "data" / "cases" / CASE_ID
+    with in_dir(work_dir):
+        parse_uploaded_file(str(synthetic_upload), CASE_ID, checkpointer=Checkpointer(case_dir, interval_s=0))
+    expected = (case_dir / PARSED_FILE).read_bytes()
+
+    # the worker fails right after its second checkpoint; forked workers inherit the patches
+    crash = {"armed": True}
+    save = Checkpointer.save
+
+    def failing_save(self, position):
+        save(self, position)
+        if crash["armed"] and self.saves >= 2:
+            raise RuntimeError("simulated failure")
+
+    monkeypatch.setattr(Checkpointer, "save", failing_save)
+    monkeypatch.setattr(config, "CHECKPOINT_INTERVAL_S", 0)
+    monkeypatch.setattr(config, "CHECKPOINT_EVERY_UNITS", 50)
+    queue = JobQueue(root=work_dir / "data" / "jobs", workers=1)
+    queue._mp = multiprocessing.get_context("fork")
+
+    with in_dir(work_dir):
+        job = _wait(queue, queue.submit(synthetic_upload, CASE_ID)["job_id"])
+        assert job["status"] == "failed"
+        assert "simulated failure" in job["error"]
+        assert (case_dir / CHECKPOINT_FILE).is_file()
+
+        crash["armed"] = False
+        assert queue.resume(job["job_id"])["status"] in ACTIVE
+        with pytest.raises(ValueError):
+            queue.resume(job["job_id"])  # queued, running or done: nothing to resume
+        job = _wait(queue, job["job_id"])
+
+    assert job["status"] == "done", job["error"]
+    assert job["summary"]["parse_stats"]["resumes"] == 1
+    assert (case_dir / PARSED_FILE).read_bytes() == expected
+    assert not (case_dir / CHECKPOINT_FILE).exists()
@@ -0,0 +1,94 @@
+# tests/test_parser.py
+"""The parallel, resumed and sequential parses of an extraction must write the same case."""
+import json
+import shutil
+
+import pytest
+
+from app import config
+from app.services.parser.case_parser import parse_uploaded_file
+from app.services.parser.checkpoint import Checkpointer, CHECKPOINT_FILE
+from app.services.parser.parsed_writer import PARSED_FILE
+from benchmarks.bench_merge import build_manager, legacy_merge
+from benchmarks.check_resume import CrashingCheckpointer, SimulatedCrash
+from tests.conftest import DEMO_JSON, in_dir
+
+# contacts + chats + files of the synthetic_upload fixture: the top-level units of a sequential parse
+UNITS = 300 + 30 + 40
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """A report of ~200 KB split into a dozen chunks, so workers=2 really runs in parallel."""
+    monkeypatch.setattr(config, "PARSE_CHUNK_BYTES", 16 * 1024)
+
+
+def _parse(work_dir, upload, case_id, **kwargs):
+    """Parse into a fresh case dir; returns (summary, parsed.json bytes)."""
+    case_dir = work_dir / "data" / "cases" / case_id
+    shutil.rmtree(case_dir, ignore_errors=True)
+    with in_dir(work_dir):
+        summary = parse_uploaded_file(str(upload), case_id, **kwargs)
+    return summary, (case_dir / PARSED_FILE).read_bytes()
+
+
+def test_synthetic_parse_totals(work_dir, synthetic_upload):
+    summary, _ = _parse(work_dir, synthetic_upload, "parser_totals", workers=1)
+    assert summary["total_contacts"] >= 300  # plus the chat participants
+    assert summary["total_threads"] == 30
+    assert summary["total_messages"] == 30 * 8
+    assert summary["total_files"] == 40
+
+
+def test_parallel_matches_sequential(work_dir, synthetic_upload, small_chunks):
+    # same case id for both runs, so the paths in parsed.json match
+    sequential, expected = _parse(work_dir, synthetic_upload, "parser_parity", workers=1)
+    parallel, parsed = _parse(work_dir, synthetic_upload, "parser_parity", workers=2)
+    assert "scan_chunks" in parallel["parse_stats"]["timings"]["timers"]  # the parallel parser ran
+    assert parsed == expected
+    assert parallel["total_messages"] == sequential["total_messages"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_resume_matches_uninterrupted(work_dir, synthetic_upload, small_chunks, workers):
+    case_id = f"parser_resume_w{workers}"
+    case_dir = work_dir / "data" / "cases" / case_id
+    _, expected = _parse(work_dir, synthetic_upload, case_id, workers=workers,
+                         checkpointer=Checkpointer(case_dir, interval_s=0))
+
+    with pytest.raises(SimulatedCrash):
+        _parse(work_dir, synthetic_upload, case_id, workers=workers,
+               checkpointer=CrashingCheckpointer(case_dir, every_units=UNITS // 5, crash_after=2))
+    assert (case_dir / CHECKPOINT_FILE).is_file()
+
+    with in_dir(work_dir):
+        summary = parse_uploaded_file(str(synthetic_upload), case_id, workers=workers, resume=True,
+                                      checkpointer=Checkpointer(case_dir, interval_s=0))
+    assert summary["parse_stats"]["resumes"] == 1
+    assert (case_dir / PARSED_FILE).read_bytes() == expected
+    assert not (case_dir / CHECKPOINT_FILE).exists()
+
+
+@pytest.mark.parametrize("n", [50, 500])
+def test_merge_candidates_matches_pairwise(n):
+    old, new = build_manager(n), build_manager(n)
+    legacy_merge(old)
+    new.merge_candidates()
+    snapshot = lambda am: [(c.names, c.base_identifiers, c.accounts) for c in am.contacts]
+    assert snapshot(new) == snapshot(old)
+    assert len(new.contacts) < n  # the population is built to merge
+
+
+def test_demo_json_meta_anywhere(work_dir, tmp_path):
+    doc = json.loads(DEMO_JSON.read_text(encoding="utf-8-sig"))
+    # the source decides the account type of chat participants
+    doc["meta"] = {**doc["meta"], "source": "WhatsApp"}
+    outputs = []
+    for order in (["meta", "contacts", "messages", "media"], ["contacts", "messages", "media", "meta"]):
+        upload = tmp_path / order[0] / "case.json"
+        upload.parent.mkdir()
+        upload.write_text(json.dumps({key: doc[key] for key in order}), encoding="utf-8")
+        _, parsed = _parse(work_dir, upload, "parser_meta_order")
+        outputs.append(parsed)
+    assert outputs[1] == outputs[0]
+    assert b'"type": "WHATSAPP"' in outputs[0]
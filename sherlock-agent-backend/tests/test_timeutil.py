@@ -0,0 +1,24 @@
+# tests/test_timeutil.py
+import pytest
+
+from app.utils.timeutil import to_epoch_ms, parse_time_param
+
+
+@pytest.mark.parametrize("value, ms", [
+    (0, None), (-1, None), ("-1", None), ("0", None), (None, None), ("", None), ("soon", None),
+    (1700000000, 1700000000000),              # seconds
+    ("1700000000", 1700000000000),
+    (1700000000123, 1700000000123),           # milliseconds
+    (1700000000123456, 1700000000123),        # microseconds
+    ("2024-01-01T00:00:00Z", 1704067200000),
+    ("2024-01-01T01:00:00+01:00", 1704067200000),
+])
+def test_to_epoch_ms(value, ms):
+    assert to_epoch_ms(value) == ms
+
+
+def test_parse_time_param():
+    assert parse_time_param("0") == 0
+    assert parse_time_param(None) is None
+    with pytest.raises(ValueError):
+        parse_time_param("-5")